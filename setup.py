@@ -80,6 +80,10 @@ setup(
         'Flask-Restless',
 	'configparser'
     ],
+    extras_require={
+        # Vectorized call graph analytics (analyzer command 'centrality')
+        'vector': ['numpy']
+    },
     classifiers=[
         'Programming Language :: Python',
         'Natural Language :: English',
@@ -89,5 +93,7 @@ setup(
         'License :: OSI Approved :: MIT License'
     ],
     scripts=['bin/smalisca'],
-    data_files = [('smalisca/data/config/', ['smalisca/data/config/config.conf'])],
+    data_files = [('smalisca/data/config/', ['smalisca/data/config/config.conf',
+                                             'smalisca/data/config/sources_sinks.conf',
+                                             'smalisca/data/config/rules.conf'])],
 )
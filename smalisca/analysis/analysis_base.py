@@ -31,12 +31,116 @@
 # IN THE SOFTWARE.
 
 import abc
+from smalisca.analysis.analysis_callgraph import CallGraphIndex, EDGE_FIELDS
+from smalisca.analysis import analysis_vector
+from smalisca.analysis.analysis_entrypoints import entry_points
+from smalisca.analysis.analysis_hierarchy import hierarchy_closure
+from smalisca.analysis.analysis_scanner import Scanner, SCAN_CALL_FIELDS, SCAN_STRING_FIELDS
+from smalisca.analysis.analysis_search import MATCH_CONTAINS, MATCH_REGEX, valid_regex
+from smalisca.modules.module_manifest import find_manifest, parse_manifest
+from smalisca.core.smalisca_logging import log
 
 
-class AnalysisBase(object):
-    """Basic analysis class"""
+# Default max. number of calls per path
+PATH_MAX_DEPTH = 10
 
-    __metaclass__ = abc.ABCMeta
+# Default max. seconds to search for paths
+PATH_TIMEOUT = 10
+
+# Tables of the global search: (table argument, results key)
+GLOBAL_TABLES = (
+    ('class', 'classes'),
+    ('property', 'properties'),
+    ('const', 'consts'),
+    ('method', 'methods')
+)
+
+
+class Results(list):
+    """List of search results
+
+    If only a range of the results has been requested, the list just
+    contains this range.
+
+    Attributes:
+        total (int): Number of all matching results
+        depth (dict): Cross-reference depth by call ID (xref results only)
+        more (bool): True if the results have been capped and more rows
+            match (see :func:`cap`)
+        table (str): Table of the rows, if known (rows may be plain tuples)
+
+    """
+
+    def __init__(self, rows=(), total=None, depth=None, more=False, table=None):
+        list.__init__(self, rows)
+        self.total = len(self) if total is None else total
+        self.depth = depth
+        self.more = more
+        self.table = table
+
+
+def cap(rows, limit=None):
+    """Caps rows at limit without counting all of them
+
+    Args:
+        rows (list): Up to limit + 1 rows
+        limit (int): Max. number of rows (None for no limit)
+
+    Returns:
+        Results: At most limit rows, 'more' is True if rows had more
+
+    """
+    if not limit or len(rows) <= limit:
+        return Results(rows)
+    return Results(rows[:limit], more=True)
+
+
+def window(rows, args={}):
+    """Sorts rows and applies output range
+
+    Backends which can't do it while querying use this function.
+
+    Args:
+        rows (list): List of rows
+        args (dict): Optional 'sortby' (column name), 'reverse' (bool),
+            'offset' and 'limit' (int)
+
+    Returns:
+        Results: List of results, total number of rows in 'total'
+
+    """
+    sortby = args.get('sortby')
+    offset = args.get('offset') or 0
+    limit = args.get('limit')
+
+    # Cross-reference results can also be sorted by depth
+    depth = getattr(rows, 'depth', None)
+    if sortby == 'xref_depth' and depth:
+        rows = sorted(rows, key=lambda r: depth.get(r.id),
+                      reverse=bool(args.get('reverse')))
+
+    elif sortby or args.get('reverse'):
+        key = None
+        if sortby:
+            key = lambda r: (getattr(r, sortby, None) is None, getattr(r, sortby, None))
+        rows = sorted(rows, key=key, reverse=bool(args.get('reverse')))
+
+    if not offset and not limit:
+        return Results(rows, depth=depth)
+
+    end = offset + limit if limit else None
+    return Results(rows[offset:end], len(rows), depth)
+
+
+class AnalysisBase(metaclass=abc.ABCMeta):
+    """Basic analysis class
+
+    Backends implement the abstract methods: searches, access to the
+    table rows and storing of derived tables (reachability, metrics,
+    findings, class hierarchy). Call graph analyses, scanning and the
+    class hierarchy are built on top of them.
+
+    """
 
     @abc.abstractmethod
     def search_class(self, args):
@@ -57,3 +161,492 @@ class AnalysisBase(object):
     def search_call(self, args):
         """Search for call"""
         pass
+
+    def call_edges(self):
+        """Returns call ID and EDGE_FIELDS values of all calls ordered by ID"""
+        return self.table_values('calls', EDGE_FIELDS)
+
+    @abc.abstractmethod
+    def get_calls_by_id(self, ids):
+        """Returns calls by ID in the given order"""
+
+    @abc.abstractmethod
+    def store_reachability(self, reachable):
+        """Marks methods and calls as reachable or unreachable
+
+        Args:
+            reachable (callable): reachable(class, method, args) returns
+                True if the method is reachable
+
+        Returns:
+            bool: True if stored
+
+        """
+
+    @abc.abstractmethod
+    def has_metrics(self):
+        """Returns True if call graph metrics have been stored"""
+
+    @abc.abstractmethod
+    def store_metrics(self, methods, classes):
+        """Replaces stored call graph metrics
+
+        Args:
+            methods (list): Tuples of METHOD_METRICS values
+            classes (list): Tuples of CLASS_METRICS values
+
+        Returns:
+            bool: True if stored
+
+        """
+
+    @abc.abstractmethod
+    def search_metrics(self, table, args):
+        """Searches stored metrics ('method_metrics' or 'class_metrics')"""
+
+    @abc.abstractmethod
+    def table_values(self, table, fields):
+        """Returns the ID and the fields values of all table rows
+
+        Args:
+            table (str): Table name
+            fields (list): Field names
+
+        Returns:
+            iterable: Tuples of ID and field values, ordered by ID
+
+        """
+
+    @abc.abstractmethod
+    def has_findings(self):
+        """Returns True if scanner findings have been stored"""
+
+    @abc.abstractmethod
+    def store_findings(self, findings):
+        """Replaces stored scanner findings
+
+        Args:
+            findings (list): Tuples of FINDING_FIELDS values
+
+        Returns:
+            bool: True if stored
+
+        """
+
+    @abc.abstractmethod
+    def search_findings(self, args):
+        """Searches stored scanner findings"""
+
+    @abc.abstractmethod
+    def has_hierarchy(self):
+        """Returns True if the class hierarchy closure has been stored"""
+
+    @abc.abstractmethod
+    def store_hierarchy(self, rows):
+        """Replaces the stored class hierarchy closure
+
+        Args:
+            rows (list): Tuples of HIERARCHY_FIELDS values
+
+        Returns:
+            bool: True if stored
+
+        """
+
+    @abc.abstractmethod
+    def search_hierarchy(self, args):
+        """Searches the class hierarchy closure
+
+        Args:
+            args (dict): Optional 'type' ('ancestor' or 'descendant') and
+                'pattern' (exact class name unless 'match' is set),
+                'direct' (only distance 1) and 'kind' ('class' or 'interface')
+
+        Returns:
+            list: List of any results, None otherwise.
+
+        """
+
+    @abc.abstractmethod
+    def group(self, args):
+        """Counts rows by the values of some columns
+
+        Args:
+            args (dict): 'table' (table name) and 'columns' (grouped
+                columns), optional 'type' (column) and 'pattern' to only
+                count matching rows, 'match', 'reverse' (least frequent
+                first) and 'top' (max. number of groups)
+
+        Returns:
+            Results: Tuples of the column values followed by the count,
+            most frequent first. The number of groups is in 'total'.
+            None if the table or a column is invalid.
+
+        """
+
+    @abc.abstractmethod
+    def count_rows(self):
+        """Returns the number of rows by table name"""
+
+    def search_tables(self, args):
+        """Returns the GLOBAL_TABLES searched by a global search
+
+        Args:
+            args (dict): Optional 'table' (table argument, None for all)
+
+        Returns:
+            list: (table argument, results key) tuples, None if the
+            table is invalid
+
+        """
+        tables = [t for t in GLOBAL_TABLES if args.get('table') in (None, t[0])]
+        if not tables:
+            log.error("Invalid table")
+            return None
+        return tables
+
+    def iter_search(self, args={}):
+        """Searches globally, yields the results of every table when ready
+
+        Backends which can't search tables concurrently yield the
+        results of :meth:`search` table by table.
+
+        Args:
+            args (dict): 'pattern', optional 'table', 'match' and 'limit'
+                (max. rows per table)
+
+        Yields:
+            tuple: (results key, Results)
+
+        """
+        results = self.search(args)
+        for _, key in self.search_tables(args) or []:
+            yield key, results[key]
+
+    def cache_stats(self):
+        """Returns query cache statistics, None if there's no cache"""
+        return None
+
+    def clear_cache(self):
+        """Drops all cached queries"""
+        pass
+
+    def close(self):
+        """Releases resources at the end of a session"""
+        pass
+
+    def reopen(self):
+        """Prepares the analyzer for use in a forked worker process"""
+        pass
+
+    def get_call_graph(self):
+        """Returns the resident call graph, builds it on first use
+
+        Returns:
+            CallGraphIndex: The call graph
+
+        """
+        if getattr(self, 'call_graph', None) is None:
+            self.call_graph = CallGraphIndex(self.call_edges())
+        return self.call_graph
+
+    def xref_call(self, results, xref_type, max_depth=1, precise=False):
+        """Get xref results
+
+        Args:
+            results (list): List of calls to start from
+            xref_type (str): Direction ('to' or 'from')
+            max_depth (int): How many times to follow the xrefs
+            precise (bool): Follow called methods instead of classes
+
+        Returns:
+            Results: List of calls ordered by depth, the depth each call
+            was found at in 'depth'. The initial results if there are no xrefs.
+
+        """
+        ids, depth = self.get_call_graph().xref(
+            results or [], xref_type, max_depth, precise)
+
+        # If no cross results, return old results
+        if not ids:
+            return results
+
+        return Results(self.get_calls_by_id(ids), depth=depth)
+
+    def find_paths(self, args={}):
+        """Finds the shortest call paths between methods
+
+        Args:
+            args (dict): 'from_class', 'from_method' (source methods),
+                'to_class', 'to_method' (sink methods), optional 'match',
+                'k' (max. number of paths), 'max_depth' (max. calls per path)
+                and 'timeout' (seconds)
+
+        Returns:
+            list: Paths as lists of calls, shortest first
+
+        """
+        match = args.get('match') or MATCH_CONTAINS
+        if match == MATCH_REGEX:
+            patterns = [args.get(a) for a in ('from_class', 'from_method', 'to_class', 'to_method')]
+            if not all(valid_regex(p) for p in patterns if p):
+                return []
+
+        graph = self.get_call_graph()
+
+        sources = graph.find_nodes(args.get('from_class'), args.get('from_method'), match)
+        sinks = graph.find_nodes(args.get('to_class'), args.get('to_method'), match)
+        log.info("Searching paths from %d to %d methods" % (len(sources), len(sinks)))
+
+        max_depth = args.get('max_depth')
+        if max_depth is None:
+            max_depth = PATH_MAX_DEPTH
+
+        paths = graph.shortest_paths(
+            sources, sinks, args.get('k') or 1, max_depth, args.get('timeout'))
+
+        return [self.get_calls_by_id([graph.edge_call[e] for e in p]) for p in paths]
+
+    def find_reachable(self, sources, sinks, max_depth=None):
+        """Finds which sources reach which sinks in a single pass
+
+        Args:
+            sources (dict): Source methods as label: (class, method)
+            sinks (dict): Sink methods as label: (class, method)
+            max_depth (int): Max. number of calls between a method
+                calling the source and the sink (None for no limit)
+
+        Returns:
+            list: Tuples of (source label, sink label, witness path). The
+            path starts with the call of the source, followed by the
+            calls leading to the sink. If the method calling the source
+            is a sink itself, that call is the whole path. The path is
+            None if no witness was found within PATH_TIMEOUT.
+
+        """
+        graph = self.get_call_graph()
+        source_labels = sorted(sources)
+        sink_labels = sorted(sinks)
+
+        source_nodes = [graph.find_nodes(*sources[l]) for l in source_labels]
+        sink_nodes = [graph.find_nodes(*sinks[l]) for l in sink_labels]
+
+        depth = len(graph.nodes) if max_depth is None else max_depth
+
+        results = []
+        for i, j in sorted(graph.reach(source_nodes, sink_nodes, max_depth)):
+            callers = graph.callers(source_nodes[i])
+
+            path = []
+            direct = callers & sink_nodes[j]
+            if direct:
+                caller = min(direct)
+            else:
+                paths = graph.shortest_paths(callers, sink_nodes[j], 1, depth, PATH_TIMEOUT)
+                if not paths:
+                    log.warn("No path from %s to %s found within %ds" % (
+                        source_labels[i], sink_labels[j], PATH_TIMEOUT))
+                    results.append((source_labels[i], sink_labels[j], None))
+                    continue
+                path = paths[0]
+                caller = graph.edge_src[path[0]]
+
+            # Call of the source by the first method of the path
+            calls = [next(e for e in graph.calls_from(caller)
+                          if graph.edge_dst[e] in source_nodes[i])] + path
+            calls = self.get_calls_by_id([graph.edge_call[e] for e in calls])
+
+            results.append((source_labels[i], sink_labels[j], calls))
+
+        return results
+
+    def analyze_reachability(self, manifest=None):
+        """Marks methods reachable from the entry points of the app
+
+        Entry points are callbacks of components declared in the manifest,
+        of classes extending framework types and of classes implementing
+        framework interfaces (see :mod:`smalisca.analysis.analysis_entrypoints`).
+        Methods are then followed through the call graph in a single pass.
+
+        Args:
+            manifest (str): Path of AndroidManifest.xml. If None it's
+                looked up in the dump directory.
+
+        Returns:
+            dict: 'manifest' (path used), 'entry_points' (reason by
+            (class, method, args)), 'methods' and 'reachable' (counts).
+            None if the reachability couldn't be stored.
+
+        """
+        classes = self.search_class()
+        parents = dict((c.class_name, c.class_parent) for c in classes)
+        methods = [(m.method_class, m.method_name, m.method_args) for m in self.search_method()]
+
+        # Components declared in the manifest
+        if manifest is None:
+            manifest = find_manifest(c.path for c in classes)
+        components = (manifest and parse_manifest(manifest)) or []
+        log.info("Found %d components in manifest %s" % (len(components), manifest))
+
+        entries = entry_points(
+            parents, methods, [name for _, name in components], self.get_interfaces())
+
+        # Follow the calls
+        graph = self.get_call_graph()
+        nodes = [graph.node(*e) for e in entries]
+        reached = set(graph.nodes[n] for n in graph.reachable(n for n in nodes if n is not None))
+        reached.update(graph.key(*e) for e in entries)
+
+        def reachable(class_name, method, args):
+            return graph.key(class_name, method, args) in reached
+
+        if not self.store_reachability(reachable):
+            return None
+
+        return {
+            'manifest': manifest,
+            'entry_points': entries,
+            'methods': len(methods),
+            'reachable': sum(1 for m in methods if reachable(*m))
+        }
+
+    def analyze_metrics(self):
+        """Computes and stores call graph metrics
+
+        Fan-in, fan-out and strongly connected components of every method
+        and the coupling of every class are computed in a single linear
+        pass over the call graph (see
+        :meth:`smalisca.analysis.analysis_callgraph.CallGraphIndex.metrics`).
+
+        Returns:
+            tuple: (number of methods, number of classes), None if the
+            metrics couldn't be stored
+
+        """
+        methods, classes = self.get_call_graph().metrics()
+        if not self.store_metrics(methods, classes):
+            return None
+        log.info("Stored metrics of %d methods and %d classes" % (len(methods), len(classes)))
+
+        return len(methods), len(classes)
+
+    def centrality(self, args={}):
+        """Computes degrees, PageRank and k-hop neighborhood sizes
+
+        The metrics of all methods are computed at once by NumPy
+        (see :class:`smalisca.analysis.analysis_vector.VectorGraph`).
+
+        Args:
+            args (dict): Optional 'class' and 'method' patterns selecting
+                methods, 'match', 'khop' (k of the k-hop neighborhoods),
+                'callers' (k-hop neighborhoods of callers), 'sortby',
+                'reverse', 'offset' and 'limit'
+
+        Returns:
+            Results: CentralityRow by method, None if NumPy is missing
+
+        """
+        if not analysis_vector.available():
+            log.error("NumPy is required for centrality metrics (pip install numpy)")
+            return None
+
+        match = args.get('match') or MATCH_CONTAINS
+        patterns = [p for p in (args.get('class'), args.get('method')) if p]
+        if match == MATCH_REGEX and not all(valid_regex(p) for p in patterns):
+            return Results()
+
+        graph = self.get_call_graph()
+        if getattr(self, 'vector_graph', None) is None or self.vector_graph.graph is not graph:
+            self.vector_graph = analysis_vector.VectorGraph(graph)
+
+        nodes = None
+        if patterns:
+            nodes = graph.find_nodes(args.get('class'), args.get('method'), match)
+
+        rows = self.vector_graph.centrality(nodes, args.get('khop'), args.get('callers'))
+        return window(rows, args)
+
+    def scan(self, call_rules, string_rules):
+        """Scans calls and const-strings for rule patterns
+
+        All patterns are matched in a single pass over both tables (see
+        :class:`smalisca.analysis.analysis_scanner.Scanner`). The findings
+        replace the stored ones.
+
+        Args:
+            call_rules (dict): Call descriptor patterns by rule
+            string_rules (dict): Const-string patterns by rule
+
+        Returns:
+            int: Number of findings, None if they couldn't be stored
+
+        """
+        scanner = Scanner(call_rules, string_rules)
+        findings = list(scanner.scan(
+            self.table_values('calls', SCAN_CALL_FIELDS),
+            self.table_values('const_strings', SCAN_STRING_FIELDS)))
+
+        if not self.store_findings(findings):
+            return None
+        log.info("Stored %d findings of %d rules" % (
+            len(findings), len(call_rules) + len(string_rules)))
+
+        return len(findings)
+
+    def get_interfaces(self):
+        """Returns implemented interfaces as dict of lists by class name"""
+        interfaces = {}
+        for _, name, interface in self.table_values(
+                'interfaces', ('class_name', 'interface_name')):
+            interfaces.setdefault(name, []).append(interface)
+        return interfaces
+
+    def build_hierarchy(self):
+        """Computes and stores the class hierarchy closure
+
+        Returns:
+            int: Number of (ancestor, descendant) rows, None if they
+            couldn't be stored
+
+        """
+        parents = dict(
+            (name, parent) for _, name, parent in
+            self.table_values('classes', ('class_name', 'class_parent')))
+
+        rows = list(hierarchy_closure(parents, self.get_interfaces()))
+        if not self.store_hierarchy(rows):
+            return None
+        log.info("Stored class hierarchy of %d classes (%d rows)" % (
+            len(parents), len(rows)))
+
+        return len(rows)
+
+    def search_method_metrics(self, args={}):
+        """Searches method metrics, computes them on first use
+
+        Args:
+            args (dict): Optional 'type' (column) and 'pattern', 'match',
+                'recursive' (bool, only methods in call cycles), 'sortby',
+                'reverse', 'offset' and 'limit'
+
+        Returns:
+            Results: List of metrics, None if they couldn't be computed
+
+        """
+        if not self.has_metrics() and self.analyze_metrics() is None:
+            return None
+        return self.search_metrics('method_metrics', args)
+
+    def search_class_metrics(self, args={}):
+        """Searches class metrics, computes them on first use
+
+        Args:
+            args (dict): See :meth:`search_method_metrics`
+
+        Returns:
+            Results: List of metrics, None if they couldn't be computed
+
+        """
+        if not self.has_metrics() and self.analyze_metrics() is None:
+            return None
+        return self.search_metrics('class_metrics', args)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         analysis/analysis_batch.py
+# Created:      2026-10-18
+# Purpose:      Run analyzer command files in parallel
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""Runs analyzer command files in parallel
+
+The command file is parsed up front. Independent commands are run by a
+pool of worker processes which are forked from the analyzer, so every
+worker inherits the loaded results and only opens its own (read-only)
+DB connections (see :meth:`smalisca.analysis.analysis_base.AnalysisBase.reopen`).
+
+Commands which may store results (see :func:`is_barrier`) are run by
+the analyzer itself, after all previous commands have finished. Workers
+can't store anything. The output of every command is captured and
+written in the original order.
+
+"""
+
+import contextlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from smalisca.analysis.analysis_shell import AnalyzerShell
+from smalisca.core.smalisca_logging import log
+
+
+# Commands ending the command file
+QUIT_COMMANDS = ('q', 'quit', 'EOF')
+
+# Commands which may store results, also on first use without '--update'
+STORING_COMMANDS = ('entry', 'metrics', 'scan', 'subtypes')
+
+# Shell of a worker process
+_worker_shell = None
+
+# Analyzer the workers are forked from
+_worker_analysis = None
+
+
+def parse_commands(lines):
+    """Returns the commands of a command file
+
+    Empty lines and comments ('#') are skipped, commands after the
+    first quit command are ignored.
+
+    Args:
+        lines (iterable): Lines of the command file
+
+    Returns:
+        list: (line number, command) tuples
+
+    """
+    commands = []
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.split()[0] in QUIT_COMMANDS:
+            break
+        commands.append((lineno, line))
+    return commands
+
+
+def is_barrier(command):
+    """Returns True if command may store results used by later commands"""
+    return command.split()[0] in STORING_COMMANDS
+
+
+def run_command(shell, command):
+    """Runs a shell command and returns its output
+
+    Log messages are captured along with the printed output.
+
+    Args:
+        shell (AnalyzerShell): The shell to run command in
+        command (str): Command line
+
+    Returns:
+        str: Output of the command
+
+    """
+    output = io.StringIO()
+    handlers = [
+        h for h in getattr(log, 'backend', logging.getLogger()).handlers
+        if type(h) is logging.StreamHandler]
+    streams = [h.setStream(output) for h in handlers]
+    stdout, shell.stdout = shell.stdout, output
+
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            shell.onecmd(command)
+
+    finally:
+        shell.stdout = stdout
+        for h, stream in zip(handlers, streams):
+            h.setStream(stream)
+
+    return output.getvalue()
+
+
+def init_worker():
+    """Prepares the analyzer inherited by a worker process"""
+    global _worker_shell
+    _worker_analysis.reopen()
+    _worker_shell = AnalyzerShell(_worker_analysis)
+
+
+def run_worker_command(command):
+    """Runs command in a worker process, returns its output"""
+    return run_command(_worker_shell, command)
+
+
+def segments(commands):
+    """Splits commands into runs of independent commands and barriers
+
+    Yields:
+        tuple: (True if barrier, list of (line number, command))
+
+    """
+    run = []
+    for c in commands:
+        if is_barrier(c[1]):
+            if run:
+                yield False, run
+                run = []
+            yield True, [c]
+        else:
+            run.append(c)
+    if run:
+        yield False, run
+
+
+def run_batch(analysis, commands, jobs=1):
+    """Runs commands, independent ones in parallel
+
+    Workers are forked, so without fork support (e.g. on Windows) all
+    commands are run one after another.
+
+    Args:
+        analysis (AnalysisBase): The analyzer
+        commands (list): (line number, command) tuples (see :func:`parse_commands`)
+        jobs (int): Max. number of worker processes (None for all cores)
+
+    Yields:
+        tuple: (line number, command, output) in the original order
+
+    """
+    global _worker_analysis
+    jobs = jobs or os.cpu_count() or 1
+    shell = AnalyzerShell(analysis)
+
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        if jobs > 1:
+            log.warn("Parallel execution not supported, running commands one by one")
+        jobs = 1
+
+    for barrier, run in segments(commands):
+        if barrier or jobs == 1 or len(run) == 1:
+            for lineno, command in run:
+                yield lineno, command, run_command(shell, command)
+            continue
+
+        # Workers inherit the analyzer in its current state
+        _worker_analysis = analysis
+        with ProcessPoolExecutor(
+                max_workers=min(jobs, len(run)),
+                mp_context=multiprocessing.get_context('fork'),
+                initializer=init_worker) as pool:
+            outputs = pool.map(run_worker_command, [c for _, c in run])
+            for (lineno, command), output in zip(run, outputs):
+                yield lineno, command, output
+        _worker_analysis = None
+
+
+def write_batch(results, output_dir=None, jsonl_file=None):
+    """Writes the outputs of a batch run
+
+    Args:
+        results (iterable): (line number, command, output) tuples (see :func:`run_batch`)
+        output_dir (str): Write every output to its own file
+            '<line number>_<command>.txt' in this directory
+        jsonl_file (str): Write outputs as JSON lines with 'line',
+            'command' and 'output' to this file
+
+    Without output_dir and jsonl_file the outputs are printed.
+
+    """
+    jsonl = None
+    try:
+        if output_dir and not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+        if jsonl_file:
+            jsonl = open(jsonl_file, 'w')
+
+        for lineno, command, output in results:
+            if output_dir:
+                filename = os.path.join(
+                    output_dir, "%04d_%s.txt" % (lineno, command.split()[0]))
+                with open(filename, 'w') as f:
+                    f.write(output)
+
+            if jsonl:
+                jsonl.write(json.dumps({
+                    'line': lineno, 'command': command, 'output': output}))
+                jsonl.write("\n")
+
+            if not output_dir and not jsonl:
+                print(output, end='')
+
+    except (IOError, OSError) as e:
+        log.error("Couldn't write batch results: %s" % e)
+
+    finally:
+        if jsonl:
+            jsonl.close()
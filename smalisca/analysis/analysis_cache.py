@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         analysis/analysis_cache.py
+# Created:      2026-10-18
+# Purpose:      Cache query results between searches and sessions
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""LRU cache of query results
+
+Results are cached by their normalized query arguments. Every entry
+remembers the IDs of the found rows, so the cache can be written to disk
+and the rows loaded again by primary key in a later session. All entries
+are dropped as soon as the fingerprint of the database changes.
+
+"""
+
+import collections
+import hashlib
+import json
+import os
+
+import smalisca.core.smalisca_config as config
+from smalisca.core.smalisca_logging import log
+
+
+# Default max. number of cached queries
+QUERY_CACHE_SIZE = 256
+
+# Max. number of rows per cached query. Bigger results (e.g. whole
+# tables) would keep too many rows in memory.
+QUERY_CACHE_MAX_ROWS = 10000
+
+# Version of the cache file format
+CACHE_VERSION = 2
+
+
+def query_key(name, *args):
+    """Returns the cache key of a query
+
+    Query arguments are sorted by name and unset (None) arguments are
+    dropped, so equivalent queries share one entry.
+
+    Args:
+        name (str): Name of the search method
+        args: Arguments of the search method
+
+    Returns:
+        tuple: Hashable key
+
+    """
+    values = []
+    for a in args:
+        if isinstance(a, dict):
+            a = tuple(sorted(
+                (k, tuple(v) if isinstance(v, list) else v)
+                for k, v in a.items() if v is not None))
+        values.append(a)
+    return (name,) + tuple(values)
+
+
+def to_tuple(value):
+    """Converts lists (read from JSON) to tuples recursively"""
+    if isinstance(value, list):
+        return tuple(to_tuple(v) for v in value)
+    return value
+
+
+def cache_filename(path):
+    """Returns the default cache file of a database
+
+    Args:
+        path (str): Database file
+
+    Returns:
+        str: Cache file in the user's cache directory
+
+    """
+    name = hashlib.sha1(os.path.realpath(path).encode('utf-8')).hexdigest()
+    return os.path.join(config.PROJECT_CACHE_DIR, name + '.json')
+
+
+class QueryCache(object):
+    """Size-bounded LRU cache of query results
+
+    Attributes:
+        fingerprint (func): Returns the current fingerprint of the database
+        size (int): Max. number of entries
+        filename (str): Cache file, None if not persisted
+        entries (OrderedDict): Entries by key, least recently used first
+        hits (int): Number of queries answered by the cache
+        misses (int): Number of queries not in the cache
+        loads (int): Number of hits whose rows had to be loaded by ID
+            (entries read from the cache file)
+        invalidations (int): Number of times the cache was dropped
+
+    """
+
+    def __init__(self, fingerprint, size=QUERY_CACHE_SIZE, filename=None):
+        """Creates the cache, reads entries from filename if possible
+
+        Args:
+            fingerprint (func): Returns the current fingerprint of the database
+            size (int): Max. number of entries
+            filename (str): Cache file, None if not persisted
+
+        """
+        self.fingerprint = fingerprint
+        self.size = size
+        self.filename = filename
+        self.entries = collections.OrderedDict()
+        self.current = fingerprint()
+
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.invalidations = 0
+
+        if filename:
+            self.load()
+
+    def validate(self):
+        """Drops all entries if the database has changed"""
+        fingerprint = self.fingerprint()
+        if fingerprint != self.current:
+            if self.entries:
+                log.info("Database has changed, dropping query cache")
+                self.invalidations += 1
+            self.entries.clear()
+            self.current = fingerprint
+
+    def clear(self):
+        """Drops all entries"""
+        if self.entries:
+            self.invalidations += 1
+        self.entries.clear()
+
+    def get(self, key, materialize):
+        """Returns a cached entry
+
+        Args:
+            key (tuple): Query key (see :func:`query_key`)
+            materialize (func): materialize(table, ids) returns the rows
+                of an entry read from the cache file
+
+        Returns:
+            dict: 'rows', 'total', 'depth' and 'more' of the results or None
+
+        """
+        self.validate()
+
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry['rows'] is None:
+            entry['rows'] = materialize(entry['table'], entry['ids'])
+            self.loads += 1
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, results):
+        """Adds results, drops the least recently used entry if necessary
+
+        Results with more than QUERY_CACHE_MAX_ROWS rows are not cached.
+
+        Args:
+            key (tuple): Query key (see :func:`query_key`)
+            results (list): Found rows (may provide 'total' and 'depth')
+
+        """
+        if len(results) > QUERY_CACHE_MAX_ROWS:
+            return
+
+        # Rows are loaded again by ID, projected rows (tuples) only know
+        # their table by the results
+        table = getattr(results, 'table', None)
+        ids = []
+        if results:
+            table = table or getattr(results[0], '__tablename__', None)
+            ids = [r.id for r in results] if table else None
+
+        self.entries[key] = {
+            'table': table,
+            'ids': ids,
+            'total': getattr(results, 'total', len(results)),
+            'depth': getattr(results, 'depth', None),
+            'more': getattr(results, 'more', False),
+            'rows': list(results)
+        }
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def load(self):
+        """Reads entries from the cache file
+
+        Entries of another database state are ignored.
+
+        """
+        try:
+            with open(self.filename, 'r') as f:
+                data = json.load(f)
+
+        except IOError:
+            return
+
+        except ValueError:
+            log.warn("Ignoring invalid query cache %s" % self.filename)
+            return
+
+        if data.get('version') != CACHE_VERSION or \
+                to_tuple(data.get('fingerprint')) != self.current:
+            log.info("Query cache %s is outdated" % self.filename)
+            return
+
+        for key, table, ids, total, depth, more in data['entries'][-self.size:]:
+            if depth is not None:
+                depth = dict((int(k), v) for k, v in depth.items())
+
+            self.entries[to_tuple(key)] = {
+                'table': table, 'ids': ids, 'total': total,
+                'depth': depth, 'more': more, 'rows': None}
+
+        log.info("Read %d cached queries from %s" % (len(self.entries), self.filename))
+
+    def save(self):
+        """Writes entries (without rows) to the cache file"""
+        if not self.filename:
+            return
+
+        data = {
+            'version': CACHE_VERSION,
+            'fingerprint': self.current,
+            'entries': [
+                (key, e['table'], e['ids'], e['total'], e['depth'], e['more'])
+                for key, e in self.entries.items() if e['ids'] is not None]
+        }
+
+        try:
+            dirname = os.path.dirname(self.filename)
+            if dirname and not os.path.isdir(dirname):
+                os.makedirs(dirname)
+
+            # Analyzers sharing a DB share its cache file, replace it atomically
+            tmp = "%s.%d" % (self.filename, os.getpid())
+            with open(tmp, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp, self.filename)
+
+        except (IOError, OSError) as e:
+            log.warn("Couldn't save query cache to %s: %s" % (self.filename, e))
+
+    def stats(self):
+        """Returns cache statistics
+
+        Returns:
+            dict: 'entries', 'size', 'hits', 'misses', 'loads',
+            'invalidations' and 'filename'
+
+        """
+        return {
+            'entries': len(self.entries),
+            'size': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'loads': self.loads,
+            'invalidations': self.invalidations,
+            'filename': self.filename
+        }
@@ -0,0 +1,584 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         analysis/analysis_callgraph.py
+# Created:      2026-10-18
+# Purpose:      Resident call graph used by graph queries
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""Compact in-memory call graph
+
+Methods are numbered by integer IDs. Calls between them are kept in
+CSR (compressed sparse row) arrays: for every method the calls it makes
+(forward) and the calls it receives (reverse) are stored as consecutive
+ranges of a single array.
+
+"""
+
+import array
+import time
+
+from smalisca.analysis.analysis_search import MATCH_CONTAINS, match_value
+from smalisca.core.smalisca_logging import log
+
+
+# Call columns describing an edge: calling method, called method
+EDGE_FIELDS = ('from_class', 'from_method', 'from_args',
+               'dst_class', 'dst_method', 'dst_args')
+
+# Cross-reference directions: (follow calls received by a method,
+# attributes of a call identifying the method to continue with)
+XREF_DIRECTIONS = {
+    'to': (True, ('from_class', 'from_method', 'from_args')),
+    'from': (False, ('dst_class', 'dst_method', 'dst_args'))
+}
+
+# Columns of method metrics (see :meth:`CallGraphIndex.metrics`)
+METHOD_METRICS = ('method_class', 'method_name', 'method_args', 'fan_in', 'fan_out',
+                  'scc', 'scc_size', 'recursive')
+
+# Columns of class metrics
+CLASS_METRICS = ('class_name', 'methods', 'fan_in', 'fan_out', 'coupling')
+
+
+def csr(keys, n):
+    """Groups positions of keys by key
+
+    Args:
+        keys (array): Key (0 <= key < n) of every position
+        n (int): Number of keys
+
+    Returns:
+        tuple: (offsets, positions). The positions of key k are
+        positions[offsets[k]:offsets[k + 1]], in ascending order.
+
+    """
+    offsets = [0] * (n + 1)
+    for k in keys:
+        offsets[k + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+
+    fill = offsets[:-1]
+    positions = array.array('I', bytes(4 * len(keys)))
+    for pos, k in enumerate(keys):
+        positions[fill[k]] = pos
+        fill[k] += 1
+
+    return array.array('I', offsets), positions
+
+
+class CallGraphIndex(object):
+    """Call graph over all calls of an application
+
+    Attributes:
+        nodes (list): Method (class, name, args) by method ID
+        node_ids (dict): Method ID by method
+        classes (list): Class name by class ID
+        class_ids (dict): Class ID by class name
+        with_args (bool): False if calls don't know the arguments of
+            their calling method (databases of older versions). Methods
+            are then identified by class and name only.
+        edge_call (array): Call ID by edge
+        edge_src (array): Calling method by edge
+        edge_dst (array): Called method by edge
+
+    """
+
+    def __init__(self, edges):
+        """Builds the graph
+
+        Args:
+            edges (iterable): Tuples of call ID and the EDGE_FIELDS
+                values, ordered by call ID
+
+        """
+        self.nodes = []
+        self.node_ids = {}
+        self.classes = []
+        self.class_ids = {}
+        self.with_args = True
+
+        self.edge_call = array.array('I')
+        self.edge_src = array.array('I')
+        self.edge_dst = array.array('I')
+
+        edges = list(edges)
+        if any(e[3] is None for e in edges):
+            self.with_args = False
+
+        for e in edges:
+            self.edge_call.append(e[0])
+            self.edge_src.append(self.add_node(e[1], e[2], e[3]))
+            self.edge_dst.append(self.add_node(e[4], e[5], e[6]))
+
+        # Class of every method
+        self.node_class = array.array('I', [self.class_ids[n[0]] for n in self.nodes])
+
+        # CSR arrays
+        n = len(self.nodes)
+        self.out_offsets, self.out_edges = csr(self.edge_src, n)
+        self.in_offsets, self.in_edges = csr(self.edge_dst, n)
+        self.class_offsets, self.class_nodes = csr(self.node_class, len(self.classes))
+
+        log.info("Call graph: %d methods, %d classes, %d calls" % (
+            n, len(self.classes), len(self.edge_call)))
+
+    def key(self, class_name, method, args):
+        """Returns method key"""
+        return (class_name, method, args if self.with_args else None)
+
+    def add_node(self, class_name, method, args):
+        """Returns ID of method, adds it if necessary"""
+        key = self.key(class_name, method, args)
+        node = self.node_ids.get(key)
+        if node is None:
+            node = self.node_ids[key] = len(self.nodes)
+            self.nodes.append(key)
+
+            if class_name not in self.class_ids:
+                self.class_ids[class_name] = len(self.classes)
+                self.classes.append(class_name)
+
+        return node
+
+    def node(self, class_name, method, args):
+        """Returns ID of method or None"""
+        return self.node_ids.get(self.key(class_name, method, args))
+
+    def calls_to(self, node):
+        """Returns edges calling method node"""
+        return self.in_edges[self.in_offsets[node]:self.in_offsets[node + 1]]
+
+    def calls_from(self, node):
+        """Returns edges called by method node"""
+        return self.out_edges[self.out_offsets[node]:self.out_offsets[node + 1]]
+
+    def class_methods(self, class_id):
+        """Returns methods of class class_id"""
+        return self.class_nodes[self.class_offsets[class_id]:self.class_offsets[class_id + 1]]
+
+    def xref(self, calls, xref_type, max_depth=1, precise=False):
+        """Follows cross-references breadth first
+
+        Every class (or method if precise) is expanded at most once, so
+        cycles terminate and no call is returned twice.
+
+        Args:
+            calls (list): Calls to start from
+            xref_type (str): Direction ('to' or 'from')
+            max_depth (int): How many times to follow the xrefs
+            precise (bool): Follow methods instead of classes
+
+        Returns:
+            tuple: (list of call IDs ordered by depth, dict of depth by call ID)
+
+        """
+        incoming, attrs = XREF_DIRECTIONS[xref_type]
+        edges_of = self.calls_to if incoming else self.calls_from
+        next_node = self.edge_src if incoming else self.edge_dst
+
+        # Start with methods (or classes) of the given calls
+        frontier = set()
+        for c in calls:
+            node = self.node(*[getattr(c, a) for a in attrs])
+            if node is not None:
+                frontier.add(node if precise else self.node_class[node])
+
+        depth = {}
+        found = []
+        visited = set()
+
+        for d in range(1, (max_depth or 1) + 1):
+            frontier -= visited
+            if not frontier:
+                break
+
+            visited |= frontier
+            level = []
+            for unit in frontier:
+                for node in ([unit] if precise else self.class_methods(unit)):
+                    level.extend(edges_of(node))
+
+            # Edges are numbered in call ID order
+            level.sort()
+            frontier = set()
+            for e in level:
+                depth[self.edge_call[e]] = d
+                found.append(self.edge_call[e])
+                node = next_node[e]
+                frontier.add(node if precise else self.node_class[node])
+
+            log.info("Depth:\t%d\tResults:\t%d" % (d, len(level)))
+
+        return found, depth
+
+    def find_nodes(self, class_pattern=None, method_pattern=None, match=MATCH_CONTAINS):
+        """Returns methods matching class and method pattern
+
+        Args:
+            class_pattern (str): Class pattern (None matches every class)
+            method_pattern (str): Method pattern (None matches every method)
+            match (str): Match mode
+
+        Returns:
+            set: Method IDs
+
+        """
+        return set(
+            node for node, (class_name, method, _) in enumerate(self.nodes)
+            if (not class_pattern or match_value(class_pattern, class_name, match)) and
+            (not method_pattern or match_value(method_pattern, method, match)))
+
+    def expand(self, frontier, dist, other, d, forward):
+        """Expands one BFS level of a bidirectional search
+
+        Args:
+            frontier (set): Methods found at distance d - 1
+            dist (dict): Distances of this search, updated
+            other (dict): Distances of the opposite search
+            d (int): Distance of the new level
+            forward (bool): Follow calls forward
+
+        Returns:
+            tuple: (next level, length of the shortest path over a
+            method known by both searches or None)
+
+        """
+        edges_of = self.calls_from if forward else self.calls_to
+        next_node = self.edge_dst if forward else self.edge_src
+
+        level = set()
+        shortest = None
+        for node in frontier:
+            for e in edges_of(node):
+                n = next_node[e]
+                if n in other and (shortest is None or d + other[n] < shortest):
+                    shortest = d + other[n]
+                if n not in dist:
+                    dist[n] = d
+                    level.add(n)
+        return level, shortest
+
+    def shortest_paths(self, sources, sinks, k=1, max_depth=10, timeout=None):
+        """Finds the k shortest call paths from sources to sinks
+
+        A bidirectional BFS finds the length of the shortest path. Paths
+        are then enumerated by increasing length. Methods which can't
+        reach a sink within the remaining length are skipped, using the
+        distances found by the backward search.
+
+        Args:
+            sources (set): Method IDs to start from
+            sinks (set): Method IDs to reach
+            k (int): Max. number of paths
+            max_depth (int): Max. number of calls per path
+            timeout (float): Max. seconds to search (None for no limit)
+
+        Returns:
+            list: Paths as lists of edges, shortest first
+
+        """
+        deadline = time.time() + timeout if timeout else None
+        if not sources or not sinks:
+            return []
+
+        # - Bidirectional BFS ------------------------------------------------
+        dist_from = dict.fromkeys(sources, 0)
+        dist_to = dict.fromkeys(sinks, 0)
+        front_from, front_to = set(sources), set(sinks)
+        depth_from = depth_to = 0
+        shortest = None
+
+        while front_from and front_to and depth_from + depth_to < max_depth:
+            if deadline and time.time() > deadline:
+                log.warn("Path search timed out")
+                return []
+
+            # Expand the smaller frontier
+            if len(front_from) <= len(front_to):
+                depth_from += 1
+                front_from, shortest = self.expand(
+                    front_from, dist_from, dist_to, depth_from, True)
+            else:
+                depth_to += 1
+                front_to, shortest = self.expand(
+                    front_to, dist_to, dist_from, depth_to, False)
+
+            if shortest is not None:
+                break
+
+        if shortest is None:
+            return []
+
+        # - Enumerate paths by length ----------------------------------------
+        # Methods not reached by the backward search are further away
+        unknown = depth_to + 1
+        paths = []
+        path = []
+        on_path = set()
+
+        def walk(node, remaining):
+            """Extends path by remaining calls, returns False on timeout"""
+            if remaining == 0:
+                if node in sinks:
+                    paths.append(list(path))
+                return True
+
+            # Paths end at the first sink
+            if node in sinks and path:
+                return True
+
+            if deadline and time.time() > deadline:
+                return False
+
+            on_path.add(node)
+            for e in self.calls_from(node):
+                n = self.edge_dst[e]
+                if n in on_path or dist_to.get(n, unknown) > remaining - 1:
+                    continue
+
+                path.append(e)
+                done = walk(n, remaining - 1)
+                path.pop()
+
+                if not done:
+                    on_path.discard(node)
+                    return False
+                if len(paths) >= k:
+                    break
+            on_path.discard(node)
+            return True
+
+        for length in range(max(shortest, 1), max_depth + 1):
+            for s in sorted(sources):
+                if dist_to.get(s, unknown) > length:
+                    continue
+                if not walk(s, length):
+                    log.warn("Path search timed out")
+                    return paths
+                if len(paths) >= k:
+                    return paths
+
+        return paths
+
+    def callers(self, nodes):
+        """Returns methods calling any of nodes"""
+        return set(self.edge_src[e] for node in nodes for e in self.calls_to(node))
+
+    def reachable(self, nodes):
+        """Returns methods reachable from nodes (including nodes)
+
+        Every method and call is visited at most once.
+
+        Args:
+            nodes (iterable): Method IDs to start from
+
+        Returns:
+            set: Method IDs
+
+        """
+        reached = set(nodes)
+        stack = list(reached)
+        while stack:
+            for e in self.calls_from(stack.pop()):
+                n = self.edge_dst[e]
+                if n not in reached:
+                    reached.add(n)
+                    stack.append(n)
+        return reached
+
+    def reach(self, sources, sinks, max_depth=None):
+        """Finds which sources reach which sinks
+
+        All sources are followed at once: every method carries a bitset
+        of the sources reaching it. A source reaches a sink if a method
+        calling the source (transitively) calls the sink.
+
+        Args:
+            sources (list): Sets of method IDs, one per source
+            sinks (list): Sets of method IDs, one per sink
+            max_depth (int): Max. number of calls from a method calling
+                the source to the sink (None for no limit)
+
+        Returns:
+            set: Pairs of (source index, sink index)
+
+        """
+        frontier = {}
+        for i, nodes in enumerate(sources):
+            for node in self.callers(nodes):
+                frontier[node] = frontier.get(node, 0) | (1 << i)
+
+        reached = {}
+        d = 0
+        while frontier and (max_depth is None or d <= max_depth):
+            next_frontier = {}
+            for node, bits in frontier.items():
+                # Only propagate sources not seen at this method yet
+                new = bits & ~reached.get(node, 0)
+                if not new:
+                    continue
+
+                reached[node] = reached.get(node, 0) | new
+                for e in self.calls_from(node):
+                    n = self.edge_dst[e]
+                    next_frontier[n] = next_frontier.get(n, 0) | new
+
+            frontier = next_frontier
+            d += 1
+
+        log.info("Reachability: %d methods reached in %d steps" % (len(reached), d))
+
+        pairs = set()
+        for j, nodes in enumerate(sinks):
+            bits = 0
+            for node in nodes:
+                bits |= reached.get(node, 0)
+
+            for i in range(len(sources)):
+                if bits >> i & 1:
+                    pairs.add((i, j))
+
+        return pairs
+
+    def components(self):
+        """Finds the strongly connected components (Tarjan)
+
+        The depth-first search is iterative, so deep call chains don't
+        hit the recursion limit. Every method and call is visited once.
+
+        Returns:
+            array: Component ID by method ID. Callees get lower IDs than
+            their callers unless both are in the same component.
+
+        """
+        n = len(self.nodes)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        component = array.array('I', bytes(4 * n))
+        stack = []
+        counter = 0
+        count = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [[root, self.out_offsets[root]]]
+
+            while work:
+                node, i = work[-1]
+
+                # Next call of node
+                if i < self.out_offsets[node + 1]:
+                    work[-1][1] = i + 1
+                    dst = self.edge_dst[self.out_edges[i]]
+                    if index[dst] == -1:
+                        index[dst] = low[dst] = counter
+                        counter += 1
+                        stack.append(dst)
+                        on_stack[dst] = True
+                        work.append([dst, self.out_offsets[dst]])
+                    elif on_stack[dst] and index[dst] < low[node]:
+                        low[node] = index[dst]
+                    continue
+
+                # All calls done
+                work.pop()
+                if work and low[node] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[node]
+
+                if low[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = count
+                        if member == node:
+                            break
+                    count += 1
+
+        log.info("Call graph: %d strongly connected components" % count)
+        return component
+
+    def metrics(self):
+        """Computes call graph metrics in linear time
+
+        Method metrics:
+            fan_in/fan_out: Number of distinct calling/called methods
+            scc/scc_size: Strongly connected component and its size
+            recursive: 1 if the method is part of a call cycle
+
+        Class metrics:
+            methods: Number of methods in the call graph
+            fan_in/fan_out: Number of distinct other classes calling
+                the class/called by the class
+            coupling: Number of distinct classes coupled either way
+
+        Returns:
+            tuple: (method metrics, class metrics) as lists of tuples
+            holding the METHOD_METRICS and CLASS_METRICS values
+
+        """
+        component = self.components()
+        sizes = {}
+        for c in component:
+            sizes[c] = sizes.get(c, 0) + 1
+
+        methods = []
+        for node, (class_name, method, args) in enumerate(self.nodes):
+            callers = set(self.edge_src[e] for e in self.calls_to(node))
+            callees = set(self.edge_dst[e] for e in self.calls_from(node))
+            size = sizes[component[node]]
+            methods.append((
+                class_name, method, args, len(callers), len(callees),
+                component[node], size, int(size > 1 or node in callers)))
+
+        # Calls between different classes
+        class_in = [set() for _ in self.classes]
+        class_out = [set() for _ in self.classes]
+        for src, dst in zip(self.edge_src, self.edge_dst):
+            src_class = self.node_class[src]
+            dst_class = self.node_class[dst]
+            if src_class != dst_class:
+                class_out[src_class].add(dst_class)
+                class_in[dst_class].add(src_class)
+
+        classes = []
+        for class_id, class_name in enumerate(self.classes):
+            classes.append((
+                class_name,
+                self.class_offsets[class_id + 1] - self.class_offsets[class_id],
+                len(class_in[class_id]), len(class_out[class_id]),
+                len(class_in[class_id] | class_out[class_id])))
+
+        return methods, classes
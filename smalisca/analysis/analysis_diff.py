@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         analysis/analysis_diff.py
+# Created:      2026-10-18
+# Purpose:      Structural diff between two parsed applications
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""Structural diff between two parsed applications
+
+Both applications are read table by table (see
+:meth:`smalisca.analysis.analysis_base.AnalysisBase.table_values`), so
+any analyzer (SQLite, JSON, snapshot) can be diffed against any other.
+
+Every class gets a content hash over its type, parent, properties,
+const-strings and methods. Every method gets a hash over its type and
+the calls it makes. Classes with equal hashes are skipped, only the
+members of changed classes are compared. Registers and the order of
+members are ignored, so recompiling an unchanged class doesn't show up.
+
+Members of added and removed classes aren't listed separately.
+
+"""
+
+import hashlib
+import json
+
+from prettytable import PrettyTable
+
+from smalisca.analysis.analysis_scanner import call_descriptor
+from smalisca.core.smalisca_logging import log
+
+
+# Diff sections and the columns of their entries
+DIFF_SECTIONS = (
+    ('classes', ('class_name',)),
+    ('properties', ('class_name', 'property')),
+    ('methods', ('class_name', 'method')),
+    ('calls', ('class_name', 'method', 'call')),
+    ('strings', ('class_name', 'value')),
+)
+
+# Kinds of changes
+DIFF_ADDED = 'added'
+DIFF_REMOVED = 'removed'
+DIFF_CHANGED = 'changed'
+
+
+def digest(values):
+    """Returns an order independent hash of a set of values"""
+    return hashlib.sha1(repr(sorted(values)).encode('utf-8')).digest()
+
+
+def method_signature(name, args, ret=None):
+    """Returns the signature of a method ('<name>(<args>)<return>')"""
+    return "%s(%s)%s" % (name, args or '', ret or '')
+
+
+class ClassDigest(object):
+    """Content of a class as compared by the diff
+
+    Attributes:
+        info (tuple): Class type and parent
+        properties (set): Property descriptors
+        strings (set): Const-string values
+        methods (dict): Method hashes by signature
+        calls (set): (caller signature, call descriptor) tuples
+        hash (bytes): Content hash, set by :meth:`finish`
+
+    """
+    __slots__ = ('info', 'properties', 'strings', 'methods', 'calls', 'hash')
+
+    def __init__(self, info):
+        self.info = info
+        self.properties = set()
+        self.strings = set()
+        self.methods = {}
+        self.calls = set()
+        self.hash = None
+
+    def finish(self, method_types, method_calls):
+        """Computes the method and class hashes
+
+        Args:
+            method_types (dict): Method type by signature
+            method_calls (dict): Call descriptors by caller signature
+                (name and arguments only, calls don't know the return type)
+
+        """
+        for sig, (caller, method_type) in method_types.items():
+            self.methods[sig] = digest(
+                [method_type] + list(method_calls.get(caller, ())))
+
+        h = hashlib.sha1(repr(self.info).encode('utf-8'))
+        h.update(digest(self.properties))
+        h.update(digest(self.strings))
+        h.update(digest(self.methods.items()))
+        h.update(digest(self.calls))
+        self.hash = h.digest()
+
+
+def class_digests(analysis):
+    """Reads all classes of an analyzer
+
+    Args:
+        analysis (AnalysisBase): Analyzer to read from
+
+    Returns:
+        dict: :class:`ClassDigest` by class name
+
+    """
+    classes = {}
+    for _, name, class_type, parent in analysis.table_values(
+            'classes', ('class_name', 'class_type', 'class_parent')):
+        classes[name] = ClassDigest((class_type, parent))
+
+    def get(name):
+        # Members of unknown classes get a class of their own
+        if name not in classes:
+            classes[name] = ClassDigest((None, None))
+        return classes[name]
+
+    for _, cls, name, ptype, info in analysis.table_values(
+            'properties', ('property_class', 'property_name', 'property_type', 'property_info')):
+        get(cls).properties.add("%s:%s %s" % (name, ptype or '', info or ''))
+
+    for _, cls, value in analysis.table_values(
+            'const_strings', ('const_string_class', 'const_string_value')):
+        get(cls).strings.add(value)
+
+    method_types = {}
+    for _, cls, name, args, ret, method_type in analysis.table_values(
+            'methods', ('method_class', 'method_name', 'method_args', 'method_ret', 'method_type')):
+        get(cls)
+        method_types.setdefault(cls, {})[method_signature(name, args, ret)] = (
+            method_signature(name, args), method_type or '')
+
+    method_calls = {}
+    for _, cls, name, args, dst_class, dst_method, dst_args, ret in analysis.table_values(
+            'calls', ('from_class', 'from_method', 'from_args',
+                      'dst_class', 'dst_method', 'dst_args', 'ret')):
+        caller = method_signature(name, args)
+        call = call_descriptor(dst_class, dst_method, dst_args, ret)
+        get(cls).calls.add((caller, call))
+        method_calls.setdefault(cls, {}).setdefault(caller, set()).add(call)
+
+    for name, c in classes.items():
+        c.finish(method_types.get(name, {}), method_calls.get(name, {}))
+
+    return classes
+
+
+def diff_sets(old, new, make, section):
+    """Adds added and removed entries of two sets to section"""
+    section[DIFF_ADDED].extend(sorted(make(v) for v in new - old))
+    section[DIFF_REMOVED].extend(sorted(make(v) for v in old - new))
+
+
+def diff(old, new):
+    """Compares two applications
+
+    Args:
+        old (AnalysisBase): Analyzer of the old version
+        new (AnalysisBase): Analyzer of the new version
+
+    Returns:
+        dict: Diff sections (see :data:`DIFF_SECTIONS`) with lists of
+            'added', 'removed' and 'changed' entries (tuples of the
+            section columns), 'unchanged' holds the number of unchanged classes
+
+    """
+    log.info("Hashing old version ...")
+    old_classes = class_digests(old)
+    log.info("Hashing new version ...")
+    new_classes = class_digests(new)
+
+    result = dict(
+        (name, {DIFF_ADDED: [], DIFF_REMOVED: [], DIFF_CHANGED: []})
+        for name, _ in DIFF_SECTIONS)
+
+    old_names = set(old_classes)
+    new_names = set(new_classes)
+    diff_sets(old_names, new_names, lambda c: (c,), result['classes'])
+
+    # Only classes with different hashes are compared in detail
+    changed = sorted(
+        name for name in old_names & new_names
+        if old_classes[name].hash != new_classes[name].hash)
+    result['unchanged'] = len(old_names & new_names) - len(changed)
+
+    for name in changed:
+        o, n = old_classes[name], new_classes[name]
+        result['classes'][DIFF_CHANGED].append((name,))
+
+        diff_sets(o.properties, n.properties, lambda p: (name, p), result['properties'])
+        diff_sets(o.strings, n.strings, lambda s: (name, s), result['strings'])
+        diff_sets(o.calls, n.calls, lambda c: (name,) + c, result['calls'])
+
+        old_methods, new_methods = set(o.methods), set(n.methods)
+        diff_sets(old_methods, new_methods, lambda m: (name, m), result['methods'])
+        result['methods'][DIFF_CHANGED].extend(
+            (name, m) for m in sorted(old_methods & new_methods)
+            if o.methods[m] != n.methods[m])
+
+    return result
+
+
+def print_diff(result, summary=False):
+    """Prints a diff
+
+    Args:
+        result (dict): Diff as returned by :func:`diff`
+        summary (bool): Only print the number of changes
+
+    """
+    kinds = (DIFF_ADDED, DIFF_REMOVED, DIFF_CHANGED)
+
+    x = PrettyTable(['section'] + list(kinds))
+    x.align = 'l'
+    for name, _ in DIFF_SECTIONS:
+        x.add_row([name] + [len(result[name][k]) for k in kinds])
+    print(x)
+    print("Unchanged classes: %d" % result['unchanged'])
+
+    if summary:
+        return
+
+    for name, columns in DIFF_SECTIONS:
+        entries = [(k,) + e for k in kinds for e in result[name][k]]
+        if entries:
+            print("\n[--] %s" % name)
+            x = PrettyTable(['change'] + list(columns))
+            x.align = 'l'
+            for e in entries:
+                x.add_row(e)
+            print(x)
+
+
+def write_diff(result, filename):
+    """Writes a diff as JSON
+
+    Args:
+        result (dict): Diff as returned by :func:`diff`
+        filename (str): Output file
+
+    """
+    data = {'unchanged': result['unchanged']}
+    for name, columns in DIFF_SECTIONS:
+        data[name] = dict(
+            (k, [dict(zip(columns, e)) for e in entries])
+            for k, entries in result[name].items())
+
+    try:
+        with open(filename, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    except IOError:
+        log.error("Couldn't save diff to %s" % filename)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         analysis/analysis_entrypoints.py
+# Created:      2026-10-18
+# Purpose:      Detect entry points of an application
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""Detect methods invoked by the Android framework
+
+Entry points are found in three ways:
+
+    * components declared in AndroidManifest.xml
+    * classes extending a framework type (e.g. Activity, even if not
+      declared, like fragments or async tasks)
+    * classes implementing a framework callback interface (e.g. Runnable
+      or View$OnClickListener), directly or through a super type
+
+Callback methods of these classes are entry points. Constructors only
+are if the framework creates the instances, i.e. for components and
+subclasses of INSTANTIATED_TYPES. Of interface implementations only
+the methods of the interface are entry points.
+
+"""
+
+import collections
+
+# Framework types whose subclasses are instantiated by the framework
+INSTANTIATED_TYPES = (
+    'Landroid/app/Activity',
+    'Landroid/app/Application',
+    'Landroid/app/Fragment',
+    'Landroid/app/IntentService',
+    'Landroid/app/Service',
+    'Landroid/app/job/JobService',
+    'Landroid/accessibilityservice/AccessibilityService',
+    'Landroid/content/BroadcastReceiver',
+    'Landroid/content/ContentProvider',
+    'Landroid/support/v4/app/Fragment',
+    'Landroid/support/v4/app/FragmentActivity',
+    'Landroid/support/v7/app/AppCompatActivity',
+    'Landroidx/appcompat/app/AppCompatActivity',
+    'Landroidx/fragment/app/Fragment',
+    'Landroidx/fragment/app/FragmentActivity',
+)
+
+# Framework types whose subclasses are called back by the framework
+FRAMEWORK_TYPES = INSTANTIATED_TYPES + (
+    'Landroid/app/Dialog',
+    'Landroid/os/AsyncTask',
+    'Landroid/os/Handler',
+    'Landroid/view/View',
+    'Landroid/webkit/WebChromeClient',
+    'Landroid/webkit/WebViewClient',
+    'Ljava/lang/Thread',
+)
+
+# Callback methods of interfaces called back by the framework
+FRAMEWORK_INTERFACES = {
+    'Landroid/content/ComponentCallbacks': ('onConfigurationChanged', 'onLowMemory'),
+    'Landroid/content/DialogInterface$OnCancelListener': ('onCancel',),
+    'Landroid/content/DialogInterface$OnClickListener': ('onClick',),
+    'Landroid/content/DialogInterface$OnDismissListener': ('onDismiss',),
+    'Landroid/content/ServiceConnection': ('onServiceConnected', 'onServiceDisconnected'),
+    'Landroid/content/SharedPreferences$OnSharedPreferenceChangeListener': (
+        'onSharedPreferenceChanged',),
+    'Landroid/hardware/SensorEventListener': ('onSensorChanged', 'onAccuracyChanged'),
+    'Landroid/location/LocationListener': (
+        'onLocationChanged', 'onStatusChanged', 'onProviderEnabled', 'onProviderDisabled'),
+    'Landroid/os/Handler$Callback': ('handleMessage',),
+    'Landroid/text/TextWatcher': ('beforeTextChanged', 'onTextChanged', 'afterTextChanged'),
+    'Landroid/view/MenuItem$OnMenuItemClickListener': ('onMenuItemClick',),
+    'Landroid/view/View$OnClickListener': ('onClick',),
+    'Landroid/view/View$OnFocusChangeListener': ('onFocusChange',),
+    'Landroid/view/View$OnKeyListener': ('onKey',),
+    'Landroid/view/View$OnLongClickListener': ('onLongClick',),
+    'Landroid/view/View$OnTouchListener': ('onTouch',),
+    'Landroid/widget/AdapterView$OnItemClickListener': ('onItemClick',),
+    'Landroid/widget/AdapterView$OnItemSelectedListener': (
+        'onItemSelected', 'onNothingSelected'),
+    'Landroid/widget/CompoundButton$OnCheckedChangeListener': ('onCheckedChanged',),
+    'Ljava/lang/Runnable': ('run',),
+    'Ljava/lang/Thread$UncaughtExceptionHandler': ('uncaughtException',),
+}
+
+FRAMEWORK_SUPERTYPES = frozenset(FRAMEWORK_TYPES).union(FRAMEWORK_INTERFACES)
+
+# Constructors
+CONSTRUCTORS = ('<init>', '<clinit>')
+
+# Callbacks not following the on<Event> naming
+CALLBACK_METHODS = CONSTRUCTORS + (
+    'run', 'doInBackground', 'handleMessage',
+    'query', 'insert', 'update', 'delete', 'getType',
+    'shouldOverrideUrlLoading',
+)
+
+
+def is_callback(method):
+    """Checks if method name looks like a framework callback"""
+    return method in CALLBACK_METHODS or (
+        method.startswith('on') and method[2:3].isupper())
+
+
+def framework_types(class_name, parents, interfaces=None):
+    """Returns the framework types class_name extends or implements
+
+    Super classes and interfaces are followed breadth-first, so the
+    nearest framework types come first.
+
+    Args:
+        class_name (str): Class name
+        parents (dict): Super class by class name
+        interfaces (dict): Implemented interfaces by class name
+
+    Returns:
+        list: Framework types, empty if the class doesn't extend or
+        implement one
+
+    """
+    interfaces = interfaces or {}
+    found = []
+    seen = set([class_name])
+    pending = collections.deque([class_name])
+
+    while pending:
+        name = pending.popleft()
+        for supertype in [parents.get(name)] + interfaces.get(name, []):
+            if not supertype or supertype in seen:
+                continue
+            seen.add(supertype)
+            if supertype in FRAMEWORK_SUPERTYPES:
+                found.append(supertype)
+            else:
+                pending.append(supertype)
+
+    return found
+
+
+def callback_reason(method, types):
+    """Returns the framework type calling method back, None if there's none
+
+    Args:
+        method (str): Method name
+        types (list): Framework types of the class (see :func:`framework_types`)
+
+    """
+    for t in types:
+        if t in FRAMEWORK_INTERFACES:
+            if method in FRAMEWORK_INTERFACES[t]:
+                return t
+        elif is_callback(method) and (method not in CONSTRUCTORS or t in INSTANTIATED_TYPES):
+            return t
+    return None
+
+
+def entry_points(parents, methods, components=(), interfaces=None):
+    """Finds entry points
+
+    Args:
+        parents (dict): Super class by class name
+        methods (iterable): Methods as (class, name, args) tuples
+        components (iterable): Classes declared in AndroidManifest.xml
+        interfaces (dict): Implemented interfaces by class name
+
+    Returns:
+        dict: Reason by entry point (class, name, args)
+
+    """
+    components = set(components)
+    types = {}
+    reasons = {}
+
+    for class_name, method, args in methods:
+        if class_name in components:
+            if is_callback(method):
+                reasons[(class_name, method, args)] = 'manifest'
+            continue
+
+        if class_name not in types:
+            types[class_name] = framework_types(class_name, parents, interfaces)
+
+        reason = callback_reason(method, types[class_name])
+        if reason:
+            reasons[(class_name, method, args)] = reason
+
+    return reasons
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         analysis/analysis_hierarchy.py
+# Created:      2026-10-18
+# Purpose:      Transitive closure of the class hierarchy
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""Transitive closure of the class hierarchy
+
+The hierarchy (super classes and implemented interfaces) is walked
+once per class and stored as (ancestor, descendant) pairs. Questions
+like "all sub classes of BroadcastReceiver" become a lookup of all rows
+of one ancestor instead of a walk over the hierarchy.
+
+"""
+
+
+# Columns of the closure rows (see :func:`hierarchy_closure`)
+HIERARCHY_FIELDS = ('ancestor', 'descendant', 'distance', 'kind')
+
+# Kinds of ancestors
+HIERARCHY_CLASS = 'class'
+HIERARCHY_INTERFACE = 'interface'
+
+
+def hierarchy_closure(parents, interfaces):
+    """Yields the ancestors of every class
+
+    Classes (e.g. framework classes) which haven't been parsed end
+    the walk. Cycles in broken inputs are ignored.
+
+    Args:
+        parents (dict): Super class by class name, ordered like the classes
+        interfaces (dict): Lists of implemented interfaces by class name
+
+    Yields:
+        tuple: HIERARCHY_FIELDS values, ordered by descendant and distance
+
+    """
+    def supertypes(name):
+        parent = parents.get(name)
+        return ([parent] if parent else []) + interfaces.get(name, [])
+
+    names = list(parents)
+    names.extend(n for n in interfaces if n not in parents)
+
+    for name in names:
+        # Super classes are the ancestors on the chain of parents
+        superclasses = set()
+        parent = parents.get(name)
+        while parent and parent != name and parent not in superclasses:
+            superclasses.add(parent)
+            parent = parents.get(parent)
+
+        # Breadth first, so the shortest distance is found first
+        distances = {}
+        frontier = [name]
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for c in frontier:
+                for s in supertypes(c):
+                    if s != name and s not in distances:
+                        distances[s] = distance
+                        next_frontier.append(s)
+            frontier = next_frontier
+
+        for s in sorted(distances, key=lambda s: (distances[s], s)):
+            yield (s, name, distances[s],
+                   HIERARCHY_CLASS if s in superclasses else HIERARCHY_INTERFACE)
@@ -32,34 +32,745 @@
 
 """Implement analysis interface for JSON"""
 
-from smalisca.analysis.analysis_base import AnalysisBase
+import bisect
+import collections
+import itertools
+
+from smalisca.analysis.analysis_base import AnalysisBase, Results, cap, window
+from smalisca.analysis.analysis_callgraph import METHOD_METRICS, CLASS_METRICS
+from smalisca.analysis.analysis_scanner import FINDING_FIELDS
+from smalisca.analysis.analysis_hierarchy import HIERARCHY_FIELDS
+from smalisca.analysis.analysis_search import MATCH_CONTAINS, MATCH_PREFIX, MATCH_REGEX, MATCH_TOKEN
+from smalisca.analysis.analysis_search import match_value, tokenize, valid_regex
+from smalisca.core.smalisca_logging import log
+from smalisca.modules.module_sql_models import SmaliClass, SmaliProperty, SmaliConstString
+from smalisca.modules.module_sql_models import SmaliMethod, SmaliCall
+
+
+class JSONRow(object):
+    """Lightweight row representing one entry of the parsed results
+
+    Rows expose the same attribute names as the SQL models
+    (:mod:`smalisca.modules.module_sql_models`). This way the analyzer
+    shell and the graph module can handle them like SQLite results.
+    Rows of tables with a SQL model print like the model does.
+
+    Attributes:
+        _fields (tuple): Column names of the row
+
+    """
+    __slots__ = ()
+    _fields = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self._fields, values):
+            setattr(self, field, value)
+
+    def to_string(self):
+        s = ":: ID: %d\n\n" % self.id
+        for f in self._fields[1:]:
+            s += "\t[+] %s: \t%s\n" % (f, getattr(self, f))
+        return s
+
+    def __str__(self):
+        return self.to_string()
+
+
+class JSONClass(JSONRow):
+    """Class row"""
+    _fields = ('id', 'class_name', 'class_type', 'class_package', 'depth', 'path',
+               'class_parent')
+    __slots__ = _fields + ('properties', 'const_strings', 'methods')
+    to_string = SmaliClass.to_string
+
+    def __init__(self, *values):
+        JSONRow.__init__(self, *values)
+        self.properties = []
+        self.const_strings = []
+        self.methods = []
+
+
+class JSONProperty(JSONRow):
+    """Property row"""
+    _fields = ('id', 'property_name', 'property_type', 'property_info', 'property_class')
+    __slots__ = _fields
+    to_string = SmaliProperty.to_string
+
+
+class JSONConstString(JSONRow):
+    """Const string row"""
+    _fields = ('id', 'const_string_var', 'const_string_value', 'const_string_class',
+               'const_string_kind')
+    __slots__ = _fields
+    to_string = SmaliConstString.to_string
+
+
+class JSONMethod(JSONRow):
+    """Method row"""
+    _fields = ('id', 'method_name', 'method_type', 'method_args', 'method_ret', 'method_class')
+    __slots__ = _fields
+    to_string = SmaliMethod.to_string
+
+
+class JSONCall(JSONRow):
+    """Call row"""
+    _fields = ('id', 'from_class', 'from_method', 'local_args',
+               'dst_class', 'dst_method', 'dst_args', 'ret', 'from_args')
+    __slots__ = _fields
+    to_string = SmaliCall.to_string
+
+
+class JSONInterface(JSONRow):
+    """Implemented interface row"""
+    _fields = ('id', 'class_name', 'interface_name')
+    __slots__ = _fields
+
+
+class JSONMethodMetric(JSONRow):
+    """Method metrics row"""
+    _fields = ('id',) + METHOD_METRICS
+    __slots__ = _fields
+
+
+class JSONClassMetric(JSONRow):
+    """Class metrics row"""
+    _fields = ('id',) + CLASS_METRICS
+    __slots__ = _fields
+
+
+class JSONFinding(JSONRow):
+    """Scanner finding row"""
+    _fields = ('id',) + FINDING_FIELDS
+    __slots__ = _fields
+
+
+class JSONHierarchy(JSONRow):
+    """Class hierarchy closure row"""
+    _fields = ('id',) + HIERARCHY_FIELDS
+    __slots__ = _fields
+
+
+# Row types by table name
+ROW_TYPES = {
+    'classes': JSONClass,
+    'properties': JSONProperty,
+    'const_strings': JSONConstString,
+    'methods': JSONMethod,
+    'calls': JSONCall,
+    'interfaces': JSONInterface,
+    'method_metrics': JSONMethodMetric,
+    'class_metrics': JSONClassMetric,
+    'findings': JSONFinding,
+    'hierarchy': JSONHierarchy
+}
+
+
+class FieldIndex(object):
+    """Hash and token prefix index over a single row field
+
+    Every distinct value is stored once and points to the positions
+    of the rows holding it. Exact lookups are plain dict lookups.
+    Token and prefix lookups bisect the sorted list of distinct tokens
+    (see :func:`smalisca.analysis.analysis_search.tokenize`), so only
+    values holding the first token of the pattern are checked.
+    Substring and regex lookups check every distinct value, which is
+    still much less than every row.
+
+    Attributes:
+        postings (dict): Maps field values to lists of row positions
+        keys (list): Distinct field values
+        tokens (dict): Maps tokens to the values holding them, built on
+            first token or prefix lookup
+        token_keys (list): Sorted list of distinct tokens
+
+    """
+
+    def __init__(self, values):
+        """Builds the index
+
+        Args:
+            values (iterable): Field value of every row, ordered by position
+
+        """
+        self.postings = {}
+        for pos, value in enumerate(values):
+            if value is not None:
+                self.postings.setdefault(value, []).append(pos)
+
+        self.keys = list(self.postings)
+        self.tokens = None
+        self.token_keys = None
+
+    def get(self, value):
+        """Returns row positions whose field equals value"""
+        return self.postings.get(value, [])
+
+    def build_tokens(self):
+        """Builds the token index"""
+        self.tokens = {}
+        for k in self.keys:
+            for t in set(tokenize(str(k))):
+                self.tokens.setdefault(t, []).append(k)
+        self.token_keys = sorted(self.tokens)
+
+    def token_candidates(self, token, prefix=False):
+        """Returns values holding token (or a token starting with it)"""
+        if self.tokens is None:
+            self.build_tokens()
+
+        if not prefix:
+            return self.tokens.get(token, [])
+
+        candidates = []
+        i = bisect.bisect_left(self.token_keys, token)
+        while i < len(self.token_keys) and self.token_keys[i].startswith(token):
+            candidates.extend(self.tokens[self.token_keys[i]])
+            i += 1
+        return candidates
+
+    def contains(self, pattern):
+        """Returns row positions whose field contains pattern (case insensitive)"""
+        pattern = pattern.lower()
+        positions = []
+        for k in self.keys:
+            if pattern in str(k).lower():
+                positions.extend(self.postings[k])
+        return positions
+
+    def match(self, pattern, match=None):
+        """Returns row positions whose field matches pattern
+
+        See :func:`smalisca.analysis.analysis_search.match_value` for
+        the available match modes.
+
+        """
+        if (match or MATCH_CONTAINS) == MATCH_CONTAINS:
+            return self.contains(pattern)
+
+        candidates = self.keys
+        if match in (MATCH_TOKEN, MATCH_PREFIX):
+            tokens = tokenize(pattern)
+            if not tokens:
+                return []
+
+            # Only the last token of the pattern may be a prefix
+            candidates = self.token_candidates(
+                tokens[0], match == MATCH_PREFIX and len(tokens) == 1)
+
+        positions = []
+        for k in set(candidates):
+            if match_value(pattern, str(k), match):
+                positions.extend(self.postings[k])
+        return positions
 
 
 class AnalyzerJSON(AnalysisBase):
     """Implement analysis interface for JSON
 
-    Not available at the moment.
+    The parsed results (see :class:`smalisca.core.smalisca_app.App`) are
+    flattened into lists of rows. Indexes on the searchable fields are
+    built on first use and kept for the whole session.
+
+    Attributes:
+        tables (dict): Lists of rows by table name
+        indexes (dict): Built :class:`FieldIndex` instances by (table, field)
 
     """
 
-    def __init__(self, db_session):
-        """Initiate class"""
-        self.db = db_session
+    # Searchable (indexed) fields of every table
+    search_fields = {
+        'classes': ('class_name', 'class_type', 'class_package', 'path'),
+        'properties': ('property_name', 'property_type', 'property_info', 'property_class'),
+        'const_strings': ('const_string_var', 'const_string_value', 'const_string_class',
+                          'const_string_kind'),
+        'methods': ('method_name', 'method_type', 'method_args', 'method_ret', 'method_class'),
+        'calls': ('from_class', 'from_method', 'local_args', 'dst_class', 'dst_method', 'dst_args'),
+        'method_metrics': ('method_class', 'method_name'),
+        'class_metrics': ('class_name',),
+        'interfaces': ('class_name', 'interface_name'),
+        'findings': ('rule', 'kind', 'class_name', 'method_name', 'value'),
+        'hierarchy': ('ancestor', 'descendant')
+    }
+
+    def __init__(self, app):
+        """Class constructor
+
+        Args:
+            app (App): A :class:`smalisca.core.smalisca_app.App` instance
+
+        """
+        self.tables = {
+            'classes': [],
+            'properties': [],
+            'const_strings': [],
+            'methods': [],
+            'calls': [],
+            'interfaces': []
+        }
+        self.indexes = {}
+        self.unreachable = {}
+        self.load(app)
+
+    def load(self, app):
+        """Creates rows from app
+
+        IDs are assigned in the same order the SQLite export
+        would assign them.
+
+        Args:
+            app (App): A :class:`smalisca.core.smalisca_app.App` instance
+
+        """
+        classes = {}
+        for c in app.iter_classes():
+            row = JSONClass(
+                len(self.tables['classes']) + 1, c['name'], c['type'],
+                c['package'], c['depth'], c['path'], c['parent'])
+            self.tables['classes'].append(row)
+            classes[c['name']] = row
+
+        for p in app.iter_properties():
+            row = JSONProperty(
+                len(self.tables['properties']) + 1, p['name'], p['type'],
+                p['info'], p['class'])
+            self.tables['properties'].append(row)
+            classes[p['class']].properties.append(row)
+
+        for cs in app.iter_const_strings():
+            row = JSONConstString(
+                len(self.tables['const_strings']) + 1, cs['name'], cs['value'],
+                cs['class'], cs['kind'])
+            self.tables['const_strings'].append(row)
+            classes[cs['class']].const_strings.append(row)
+
+        for m in app.iter_methods():
+            row = JSONMethod(
+                len(self.tables['methods']) + 1, m['name'], m['type'],
+                m['args'], m['return'], m['class'])
+            self.tables['methods'].append(row)
+            classes[m['class']].methods.append(row)
+
+        for c in app.iter_calls():
+            self.tables['calls'].append(JSONCall(
+                len(self.tables['calls']) + 1, c['from_class'], c['from_method'],
+                c['local_args'], c['to_class'], c['to_method'], c['dst_args'],
+                c['return'], c['from_args']))
+
+        for i in app.iter_interfaces():
+            self.tables['interfaces'].append(JSONInterface(
+                len(self.tables['interfaces']) + 1, i['class'], i['interface']))
+
+        log.info("Loaded %d classes, %d methods, %d calls" % (
+            len(self.tables['classes']), len(self.tables['methods']),
+            len(self.tables['calls'])))
+
+    def get_index(self, table, field):
+        """Returns the index of a table field, builds it if necessary
+
+        Args:
+            table (str): Table name
+            field (str): Field name
+
+        Returns:
+            FieldIndex: The index
+
+        """
+        key = (table, field)
+        if key not in self.indexes:
+            self.indexes[key] = FieldIndex(self.field_values(table, field))
+        return self.indexes[key]
+
+    def field_values(self, table, field):
+        """Returns field value of every table row"""
+        return (getattr(r, field) for r in self.tables[table])
+
+    def get_rows(self, table, positions):
+        """Returns rows at positions ordered by ID"""
+        rows = self.tables[table]
+        return [rows[p] for p in sorted(set(positions))]
+
+    def fetch(self, table, positions, args={}):
+        """Returns rows at positions, applies ordering and output range
+
+        Without a sort column only the requested range is materialized.
+        Rows are lightweight already, so 'columns' (projection) is ignored.
+
+        Args:
+            table (str): Table name
+            positions (iterable): Row positions
+            args (dict): Optional 'sortby' (column name), 'reverse' (bool),
+                'offset' and 'limit' (int), 'reachable' (bool, only
+                reachable or unreachable rows), 'recursive' (bool, only
+                methods in call cycles)
+
+        Returns:
+            Results: List of results, total number of matching rows in 'total'
+
+        """
+        # Reachability
+        if args.get('reachable') is not None and table in ('methods', 'calls'):
+            dead = self.unreachable.get(table, set())
+            positions = [p for p in positions if (p in dead) != args['reachable']]
+
+        # Call cycles
+        if args.get('recursive') and 'recursive' in ROW_TYPES[table]._fields:
+            rows = self.tables[table]
+            positions = [p for p in positions if rows[p].recursive]
+
+        sortby = args.get('sortby')
+        if sortby:
+            if sortby in ROW_TYPES[table]._fields:
+                return window(self.get_rows(table, positions), args)
+            log.error("Invalid sort column: %s" % sortby)
+
+        positions = sorted(set(positions), reverse=bool(args.get('reverse')))
+        offset = args.get('offset') or 0
+        limit = args.get('limit')
+        end = offset + limit if limit else None
+
+        rows = self.tables[table]
+        return Results([rows[p] for p in positions[offset:end]], len(positions))
+
+    def lookup_positions(self, table, fields, pattern, match=None):
+        """Returns positions of rows where any of fields matches pattern"""
+        if match == MATCH_REGEX and not valid_regex(pattern):
+            return []
+
+        positions = []
+        for f in fields:
+            positions.extend(self.get_index(table, f).match(pattern, match))
+        return positions
+
+    def lookup(self, table, fields, pattern, match=None):
+        """Returns rows where any of fields matches pattern
+
+        Args:
+            table (str): Table name
+            fields (list): Fields to lookup in
+            pattern (str): Pattern to lookup for
+            match (str): Match mode (contains, token, prefix)
+
+        Returns:
+            list: List of rows
+
+        """
+        return self.get_rows(
+            table, self.lookup_positions(table, fields, pattern, match))
+
+    def search_table(self, table, args):
+        """Searches a table by id or by column
+
+        Args:
+            table (str): Table name
+            args (dict): Specify a dict containing the search criterias
+
+        Returns:
+            list: List of any results, None otherwise.
+
+        """
+        rows = self.tables[table]
+
+        if ('type' not in args) or ('pattern' not in args):
+            return self.fetch(table, range(len(rows)), args)
+
+        if args['type'] == 'id':
+            pos = int(args['pattern']) - 1
+            return self.fetch(table, [pos] if 0 <= pos < len(rows) else [], args)
+
+        if args['type'] in self.search_fields[table]:
+            return self.fetch(table, self.lookup_positions(
+                table, [args['type']], args['pattern'], args.get('match')), args)
+
+        log.error("Invalid search type: %s" % args['type'])
+        return None
+
+    def search(self, args={}):
+        """Search globally for a certain pattern
+
+        Args:
+            args (dict): Specify a dict containing the search criterias,
+                optional 'limit' caps the results of every table
+
+        Returns:
+            dict: Returns a dict containing found classes, properties, methods, calls
+
+        """
+        table = args.get('table')
+        results = {
+            'classes': [],
+            'properties': [],
+            'consts': [],
+            'methods': []
+        }
+
+        if 'pattern' not in args:
+            log.error("No search pattern")
+            return results
+
+        pattern = args['pattern']
+        match = args.get('match')
+        limit = args.get('limit')
+        if table in ('class', None):
+            results['classes'] = cap(self.search_class_by_pattern(pattern, match), limit)
+        if table in ('property', None):
+            results['properties'] = cap(self.search_property_by_pattern(pattern, match), limit)
+        if table in ('const', None):
+            results['consts'] = cap(self.search_const_string_by_pattern(pattern, match), limit)
+        if table in ('method', None):
+            results['methods'] = cap(self.search_method_by_pattern(pattern, match), limit)
+        if table not in ('class', 'property', 'const', 'method', None):
+            log.error("Invalid table")
+
+        return results
+
+    def search_class(self, args={}):
+        """Searches for classes"""
+        return self.search_table('classes', args)
+
+    def search_class_by_pattern(self, pattern, match=None):
+        """Searches classes by specific pattern"""
+        return self.lookup('classes', self.search_fields['classes'], pattern, match)
+
+    def search_property(self, args={}):
+        """Searches for class properties"""
+        return self.search_table('properties', args)
+
+    def search_property_by_pattern(self, pattern, match=None):
+        """Searches properties by specific pattern"""
+        return self.lookup('properties', self.search_fields['properties'], pattern, match)
+
+    def search_const_string(self, args={}):
+        """Searches for const strings
+
+        Classifications (const_string_kind) only match exactly.
+
+        """
+        if args.get('type') == 'const_string_kind' and 'pattern' in args:
+            return self.fetch('const_strings', self.get_index(
+                'const_strings', 'const_string_kind').get(args['pattern']), args)
+        return self.search_table('const_strings', args)
+
+    def search_const_string_by_pattern(self, pattern, match=None):
+        """Searches const strings by specific pattern"""
+        return self.lookup('const_strings', self.search_fields['const_strings'], pattern, match)
+
+    def search_method(self, args={}):
+        """Searches for class methods"""
+        return self.search_table('methods', args)
+
+    def search_method_by_pattern(self, pattern, match=None):
+        """Searches methods by specific pattern"""
+        return self.lookup('methods', self.search_fields['methods'], pattern, match)
+
+    def search_call(self, args={}):
+        """Searches for calls
+
+        Every specified filter has to match (see
+        :meth:`smalisca.analysis.analysis_sqlite.AnalyzerSQLite.search_call`).
+
+        Args:
+            args (dict): Specify a dict containing the search criterias
+
+        Returns:
+            list: List of calls
+
+        """
+        filters = {
+            'from_class': 'from_class',
+            'from_method': 'from_method',
+            'to_class': 'dst_class',
+            'to_method': 'dst_method',
+            'local_args': 'local_args',
+            'dest_args': 'dst_args'
+        }
+
+        positions = None
+        for arg, field in filters.items():
+            if args.get(arg):
+                log.debug("%s = %s" % (arg, args[arg]))
+                if args.get('match') == MATCH_REGEX and not valid_regex(args[arg]):
+                    return []
+
+                found = set(self.get_index('calls', field).match(args[arg], args.get('match')))
+                positions = found if positions is None else positions & found
+
+        if positions is None:
+            positions = range(len(self.tables['calls']))
+
+        return self.fetch('calls', positions, args)
+
+    def get_calls_by_id(self, ids):
+        """Returns calls by ID in the given order"""
+        rows = self.tables['calls']
+        return [rows[i - 1] for i in ids]
+
+    def store_reachability(self, reachable):
+        """Remembers unreachable methods and calls
+
+        Args:
+            reachable (callable): reachable(class, method, args) returns
+                True if the method is reachable
+
+        Returns:
+            bool: True if stored
+
+        """
+        for table, fields in (
+                ('methods', ('method_class', 'method_name', 'method_args')),
+                ('calls', ('from_class', 'from_method', 'from_args'))):
+            self.unreachable[table] = set(
+                pos for pos, key in enumerate(
+                    zip(*[self.field_values(table, f) for f in fields]))
+                if not reachable(*key))
+        return True
+
+    def has_metrics(self):
+        """Returns True if call graph metrics have been computed"""
+        return 'class_metrics' in self.tables
+
+    def store_metrics(self, methods, classes):
+        """Keeps call graph metrics as tables
+
+        Args:
+            methods (list): Tuples of METHOD_METRICS values
+            classes (list): Tuples of CLASS_METRICS values
+
+        Returns:
+            bool: True if stored
+
+        """
+        for table, rows in (('method_metrics', methods), ('class_metrics', classes)):
+            self.tables[table] = [ROW_TYPES[table](i + 1, *r) for i, r in enumerate(rows)]
+            for key in [k for k in self.indexes if k[0] == table]:
+                del self.indexes[key]
+        return True
+
+    def search_metrics(self, table, args={}):
+        """Searches metrics ('method_metrics' or 'class_metrics')"""
+        return self.search_table(table, args)
+
+    def table_values(self, table, fields):
+        """Returns the ID and the fields values of all table rows"""
+        return zip(itertools.count(1), *[self.field_values(table, f) for f in fields])
+
+    def has_findings(self):
+        """Returns True if the rows have been scanned"""
+        return 'findings' in self.tables
+
+    def store_findings(self, findings):
+        """Keeps scanner findings as table
+
+        Args:
+            findings (list): Tuples of FINDING_FIELDS values
+
+        Returns:
+            bool: True if stored
+
+        """
+        self.tables['findings'] = [
+            JSONFinding(i + 1, *f) for i, f in enumerate(findings)]
+        for key in [k for k in self.indexes if k[0] == 'findings']:
+            del self.indexes[key]
+        return True
+
+    def search_findings(self, args={}):
+        """Searches scanner findings"""
+        return self.search_table('findings', args)
+
+    def has_hierarchy(self):
+        """Returns True if the class hierarchy closure has been built"""
+        return 'hierarchy' in self.tables
+
+    def store_hierarchy(self, rows):
+        """Keeps the class hierarchy closure as table
+
+        Args:
+            rows (list): Tuples of HIERARCHY_FIELDS values
+
+        Returns:
+            bool: True if stored
+
+        """
+        self.tables['hierarchy'] = [
+            JSONHierarchy(i + 1, *r) for i, r in enumerate(rows)]
+        for key in [k for k in self.indexes if k[0] == 'hierarchy']:
+            del self.indexes[key]
+        return True
+
+    def search_hierarchy(self, args={}):
+        """Searches the class hierarchy closure
+
+        Exact class names are plain lookups in the field index.
+
+        """
+        rows = self.tables['hierarchy']
+        positions = range(len(rows))
+
+        if 'pattern' in args:
+            column = args.get('type', 'ancestor')
+            if column not in self.search_fields['hierarchy']:
+                log.error("Invalid search type: %s" % column)
+                return None
+
+            if args.get('match'):
+                positions = self.lookup_positions(
+                    'hierarchy', [column], args['pattern'], args['match'])
+            else:
+                positions = self.get_index('hierarchy', column).get(args['pattern'])
+
+        if args.get('direct'):
+            positions = [p for p in positions if rows[p].distance == 1]
+
+        if args.get('kind'):
+            positions = [p for p in positions if rows[p].kind == args['kind']]
+
+        return self.fetch('hierarchy', positions, args)
+
+    def group(self, args={}):
+        """Counts rows by the values of some columns
+
+        Args:
+            args (dict): See :meth:`smalisca.analysis.analysis_base.AnalysisBase.group`
+
+        Returns:
+            Results: Tuples of the column values followed by the count,
+            most frequent first. The number of groups is in 'total'.
+
+        """
+        table = args.get('table')
+        if table not in self.tables:
+            log.error("Invalid table: %s" % table)
+            return None
+
+        fields = ROW_TYPES[table]._fields
+        columns = args.get('columns') or []
+        invalid = [c for c in columns if c not in fields]
+        if not columns or invalid:
+            log.error("Invalid group columns: %s" % (", ".join(invalid) or '-'))
+            return None
+
+        values = zip(*[self.field_values(table, c) for c in columns])
 
-    def search_class(self, args):
-        pass
+        if ('type' in args) and ('pattern' in args):
+            if args['type'] not in fields:
+                log.error("Invalid search type: %s" % args['type'])
+                return None
 
-    def search_property(self, args):
-        pass
+            positions = set(self.lookup_positions(
+                table, [args['type']], args['pattern'], args.get('match')))
+            values = (v for pos, v in enumerate(values) if pos in positions)
 
-    def search_method(self, args):
-        pass
+        counts = collections.Counter(values)
 
-    def search_call(self, args):
-        pass
+        # Ties are ordered by the column values (None first)
+        sign = 1 if args.get('reverse') else -1
+        groups = sorted(counts.items(), key=lambda g: (
+            sign * g[1], [(v is not None, v) for v in g[0]]))
 
-    def xref_class(self, args):
-        pass
+        top = args.get('top')
+        return Results(
+            [key + (n,) for key, n in groups[:top or None]], len(counts))
 
-    def xref_method(self, args):
-        pass
+    def count_rows(self):
+        """Returns the number of rows by table name"""
+        return dict((table, len(rows)) for table, rows in self.tables.items())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         analysis/analysis_scanner.py
+# Created:      2026-10-18
+# Purpose:      Scan calls and const-strings for many patterns at once
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""Multi-pattern scanner for calls and const-strings
+
+All patterns of a ruleset are compiled into a single Aho-Corasick
+automaton, so every value is scanned once no matter how many rules
+there are. Calls are matched by their descriptor
+('<class>;-><method>(<args>)<return>'), const-strings by their value.
+
+"""
+
+import collections
+
+
+# Columns of findings (see :meth:`Scanner.scan`)
+FINDING_FIELDS = ('rule', 'kind', 'class_name', 'method_name', 'value', 'ref_id')
+
+# Scanned call and const-string columns (besides the ID)
+SCAN_CALL_FIELDS = ('from_class', 'from_method', 'dst_class', 'dst_method', 'dst_args', 'ret')
+SCAN_STRING_FIELDS = ('const_string_class', 'const_string_value')
+
+# Kinds of findings
+FINDING_CALL = 'call'
+FINDING_STRING = 'string'
+
+
+def call_descriptor(class_name, method, args, ret):
+    """Returns the Smali descriptor of a called method"""
+    return "%s;->%s(%s)%s" % (class_name, method, args or '', ret or '')
+
+
+class Automaton(object):
+    """Aho-Corasick automaton matching many substrings at once
+
+    Attributes:
+        goto (list): Transitions (dict of character: state) by state
+        fail (list): Failure transition by state
+        output (list): IDs of the patterns ending in a state (including
+            those of its failure states)
+
+    """
+
+    def __init__(self, patterns):
+        """Builds the automaton
+
+        Args:
+            patterns (list): Patterns, their positions are the pattern IDs
+
+        """
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+
+        # Trie of all patterns
+        ends = collections.defaultdict(list)
+        for pid, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+
+            state = 0
+            for ch in pattern:
+                if ch not in self.goto[state]:
+                    self.goto[state][ch] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                state = self.goto[state][ch]
+            ends[state].append(pid)
+
+        # Failure transitions, breadth first
+        queue = collections.deque(self.goto[0].values())
+        for state in queue:
+            self.output[state] = tuple(ends[state])
+
+        while queue:
+            state = queue.popleft()
+            for ch, child in self.goto[state].items():
+                queue.append(child)
+
+                fail = self.fail[state]
+                while fail and ch not in self.goto[fail]:
+                    fail = self.fail[fail]
+                fail = self.goto[fail].get(ch, 0)
+
+                self.fail[child] = fail
+                self.output[child] = tuple(ends[child]) + self.output[fail]
+
+    def search(self, text):
+        """Returns the IDs of all patterns occurring in text"""
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class Scanner(object):
+    """Scans calls and const-strings for rule patterns
+
+    Attributes:
+        call_rules (list): (rule, pattern) matched against call descriptors
+        string_rules (list): (rule, pattern) matched against const-strings
+
+    """
+
+    def __init__(self, call_rules, string_rules):
+        """Compiles the rules
+
+        Args:
+            call_rules (dict): Call descriptor patterns by rule
+            string_rules (dict): Const-string patterns by rule
+
+        """
+        self.call_rules = sorted(call_rules.items())
+        self.string_rules = sorted(string_rules.items())
+        self.calls = Automaton([p for _, p in self.call_rules])
+        self.strings = Automaton([p for _, p in self.string_rules])
+
+    def scan(self, calls, strings):
+        """Scans calls and const-strings
+
+        Every distinct descriptor and string is only scanned once.
+
+        Args:
+            calls (iterable): Tuples of call ID and the SCAN_CALL_FIELDS values
+            strings (iterable): Tuples of const-string ID and the
+                SCAN_STRING_FIELDS values
+
+        Yields:
+            tuple: FINDING_FIELDS values of every match
+
+        """
+        matches = {}
+        for call_id, from_class, from_method, dst_class, dst_method, dst_args, ret in calls:
+            descriptor = call_descriptor(dst_class, dst_method, dst_args, ret)
+            if descriptor not in matches:
+                matches[descriptor] = sorted(self.calls.search(descriptor))
+            for pid in matches[descriptor]:
+                yield (self.call_rules[pid][0], FINDING_CALL, from_class,
+                       from_method, descriptor, call_id)
+
+        matches = {}
+        for string_id, class_name, value in strings:
+            if value is None:
+                continue
+            if value not in matches:
+                matches[value] = sorted(self.strings.search(value))
+            for pid in matches[value]:
+                yield (self.string_rules[pid][0], FINDING_STRING, class_name,
+                       None, value, string_id)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         analysis/analysis_search.py
+# Created:      2026-10-18
+# Purpose:      Helpers for index based pattern searches
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""Helpers for index based pattern searches
+
+Patterns can be matched in several modes:
+
+    * contains: The pattern is a substring of the value, case insensitive
+      like SQLite's LIKE (default)
+    * token: The tokens of the pattern appear as consecutive tokens
+    * prefix: Like token, but the last token only has to be a prefix
+    * regex: The regular expression matches (anywhere in) the value
+
+Tokens are runs of alphanumeric characters, so "Ljava/net/URL;" consists
+of the tokens "ljava", "net" and "url". This is the same tokenization
+SQLite's FTS5 (unicode61 tokenizer) uses.
+
+"""
+
+import re
+
+from smalisca.core.smalisca_logging import log
+
+# Match modes
+MATCH_CONTAINS = 'contains'
+MATCH_TOKEN = 'token'
+MATCH_PREFIX = 'prefix'
+MATCH_REGEX = 'regex'
+MATCH_CHOICES = (MATCH_CONTAINS, MATCH_TOKEN, MATCH_PREFIX, MATCH_REGEX)
+
+TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+# Compiled regular expressions by pattern
+REGEX_CACHE = {}
+REGEX_CACHE_SIZE = 128
+
+# Escape sequences which stand for a literal character
+REGEX_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v'}
+
+
+def compile_regex(pattern):
+    """Returns compiled regular expression, compiles every pattern only once
+
+    Args:
+        pattern (str): Regular expression
+
+    Returns:
+        Pattern: The compiled expression
+
+    Raises:
+        re.error: If pattern is invalid
+
+    """
+    regex = REGEX_CACHE.get(pattern)
+    if regex is None:
+        if len(REGEX_CACHE) >= REGEX_CACHE_SIZE:
+            REGEX_CACHE.clear()
+        regex = re.compile(pattern)
+        REGEX_CACHE[pattern] = regex
+    return regex
+
+
+def valid_regex(pattern):
+    """Checks if pattern is a valid regular expression, logs an error if not"""
+    try:
+        compile_regex(pattern)
+        return True
+    except re.error as e:
+        log.error("Invalid regular expression: %s" % e)
+        return False
+
+
+def regex_literals(pattern):
+    """Extracts literal fragments every match of pattern must contain
+
+    The analysis is conservative: groups, character classes and escaped
+    character types end a fragment, quantified characters are dropped
+    and patterns with top level alternatives or inline flags yield no
+    fragments at all.
+
+    Args:
+        pattern (str): Regular expression
+
+    Returns:
+        list: List of literal strings
+
+    """
+    if '(?' in pattern:
+        return []
+
+    literals = []
+    current = []
+    depth = 0
+    i = 0
+
+    def flush():
+        if current:
+            literals.append("".join(current))
+            del current[:]
+
+    while i < len(pattern):
+        c = pattern[i]
+
+        if c == '\\' and i + 1 < len(pattern):
+            n = pattern[i + 1]
+            i += 2
+            if depth:
+                continue
+            if n.isalnum() and n not in REGEX_ESCAPES:
+                flush()
+            else:
+                current.append(REGEX_ESCAPES.get(n, n))
+            continue
+
+        if c == '[':
+            # Skip character class
+            flush()
+            i += 1
+            if i < len(pattern) and pattern[i] == '^':
+                i += 1
+            if i < len(pattern) and pattern[i] == ']':
+                i += 1
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            i += 1
+            continue
+
+        i += 1
+
+        if c == '(':
+            flush()
+            depth += 1
+        elif c == ')':
+            depth = max(depth - 1, 0)
+        elif depth:
+            continue
+        elif c == '|':
+            return []
+        elif c in '?*{':
+            # Previous character is optional
+            if current:
+                current.pop()
+            flush()
+
+            # Skip repetition count
+            if c == '{':
+                end = pattern.find('}', i)
+                i = end + 1 if end >= 0 else len(pattern)
+        elif c in '+.^$':
+            flush()
+        else:
+            current.append(c)
+
+    flush()
+    return [l for l in literals if l]
+
+
+def tokenize(text):
+    """Splits text into lower case tokens
+
+    Args:
+        text (str): Text to be split
+
+    Returns:
+        list: List of tokens
+
+    """
+    return [t.lower() for t in TOKEN_RE.findall(text)]
+
+
+def fts_expression(pattern, match=MATCH_CONTAINS, columns=None):
+    """Returns FTS5 query expression for pattern
+
+    In token and prefix mode the expression matches exactly. In contains
+    mode it only narrows down the candidates: the first token of the
+    pattern might be the end of a longer token and the last one the
+    beginning of a longer one. Candidates still have to be checked.
+
+    Args:
+        pattern (str): Search pattern
+        match (str): Match mode
+        columns (list): Restrict expression to these columns
+
+    Returns:
+        str: FTS5 expression, None if the index can't be used
+
+    """
+    tokens = TOKEN_RE.findall(pattern)
+    if not tokens:
+        return None
+
+    if match == MATCH_TOKEN:
+        expr = '"%s"' % " ".join(tokens)
+
+    elif match == MATCH_PREFIX:
+        expr = '"%s"*' % " ".join(tokens)
+
+    else:
+        terms = []
+        for i, t in enumerate(tokens):
+            # Token may be the end of a longer token
+            if i == 0 and pattern.startswith(t):
+                continue
+
+            # Token may be the beginning of a longer token
+            if i == len(tokens) - 1 and pattern.endswith(t):
+                terms.append('"%s"*' % t)
+            else:
+                terms.append('"%s"' % t)
+
+        if not terms:
+            return None
+        expr = " AND ".join(terms)
+
+    if columns:
+        expr = "{%s} : (%s)" % (" ".join(columns), expr)
+
+    return expr
+
+
+def trigram_expression(pattern, columns=None):
+    """Returns FTS5 query expression for the trigram index
+
+    The trigram tokenizer matches any substring of at least three
+    characters (case insensitive), so the candidates still have to be
+    checked for exact matches.
+
+    Args:
+        pattern (str): Search pattern
+        columns (list): Restrict expression to these columns
+
+    Returns:
+        str: FTS5 expression, None if the pattern is too short
+
+    """
+    if len(pattern) < 3:
+        return None
+
+    expr = '"%s"' % pattern.replace('"', '""')
+    if columns:
+        expr = "{%s} : (%s)" % (" ".join(columns), expr)
+
+    return expr
+
+
+def match_value(pattern, value, match=MATCH_CONTAINS):
+    """Checks if value matches pattern
+
+    Args:
+        pattern (str): Search pattern
+        value (str): Value to be checked
+        match (str): Match mode
+
+    Returns:
+        bool: True if value matches, otherwise False
+
+    """
+    if match == MATCH_REGEX:
+        return compile_regex(pattern).search(value) is not None
+
+    if match not in (MATCH_TOKEN, MATCH_PREFIX):
+        return pattern.lower() in value.lower()
+
+    p = tokenize(pattern)
+    v = tokenize(value)
+    if not p:
+        return False
+
+    n = len(p)
+    for i in range(0, len(v) - n + 1):
+        if v[i:i + n - 1] != p[:-1]:
+            continue
+        last = v[i + n - 1]
+        if last == p[-1] or (match == MATCH_PREFIX and last.startswith(p[-1])):
+            return True
+
+    return False
@@ -32,6 +32,7 @@
 
 import cmd
 import argparse
+import configparser
 import sys
 import textwrap
 
@@ -39,11 +40,22 @@ import smalisca.core.smalisca_config as config
 from smalisca.core.smalisca_logging import log
 from smalisca.modules.module_graph import ClassGraph, CallGraph
 from smalisca.analysis.analysis_sqlite import row2dict
+from smalisca.analysis.analysis_search import MATCH_CHOICES, MATCH_REGEX
+from smalisca.analysis.analysis_base import window, PATH_MAX_DEPTH, PATH_TIMEOUT
+from smalisca.analysis.analysis_hierarchy import HIERARCHY_CLASS, HIERARCHY_INTERFACE
 
 from prettytable import PrettyTable
 from argparse import RawTextHelpFormatter
 
 
+# Default max. results per table of the global search
+GLOBAL_SEARCH_LIMIT = 100
+
+
+# Default max. number of groups shown by 'group'
+GROUP_TOP = 20
+
+
 # Own argparse types
 def list_type(s):
     return s.split(',')
@@ -58,6 +70,47 @@ def extract_range(s):
         return (int(ranges[0]), None)
 
 
+def display_fields(fields, args):
+    """Returns table fields not excluded by args ('-x')"""
+    excluded = getattr(args, 'exclude_fields', None) or []
+    return [f for f in fields if f['name'] not in excluded]
+
+
+def query_args(args, fields=None):
+    """Returns ordering, output range and reachability specified by args
+
+    Args:
+        args (Namespace): Parsed command arguments
+        fields (list): Printed table fields. If specified, only these
+            columns are queried.
+
+    Returns:
+        dict: 'sortby', 'reverse', 'offset', 'limit', 'reachable' and
+        'columns' for the analyzer
+
+    """
+    p = {
+        'sortby': getattr(args, 'sortby', None),
+        'reverse': getattr(args, 'sortby_reverse', False),
+        'offset': None,
+        'limit': None,
+        'reachable': getattr(args, 'reachable', None),
+        'columns': [f['name'] for f in fields] if fields else None
+    }
+
+    # Output range
+    if getattr(args, 'range', None):
+        ranges = extract_range(args.range)
+        if ranges[1]:
+            p['offset'] = ranges[0]
+            p['limit'] = max(ranges[1] - ranges[0], 0)
+        else:
+            p['offset'] = 0
+            p['limit'] = ranges[0]
+
+    return p
+
+
 class AnalyzerShell(cmd.Cmd):
     """Analyzer command interface"""
     intro = "\n-- Analyzer "
@@ -92,6 +145,12 @@ class AnalyzerShell(cmd.Cmd):
         {'name': 'ret'}
     ]
 
+    # Cross call columns
+    xref_fields = call_fields + [{'name': 'xref_depth'}]
+
+    # Call path columns
+    path_fields = [{'name': 'path'}, {'name': 'step'}] + call_fields
+
     # Property columns
     property_fields = [
         {'name': 'id'},
@@ -106,7 +165,8 @@ class AnalyzerShell(cmd.Cmd):
         {'name': 'id'},
         {'name': 'const_string_var'},
         {'name': 'const_string_value'},
-        {'name': 'const_string_class'}
+        {'name': 'const_string_class'},
+        {'name': 'const_string_kind'}
     ]
 
     # Method columns
@@ -119,6 +179,87 @@ class AnalyzerShell(cmd.Cmd):
         {'name': 'method_class'}
     ]
 
+    # Global search sections: (title, name) by results key
+    search_sections = {
+        'classes': ('Classes', 'classes'),
+        'properties': ('Properties', 'properties'),
+        'consts': ('Const strings', 'const strings'),
+        'methods': ('Methods', 'methods')
+    }
+
+    # Method metrics columns
+    method_metric_fields = [
+        {'name': 'id'},
+        {'name': 'method_class'},
+        {'name': 'method_name'},
+        {'name': 'method_args'},
+        {'name': 'fan_in'},
+        {'name': 'fan_out'},
+        {'name': 'scc'},
+        {'name': 'scc_size'},
+        {'name': 'recursive'}
+    ]
+
+    # Class metrics columns
+    class_metric_fields = [
+        {'name': 'id'},
+        {'name': 'class_name'},
+        {'name': 'methods'},
+        {'name': 'fan_in'},
+        {'name': 'fan_out'},
+        {'name': 'coupling'}
+    ]
+
+    # Centrality columns
+    centrality_fields = [
+        {'name': 'id'},
+        {'name': 'method_class'},
+        {'name': 'method_name'},
+        {'name': 'method_args'},
+        {'name': 'in_degree'},
+        {'name': 'out_degree'},
+        {'name': 'pagerank'},
+        {'name': 'khop'}
+    ]
+
+    # Finding columns
+    finding_fields = [
+        {'name': 'id'},
+        {'name': 'rule'},
+        {'name': 'kind'},
+        {'name': 'class_name'},
+        {'name': 'method_name'},
+        {'name': 'value'},
+        {'name': 'ref_id'}
+    ]
+
+    # Interface columns
+    interface_fields = [
+        {'name': 'id'},
+        {'name': 'class_name'},
+        {'name': 'interface_name'}
+    ]
+
+    # Class hierarchy columns
+    hierarchy_fields = [
+        {'name': 'id'},
+        {'name': 'ancestor'},
+        {'name': 'descendant'},
+        {'name': 'distance'},
+        {'name': 'kind'}
+    ]
+
+    # Tables counted by 'group': (table name, columns) by table argument
+    group_tables = {
+        'class': ('classes', class_fields),
+        'property': ('properties', property_fields),
+        'const': ('const_strings', const_string_fields),
+        'method': ('methods', method_fields),
+        'call': ('calls', call_fields),
+        'interface': ('interfaces', interface_fields),
+        'finding': ('findings', finding_fields)
+    }
+
     def __init__(self, analysis):
         """Initializes a analysis shell
 
@@ -136,9 +277,18 @@ class AnalyzerShell(cmd.Cmd):
             formatter_class=RawTextHelpFormatter)
         self.s_parser.add_argument(
             '-p', dest='search_pattern', help="Specify search pattern")
+        self.s_parser.add_argument(
+            '-m', dest='match', choices=MATCH_CHOICES,
+            help="Match mode (uses search index)\nDefault: contains")
+        self.s_parser.add_argument(
+            '--regex', dest='match', action='store_const', const=MATCH_REGEX,
+            help="Pattern is a regular expression (same as '-m regex')")
         self.s_parser.add_argument(
             '-t', dest='table', choices=('class', 'property', 'const', 'method'),
             help="Specify table to lookup in")
+        self.s_parser.add_argument(
+            '-l', dest='limit', type=int, default=GLOBAL_SEARCH_LIMIT,
+            help="Max. results per table (0 for no limit)\nDefault: %d" % GLOBAL_SEARCH_LIMIT)
 
         # - search classes
         self.sc_parser = argparse.ArgumentParser(
@@ -150,6 +300,12 @@ class AnalyzerShell(cmd.Cmd):
             '-c', dest='search_type', help="Specify column.\nType ? for list")
         self.sc_parser.add_argument(
             '-p', dest='search_pattern', help="Specify search pattern")
+        self.sc_parser.add_argument(
+            '-m', dest='match', choices=MATCH_CHOICES,
+            help="Match mode (uses search index)\nDefault: contains")
+        self.sc_parser.add_argument(
+            '--regex', dest='match', action='store_const', const=MATCH_REGEX,
+            help="Pattern is a regular expression (same as '-m regex')")
         self.sc_parser.add_argument(
             '-s', dest='sortby', help="Sort by column name")
         self.sc_parser.add_argument(
@@ -194,6 +350,12 @@ class AnalyzerShell(cmd.Cmd):
             '-c', dest='search_type', help="Specify column.\nType ? for list")
         self.sp_parser.add_argument(
             '-p', dest='search_pattern', help="Specify search pattern")
+        self.sp_parser.add_argument(
+            '-m', dest='match', choices=MATCH_CHOICES,
+            help="Match mode (uses search index)\nDefault: contains")
+        self.sp_parser.add_argument(
+            '--regex', dest='match', action='store_const', const=MATCH_REGEX,
+            help="Pattern is a regular expression (same as '-m regex')")
         self.sp_parser.add_argument(
             '-s', dest='sortby', help="Sort by column name")
         self.sp_parser.add_argument(
@@ -217,6 +379,12 @@ class AnalyzerShell(cmd.Cmd):
             '-c', dest='search_type', help="Specify column.\nType ? for list")
         self.scs_parser.add_argument(
             '-p', dest='search_pattern', help="Specify search pattern")
+        self.scs_parser.add_argument(
+            '-m', dest='match', choices=MATCH_CHOICES,
+            help="Match mode (uses search index)\nDefault: contains")
+        self.scs_parser.add_argument(
+            '--regex', dest='match', action='store_const', const=MATCH_REGEX,
+            help="Pattern is a regular expression (same as '-m regex')")
         self.scs_parser.add_argument(
             '-s', dest='sortby', help="Sort by column name")
         self.scs_parser.add_argument(
@@ -237,6 +405,18 @@ class AnalyzerShell(cmd.Cmd):
             '-c', dest='search_type', help="Specify column.\nType ? for list")
         self.sm_parser.add_argument(
             '-p', dest='search_pattern', help="smecify search pattern")
+        self.sm_parser.add_argument(
+            '-m', dest='match', choices=MATCH_CHOICES,
+            help="Match mode (uses search index)\nDefault: contains")
+        self.sm_parser.add_argument(
+            '--regex', dest='match', action='store_const', const=MATCH_REGEX,
+            help="Pattern is a regular expression (same as '-m regex')")
+        self.sm_parser.add_argument(
+            '--live', dest='reachable', action='store_const', const=True,
+            help="Only reachable code (see 'entry')")
+        self.sm_parser.add_argument(
+            '--dead', dest='reachable', action='store_const', const=False,
+            help="Only unreachable code (see 'entry')")
         self.sm_parser.add_argument(
             '-s', dest='sortby', help="Sort by column name")
         self.sm_parser.add_argument(
@@ -268,6 +448,18 @@ class AnalyzerShell(cmd.Cmd):
             '-fa', dest='local_args', help="Local arguments (from)")
         self.scl_parser.add_argument(
             '-ta', dest='dest_args', help="Destination arguments (to)")
+        self.scl_parser.add_argument(
+            '-m', dest='match', choices=MATCH_CHOICES,
+            help="Match mode (uses search index)\nDefault: contains")
+        self.scl_parser.add_argument(
+            '--regex', dest='match', action='store_const', const=MATCH_REGEX,
+            help="Pattern is a regular expression (same as '-m regex')")
+        self.scl_parser.add_argument(
+            '--live', dest='reachable', action='store_const', const=True,
+            help="Only reachable code (see 'entry')")
+        self.scl_parser.add_argument(
+            '--dead', dest='reachable', action='store_const', const=False,
+            help="Only unreachable code (see 'entry')")
         self.scl_parser.add_argument(
             '-s', dest='sortby', help="Sort by column name")
         self.scl_parser.add_argument(
@@ -281,6 +473,259 @@ class AnalyzerShell(cmd.Cmd):
             '-x', dest='exclude_fields', help="Exclude table fields",
             type=list_type)
 
+        # - search call paths
+        self.path_parser = argparse.ArgumentParser(
+            prog='path', add_help=True,
+            description=textwrap.dedent(config.HelpMessage.ANALYZER_HELP_PATH),
+            formatter_class=RawTextHelpFormatter)
+
+        self.path_parser.add_argument(
+            '-fc', dest='from_class', help="Specify source class")
+        self.path_parser.add_argument(
+            '-fm', dest='from_method', help="Specify source method")
+        self.path_parser.add_argument(
+            '-tc', dest='to_class', help="Specify sink class")
+        self.path_parser.add_argument(
+            '-tm', dest='to_method', help="Specify sink method")
+        self.path_parser.add_argument(
+            '-m', dest='match', choices=MATCH_CHOICES,
+            help="Match mode\nDefault: contains")
+        self.path_parser.add_argument(
+            '--regex', dest='match', action='store_const', const=MATCH_REGEX,
+            help="Patterns are regular expressions (same as '-m regex')")
+        self.path_parser.add_argument(
+            '-k', dest='k', type=int, default=1,
+            help="Max. number of paths\nDefault: 1")
+        self.path_parser.add_argument(
+            '--max-depth', dest='max_depth', type=int, default=PATH_MAX_DEPTH,
+            help="Max. number of calls per path\nDefault: %d" % PATH_MAX_DEPTH)
+        self.path_parser.add_argument(
+            '--timeout', dest='timeout', type=float, default=PATH_TIMEOUT,
+            help="Max. search time in seconds\nDefault: %d" % PATH_TIMEOUT)
+        self.path_parser.add_argument(
+            '--max-width', dest='max_width', type=int, help="Global column max width")
+        self.path_parser.add_argument(
+            '-x', dest='exclude_fields', help="Exclude table fields",
+            type=list_type)
+
+        # - source to sink reachability
+        self.reach_parser = argparse.ArgumentParser(
+            prog='reach', add_help=True,
+            description=textwrap.dedent(config.HelpMessage.ANALYZER_HELP_REACH),
+            formatter_class=RawTextHelpFormatter)
+
+        self.reach_parser.add_argument(
+            '-f', dest='config_file', default=config.PROJECT_SOURCES_SINKS,
+            help="Sources and sinks config file\nDefault: %s" % config.PROJECT_SOURCES_SINKS)
+        self.reach_parser.add_argument(
+            '--max-depth', dest='max_depth', type=int,
+            help="Max. number of calls from source to sink\nDefault: no limit")
+        self.reach_parser.add_argument(
+            '--max-width', dest='max_width', type=int, help="Global column max width")
+
+        # - entry points and reachability
+        self.entry_parser = argparse.ArgumentParser(
+            prog='entry', add_help=True,
+            description=textwrap.dedent(config.HelpMessage.ANALYZER_HELP_ENTRY),
+            formatter_class=RawTextHelpFormatter)
+
+        self.entry_parser.add_argument(
+            '-f', dest='manifest',
+            help="AndroidManifest.xml\nDefault: looked up in the dump directory")
+        self.entry_parser.add_argument(
+            '-l', dest='list_entries', action='store_true',
+            help="List entry points")
+        self.entry_parser.add_argument(
+            '--max-width', dest='max_width', type=int, help="Global column max width")
+
+        # - call graph metrics
+        self.metrics_parser = argparse.ArgumentParser(
+            prog='metrics', add_help=True,
+            description=textwrap.dedent(config.HelpMessage.ANALYZER_HELP_METRICS),
+            formatter_class=RawTextHelpFormatter)
+
+        self.metrics_parser.add_argument(
+            '-t', dest='metrics_type', choices=['method', 'class'], default='method',
+            help="Metrics of methods or classes\nDefault: method")
+        self.metrics_parser.add_argument(
+            '-c', dest='search_type', help="Specify column.\nType ? for list")
+        self.metrics_parser.add_argument(
+            '-p', dest='search_pattern', help="Specify search pattern")
+        self.metrics_parser.add_argument(
+            '-m', dest='match', choices=MATCH_CHOICES,
+            help="Match mode\nDefault: contains")
+        self.metrics_parser.add_argument(
+            '--regex', dest='match', action='store_const', const=MATCH_REGEX,
+            help="Pattern is a regular expression (same as '-m regex')")
+        self.metrics_parser.add_argument(
+            '--recursive', action='store_true',
+            help="Only methods in call cycles")
+        self.metrics_parser.add_argument(
+            '--update', action='store_true',
+            help="Compute the metrics again")
+        self.metrics_parser.add_argument(
+            '-s', dest='sortby', help="Sort by column name")
+        self.metrics_parser.add_argument(
+            '--reverse', action='store_true', dest='sortby_reverse',
+            help="Reverse sort order")
+        self.metrics_parser.add_argument(
+            '-r', dest='range', help="Specify output range by single integer or separated by ','")
+        self.metrics_parser.add_argument(
+            '--max-width', dest='max_width', type=int, help="Global column max width")
+        self.metrics_parser.add_argument(
+            '-x', dest='exclude_fields', help="Exclude table fields",
+            type=list_type)
+
+        # - centrality of methods
+        self.centrality_parser = argparse.ArgumentParser(
+            prog='centrality', add_help=True,
+            description=textwrap.dedent(config.HelpMessage.ANALYZER_HELP_CENTRALITY),
+            formatter_class=RawTextHelpFormatter)
+
+        self.centrality_parser.add_argument(
+            '-c', dest='search_type', choices=['method_class', 'method_name'],
+            help="Only methods matching in column")
+        self.centrality_parser.add_argument(
+            '-p', dest='search_pattern', help="Specify search pattern")
+        self.centrality_parser.add_argument(
+            '-m', dest='match', choices=MATCH_CHOICES,
+            help="Match mode\nDefault: contains")
+        self.centrality_parser.add_argument(
+            '--regex', dest='match', action='store_const', const=MATCH_REGEX,
+            help="Pattern is a regular expression (same as '-m regex')")
+        self.centrality_parser.add_argument(
+            '-k', dest='khop', type=int,
+            help="Count methods reachable by at most K calls (khop)")
+        self.centrality_parser.add_argument(
+            '--callers', action='store_true',
+            help="Count calling methods instead (khop)")
+        self.centrality_parser.add_argument(
+            '-s', dest='sortby', help="Sort by column name\nDefault: pagerank (descending)")
+        self.centrality_parser.add_argument(
+            '--reverse', action='store_true', dest='sortby_reverse',
+            help="Reverse sort order")
+        self.centrality_parser.add_argument(
+            '-r', dest='range', help="Specify output range by single integer or separated by ','")
+        self.centrality_parser.add_argument(
+            '--max-width', dest='max_width', type=int, help="Global column max width")
+        self.centrality_parser.add_argument(
+            '-x', dest='exclude_fields', help="Exclude table fields",
+            type=list_type)
+
+        # - scanner findings
+        self.scan_parser = argparse.ArgumentParser(
+            prog='scan', add_help=True,
+            description=textwrap.dedent(config.HelpMessage.ANALYZER_HELP_SCAN),
+            formatter_class=RawTextHelpFormatter)
+
+        self.scan_parser.add_argument(
+            '-f', dest='rules_file', default=config.PROJECT_RULES,
+            help="Rules file\nDefault: %s" % config.PROJECT_RULES)
+        self.scan_parser.add_argument(
+            '--update', action='store_true',
+            help="Scan again")
+        self.scan_parser.add_argument(
+            '-c', dest='search_type', help="Specify column.\nType ? for list")
+        self.scan_parser.add_argument(
+            '-p', dest='search_pattern', help="Specify search pattern")
+        self.scan_parser.add_argument(
+            '-m', dest='match', choices=MATCH_CHOICES,
+            help="Match mode\nDefault: contains")
+        self.scan_parser.add_argument(
+            '--regex', dest='match', action='store_const', const=MATCH_REGEX,
+            help="Pattern is a regular expression (same as '-m regex')")
+        self.scan_parser.add_argument(
+            '-s', dest='sortby', help="Sort by column name")
+        self.scan_parser.add_argument(
+            '--reverse', action='store_true', dest='sortby_reverse',
+            help="Reverse sort order")
+        self.scan_parser.add_argument(
+            '-r', dest='range', help="Specify output range by single integer or separated by ','")
+        self.scan_parser.add_argument(
+            '--max-width', dest='max_width', type=int, help="Global column max width")
+        self.scan_parser.add_argument(
+            '-x', dest='exclude_fields', help="Exclude table fields",
+            type=list_type)
+
+        # - class hierarchy
+        self.subtypes_parser = argparse.ArgumentParser(
+            prog='subtypes', add_help=True,
+            description=textwrap.dedent(config.HelpMessage.ANALYZER_HELP_SUBTYPES),
+            formatter_class=RawTextHelpFormatter)
+
+        self.subtypes_parser.add_argument(
+            '-p', dest='search_pattern', help="Class or interface name")
+        self.subtypes_parser.add_argument(
+            '--supertypes', action='store_true',
+            help="Show super classes and interfaces of the class instead")
+        self.subtypes_parser.add_argument(
+            '--direct', action='store_true',
+            help="Only direct sub/super types")
+        self.subtypes_parser.add_argument(
+            '-k', dest='kind', choices=(HIERARCHY_CLASS, HIERARCHY_INTERFACE),
+            help="Only super classes (class) or interfaces (interface)")
+        self.subtypes_parser.add_argument(
+            '-m', dest='match', choices=MATCH_CHOICES,
+            help="Match mode\nDefault: exact class name")
+        self.subtypes_parser.add_argument(
+            '--regex', dest='match', action='store_const', const=MATCH_REGEX,
+            help="Pattern is a regular expression (same as '-m regex')")
+        self.subtypes_parser.add_argument(
+            '--update', action='store_true',
+            help="Build class hierarchy again")
+        self.subtypes_parser.add_argument(
+            '-s', dest='sortby', help="Sort by column name")
+        self.subtypes_parser.add_argument(
+            '--reverse', action='store_true', dest='sortby_reverse',
+            help="Reverse sort order")
+        self.subtypes_parser.add_argument(
+            '-r', dest='range', help="Specify output range by single integer or separated by ','")
+        self.subtypes_parser.add_argument(
+            '--max-width', dest='max_width', type=int, help="Global column max width")
+        self.subtypes_parser.add_argument(
+            '-x', dest='exclude_fields', help="Exclude table fields",
+            type=list_type)
+
+        # - count rows by columns
+        self.group_parser = argparse.ArgumentParser(
+            prog='group', add_help=True,
+            description=textwrap.dedent(config.HelpMessage.ANALYZER_HELP_GROUP),
+            formatter_class=RawTextHelpFormatter)
+
+        self.group_parser.add_argument(
+            '-t', dest='table', choices=sorted(self.group_tables), required=True,
+            help="Table to count rows of")
+        self.group_parser.add_argument(
+            '-g', dest='group_by', type=list_type,
+            help="Columns to group by, separated by ','.\nType ? for list")
+        self.group_parser.add_argument(
+            '-c', dest='search_type', help="Only count rows matching in column")
+        self.group_parser.add_argument(
+            '-p', dest='search_pattern', help="Specify search pattern")
+        self.group_parser.add_argument(
+            '-m', dest='match', choices=MATCH_CHOICES,
+            help="Match mode\nDefault: contains")
+        self.group_parser.add_argument(
+            '--regex', dest='match', action='store_const', const=MATCH_REGEX,
+            help="Pattern is a regular expression (same as '-m regex')")
+        self.group_parser.add_argument(
+            '--top', dest='top', type=int, default=GROUP_TOP,
+            help="Max. number of groups (0 for all)\nDefault: %d" % GROUP_TOP)
+        self.group_parser.add_argument(
+            '--reverse', action='store_true',
+            help="Least frequent groups first")
+        self.group_parser.add_argument(
+            '--max-width', dest='max_width', type=int, help="Global column max width")
+
+        # - query cache statistics
+        self.stats_parser = argparse.ArgumentParser(
+            prog='stats', add_help=True,
+            description=textwrap.dedent(config.HelpMessage.ANALYZER_HELP_STATS),
+            formatter_class=RawTextHelpFormatter)
+
+        self.stats_parser.add_argument(
+            '--clear', action='store_true', help="Drop all cached queries")
+
         # - search cross calls
         self.sxcl_parser = argparse.ArgumentParser(
             prog='sxcl', add_help=True,
@@ -297,6 +742,9 @@ class AnalyzerShell(cmd.Cmd):
         self.sxcl_parser.add_argument(
             '--max-depth', dest='xref_depth', help="Cross-References max depth\nDefault: 1",
             nargs='?', const=1, type=int)
+        self.sxcl_parser.add_argument(
+            '--precise', action='store_true', dest='precise',
+            help="Follow called methods (class, name and arguments)\ninstead of classes")
         self.sxcl_parser.add_argument(
             '-s', dest='sortby', help="Sort by column name")
         self.sxcl_parser.add_argument(
@@ -355,6 +803,9 @@ class AnalyzerShell(cmd.Cmd):
         self.dxcl_parser.add_argument(
             '--max-depth', dest='xref_depth', help="Cross-References max depth\nDefault: 1",
             nargs='?', const=1, type=int)
+        self.dxcl_parser.add_argument(
+            '--precise', action='store_true', dest='precise',
+            help="Follow called methods (class, name and arguments)\ninstead of classes")
         self.dxcl_parser.add_argument(
             '-f', dest='output_format', help="Output format\nDefault: dot",
             choices=('dot', 'xdot', 'png', 'pdf', 'jpg', 'svg'), default="dot")
@@ -369,9 +820,13 @@ class AnalyzerShell(cmd.Cmd):
         # Parents constructor
         cmd.Cmd.__init__(self)
 
-    def get_classes(self, args):
+    def get_classes(self, args, fields=None):
         """Returns classes specified by args
 
+        Args:
+            args (Namespace): Parsed command arguments
+            fields (list): Printed table fields, None for complete classes
+
         Returns:
             list: Return list of classes if any, otherwise None
 
@@ -391,24 +846,30 @@ class AnalyzerShell(cmd.Cmd):
                     if any(c['name'] == args.search_type for c in self.class_fields):
                         p = {
                             'type': args.search_type,
-                            'pattern': args.search_pattern
+                            'pattern': args.search_pattern,
+                            'match': getattr(args, 'match', None)
                         }
+                        p.update(query_args(args, fields))
                         results = self.analysis.search_class(p)
                     else:
                         log.error("No such column! Type '-c ?' for a list of available columns.")
                 else:
                     log.error("No pattern (-p) specified")
             else:
-                results = self.analysis.search_class()
+                results = self.analysis.search_class(query_args(args, fields))
 
             return results
 
         except SystemExit:
             pass
 
-    def get_calls(self, args):
+    def get_calls(self, args, fields=None):
         """Return calls
 
+        Args:
+            args (Namespace): Parsed command arguments
+            fields (list): Printed table fields, None for complete calls
+
         Returns:
             list: Return list of calls if any, otherwise None
 
@@ -455,6 +916,13 @@ class AnalyzerShell(cmd.Cmd):
             else:
                 p['dest_args'] = None
 
+            # Match mode
+            if 'match' in args:
+                p['match'] = args.match
+
+            # Ordering and output range
+            p.update(query_args(args, fields))
+
             # Search for calls
             results = self.analysis.search_call(p)
 
@@ -476,79 +944,51 @@ class AnalyzerShell(cmd.Cmd):
         if results:
             x = PrettyTable([f['name'] for f in localfields])
             x.align = "l"
+            depth = getattr(results, 'depth', None) or {}
+            names = [f['name'] for f in localfields]
             for r in results:
-                r_dict = row2dict(r)
-                x.add_row([r_dict[f['name']] for f in localfields])
-
-            # Sort by column name
-            if args.sortby:
-                x.sortby = args.sortby
-
-            # Reverse output
-            if args.sortby_reverse:
-                x.reversesort = True
+                x.add_row([
+                    depth.get(r.id) if n == 'xref_depth' else str(getattr(r, n))
+                    for n in names])
 
             # Column width
             if args.max_width:
                 x.max_width = args.max_width
 
-            # Print results
-            if args.range:
-                ranges = extract_range(args.range)
-                if ranges[1]:
-                    print(x.get_string(start=ranges[0], end=ranges[1]))
-                else:
-                    print(x.get_string(start=0, end=ranges[0]))
-            else:
-                print(x.get_string())
-        else:
-            print("No results! :(")
+            # Print results (already sorted and ranged by the analyzer)
+            print(x.get_string())
 
-    def print_global_search(self, results):
-        # Print classes
-        print("- Classes ---------------------------------------------------------------------")
-        if len(results['classes']) > 0:
-            classes = results['classes']
-            log.info("Found %d results" % len(classes))
-
-            for c in classes:
-                print("%s\n" % c)
+            total = getattr(results, 'total', len(results))
+            if total > len(results):
+                log.info("Showing %d of %d results" % (len(results), total))
         else:
-            log.warn("No found classes.\n")
+            print("No results! :(")
 
-        # Print properties
-        print("- Properties ------------------------------------------------------------------")
-        if len(results['properties']) > 0:
-            properties = results['properties']
-            log.info("Found %d results" % len(properties))
+    def print_search_section(self, key, results):
+        """Prints the results of one table of a global search
 
-            for p in properties:
-                print("%s\n" % p)
-        else:
-            log.warn("No found properties.\n")
-
-        # Print const strings
-        print("- Const strings ---------------------------------------------------------------")
-        if len(results['consts']) > 0:
-            const_strings = results['consts']
-            log.info("Found %d results" % len(const_strings))
+        Args:
+            key (str): Results key ('classes', 'properties', 'consts', 'methods')
+            results (list): Found rows
 
-            for s in const_strings:
-                print("%s\n" % s)
-        else:
-            log.warn("No found const strings.\n")
+        """
+        title, name = self.search_sections[key]
+        print("- %s %s" % (title, "-" * (77 - len(title))))
+        if len(results) > 0:
+            log.info("Found %d results" % len(results))
 
-        # Print methods
-        print("- Methods ---------------------------------------------------------------------")
-        if len(results['methods']) > 0:
-            methods = results['methods']
-            log.info("Found %d results" % len(methods))
+            for r in results:
+                print("%s\n" % r)
 
-            for m in methods:
-                print("%s\n" % m)
+            if getattr(results, 'more', False):
+                log.warn("More %s found, raise the limit (-l) to see them\n" % name)
         else:
-            log.warn("No found methods.\n")
+            log.warn("No found %s.\n" % name)
 
+    def print_global_search(self, results):
+        """Prints the results of a global search"""
+        for key in ('classes', 'properties', 'consts', 'methods'):
+            self.print_search_section(key, results[key])
 
     # - Search commands ------------------------------------------------------
     def do_s(self, params):
@@ -562,9 +1002,15 @@ class AnalyzerShell(cmd.Cmd):
                 if args.table:
                     p['table'] = args.table
 
-                # Get results
-                results = self.analysis.search(p)
-                self.print_global_search(results)
+                if args.match:
+                    p['match'] = args.match
+
+                if args.limit:
+                    p['limit'] = args.limit
+
+                # Print every table as soon as it's searched
+                for key, results in self.analysis.iter_search(p):
+                    self.print_search_section(key, results)
             else:
                 log.warn("You have to specify a search pattern!")
 
@@ -573,16 +1019,13 @@ class AnalyzerShell(cmd.Cmd):
 
     def do_sc(self, params):
         """Search for classes. Type 'sc --help' for help."""
-        local_fields = self.class_fields
-
         try:
             args = self.sc_parser.parse_args(params.split())
-            results = self.get_classes(args)
 
             # Exclude fields
-            if args.exclude_fields:
-                local_fields = [d for d in local_fields
-                            if d['name'] not in args.exclude_fields]
+            local_fields = display_fields(self.class_fields, args)
+
+            results = self.get_classes(args, local_fields)
 
             # Print results
             self.print_prettytable(args, local_fields, results)
@@ -600,6 +1043,9 @@ class AnalyzerShell(cmd.Cmd):
             # Parse arguments
             args = self.sp_parser.parse_args(params.split())
 
+            # Exclude fields
+            local_fields = display_fields(self.property_fields, args)
+
             if args.search_type:
                 # Print available columns
                 if args.search_type == '?':
@@ -611,20 +1057,17 @@ class AnalyzerShell(cmd.Cmd):
                     if any(c['name'] == args.search_type for c in self.property_fields):
                         p = {
                             'type': args.search_type,
-                            'pattern': args.search_pattern
+                            'pattern': args.search_pattern,
+                            'match': args.match
                         }
+                        p.update(query_args(args, local_fields))
                         results = self.analysis.search_property(p)
                     else:
                         log.error("No such column! Type '-c ?' for a list of available columns.")
                 else:
                     log.error("No pattern (-p) specified")
             else:
-                results = self.analysis.search_property()
-
-            # Exclude fields
-            if args.exclude_fields:
-                local_fields = [d for d in local_fields
-                            if d['name'] not in args.exclude_fields]
+                results = self.analysis.search_property(query_args(args, local_fields))
 
             # Print results
             self.print_prettytable(args, local_fields, results)
@@ -653,15 +1096,17 @@ class AnalyzerShell(cmd.Cmd):
                     if any(c['name'] == args.search_type for c in local_fields):
                         p = {
                             'type': args.search_type,
-                            'pattern': args.search_pattern
+                            'pattern': args.search_pattern,
+                            'match': args.match
                         }
+                        p.update(query_args(args, local_fields))
                         results = self.analysis.search_const_string(p)
                     else:
                         log.error("No such column! Type '-c ?' for a list of available columns.")
                 else:
                     log.error("No pattern (-p) specified")
             else:
-                results = self.analysis.search_const_string()
+                results = self.analysis.search_const_string(query_args(args, local_fields))
 
             # Print results
             self.print_prettytable(args, local_fields, results)
@@ -679,31 +1124,31 @@ class AnalyzerShell(cmd.Cmd):
             # Parse arguments
             args = self.sm_parser.parse_args(params.split())
 
+            # Exclude fields
+            local_fields = display_fields(self.method_fields, args)
+
             if args.search_type:
                 # Print available columns
                 if args.search_type == '?':
-                    print([c['name'] for c in local_fields])
+                    print([c['name'] for c in self.method_fields])
                     return
 
                 # Search
                 if args.search_pattern:
-                    if any(c['name'] == args.search_type for c in local_fields):
+                    if any(c['name'] == args.search_type for c in self.method_fields):
                         p = {
                             'type': args.search_type,
-                            'pattern': args.search_pattern
+                            'pattern': args.search_pattern,
+                            'match': args.match
                         }
+                        p.update(query_args(args, local_fields))
                         results = self.analysis.search_method(p)
                     else:
                         log.error("No such column! Type '-c ?' for a list of available columns.")
                 else:
                     log.error("No pattern (-p) specified")
             else:
-                results = self.analysis.search_method()
-
-            # Exclude fields
-            if args.exclude_fields:
-                local_fields = [d for d in local_fields
-                            if d['name'] not in args.exclude_fields]
+                results = self.analysis.search_method(query_args(args, local_fields))
 
             # Print results
             self.print_prettytable(args, local_fields, results)
@@ -721,13 +1166,11 @@ class AnalyzerShell(cmd.Cmd):
             # Parse arguments
             args = self.scl_parser.parse_args(params.split())
 
-            # Search for calls
-            results = self.get_calls(args)
-
             # Exclude fields
-            if args.exclude_fields:
-                local_fields = [d for d in self.call_fields
-                            if d['name'] not in args.exclude_fields]
+            local_fields = display_fields(self.call_fields, args)
+
+            # Search for calls
+            results = self.get_calls(args, local_fields)
 
             # Print results
             self.print_prettytable(args, local_fields, results)
@@ -737,7 +1180,7 @@ class AnalyzerShell(cmd.Cmd):
 
     def do_sxcl(self, params):
         """Search for cross calls. Type 'sxcl --help' for help."""
-        local_fields = self.call_fields
+        local_fields = self.xref_fields
 
         try:
             results = None
@@ -761,11 +1204,15 @@ class AnalyzerShell(cmd.Cmd):
             temp_results = self.get_calls(calls_args)
 
             # Get cross-references
-            results = self.analysis.xref_call(temp_results, args.direction, args.xref_depth)
+            results = self.analysis.xref_call(
+                temp_results, args.direction, args.xref_depth, args.precise)
+
+            # Ordering and output range
+            results = window(results or [], query_args(args))
 
             # Exclude fields
             if args.exclude_fields:
-                local_fields = [d for d in self.call_fields
+                local_fields = [d for d in self.xref_fields
                             if d['name'] not in args.exclude_fields]
 
             # Print results
@@ -774,6 +1221,388 @@ class AnalyzerShell(cmd.Cmd):
         except SystemExit:
             pass
 
+    def do_path(self, params):
+        """Search for call paths between methods. Type 'path --help' for help."""
+        local_fields = self.path_fields
+
+        try:
+            args = self.path_parser.parse_args(params.split())
+
+            if not (args.from_class or args.from_method):
+                log.error("No source (-fc/-fm) specified")
+                return
+
+            if not (args.to_class or args.to_method):
+                log.error("No sink (-tc/-tm) specified")
+                return
+
+            p = {
+                'from_class': args.from_class,
+                'from_method': args.from_method,
+                'to_class': args.to_class,
+                'to_method': args.to_method,
+                'match': args.match,
+                'k': args.k,
+                'max_depth': args.max_depth,
+                'timeout': args.timeout
+            }
+            paths = self.analysis.find_paths(p)
+
+            # Exclude fields
+            if args.exclude_fields:
+                local_fields = [d for d in self.path_fields
+                                if d['name'] not in args.exclude_fields]
+
+            # One row per call
+            if paths:
+                x = PrettyTable([f['name'] for f in local_fields])
+                x.align = "l"
+                for i, path in enumerate(paths):
+                    for step, r in enumerate(path):
+                        r_dict = row2dict(r)
+                        r_dict['path'] = i + 1
+                        r_dict['step'] = step + 1
+                        x.add_row([r_dict[f['name']] for f in local_fields])
+
+                if args.max_width:
+                    x.max_width = args.max_width
+
+                print(x.get_string())
+            else:
+                print("No results! :(")
+
+        except SystemExit:
+            pass
+
+    def do_entry(self, params):
+        """Find entry points and unreachable code. Type 'entry --help' for help."""
+        try:
+            args = self.entry_parser.parse_args(params.split())
+            result = self.analysis.analyze_reachability(args.manifest)
+            if result is None:
+                return
+
+            entries = result['entry_points']
+            if args.list_entries and entries:
+                x = PrettyTable(['class', 'method', 'args', 'reason'])
+                x.align = "l"
+                for key in sorted(entries):
+                    x.add_row(list(key) + [entries[key]])
+
+                if args.max_width:
+                    x.max_width = args.max_width
+
+                print(x.get_string())
+
+            log.info("Entry points: %d" % len(entries))
+            log.info("Reachable methods: %d of %d" % (result['reachable'], result['methods']))
+            log.info("Use '--live' or '--dead' with 'sm' and 'scl' to filter")
+
+        except SystemExit:
+            pass
+
+    def do_reach(self, params):
+        """Search for sources reaching sinks. Type 'reach --help' for help."""
+        try:
+            args = self.reach_parser.parse_args(params.split())
+
+            try:
+                sources, sinks = config.read_sources_sinks(args.config_file)
+            except (IOError, configparser.Error) as e:
+                log.error("Couldn't read sources and sinks from %s: %s" % (args.config_file, e))
+                return
+
+            log.info("Checking %d sources against %d sinks" % (len(sources), len(sinks)))
+            results = self.analysis.find_reachable(sources, sinks, args.max_depth)
+
+            if results:
+                x = PrettyTable(['source', 'sink', 'calls', 'path'])
+                x.align = "l"
+                for source, sink, calls in results:
+                    if calls is None:
+                        x.add_row([source, sink, '-', "(no path found in time)"])
+                        continue
+
+                    # Methods along the path, starting with the source
+                    path = ["%s->%s" % (calls[0].dst_class, calls[0].dst_method)]
+                    if len(calls) == 1:
+                        # The method calling the source is the sink
+                        path.append("%s->%s" % (calls[0].from_class, calls[0].from_method))
+                    else:
+                        path += ["%s->%s" % (c.from_class, c.from_method) for c in calls[1:]]
+                        path.append("%s->%s" % (calls[-1].dst_class, calls[-1].dst_method))
+                    x.add_row([source, sink, len(calls), "\n".join(path)])
+
+                if args.max_width:
+                    x.max_width = args.max_width
+
+                print(x.get_string())
+            else:
+                print("No results! :(")
+
+        except SystemExit:
+            pass
+
+    def do_metrics(self, params):
+        """Show call graph metrics. Type 'metrics --help' for help."""
+        try:
+            args = self.metrics_parser.parse_args(params.split())
+
+            if args.metrics_type == 'class':
+                local_fields = self.class_metric_fields
+                search = self.analysis.search_class_metrics
+            else:
+                local_fields = self.method_metric_fields
+                search = self.analysis.search_method_metrics
+
+            # Print available columns
+            if args.search_type == '?':
+                print([c['name'] for c in local_fields])
+                return
+
+            if args.update and self.analysis.analyze_metrics() is None:
+                return
+
+            # Exclude fields
+            local_fields = display_fields(local_fields, args)
+
+            p = query_args(args, local_fields)
+            p['recursive'] = args.recursive
+
+            if args.search_type:
+                if not args.search_pattern:
+                    log.error("No pattern (-p) specified")
+                    return
+
+                p.update({
+                    'type': args.search_type,
+                    'pattern': args.search_pattern,
+                    'match': args.match
+                })
+
+            results = search(p)
+
+            # Print results
+            self.print_prettytable(args, local_fields, results)
+
+        except SystemExit:
+            pass
+
+    def do_scan(self, params):
+        """Scan for rule patterns. Type 'scan --help' for help."""
+        try:
+            args = self.scan_parser.parse_args(params.split())
+
+            # Print available columns
+            if args.search_type == '?':
+                print([c['name'] for c in self.finding_fields])
+                return
+
+            if args.update or not self.analysis.has_findings():
+                try:
+                    call_rules, string_rules = config.read_rules(args.rules_file)
+                except (IOError, configparser.Error) as e:
+                    log.error("Couldn't read rules from %s: %s" % (args.rules_file, e))
+                    return
+
+                if self.analysis.scan(call_rules, string_rules) is None:
+                    return
+
+            # Exclude fields
+            local_fields = display_fields(self.finding_fields, args)
+
+            p = query_args(args, local_fields)
+
+            if args.search_type:
+                if not args.search_pattern:
+                    log.error("No pattern (-p) specified")
+                    return
+
+                p.update({
+                    'type': args.search_type,
+                    'pattern': args.search_pattern,
+                    'match': args.match
+                })
+
+            results = self.analysis.search_findings(p)
+
+            # Print results
+            self.print_prettytable(args, local_fields, results)
+
+        except SystemExit:
+            pass
+
+    def do_subtypes(self, params):
+        """Search the class hierarchy. Type 'subtypes --help' for help."""
+        try:
+            args = self.subtypes_parser.parse_args(params.split())
+
+            if args.update or not self.analysis.has_hierarchy():
+                if self.analysis.build_hierarchy() is None:
+                    return
+
+            # Exclude fields
+            local_fields = display_fields(self.hierarchy_fields, args)
+
+            p = query_args(args, local_fields)
+            p.update({'direct': args.direct, 'kind': args.kind})
+
+            if args.search_pattern:
+                pattern = args.search_pattern
+                if not args.match:
+                    # Class names are stored without ';'
+                    pattern = pattern.rstrip(';')
+
+                p.update({
+                    'type': 'descendant' if args.supertypes else 'ancestor',
+                    'pattern': pattern,
+                    'match': args.match
+                })
+
+            results = self.analysis.search_hierarchy(p)
+
+            # Print results
+            self.print_prettytable(args, local_fields, results)
+
+        except SystemExit:
+            pass
+
+    def do_centrality(self, params):
+        """Show centrality of methods. Type 'centrality --help' for help."""
+        try:
+            args = self.centrality_parser.parse_args(params.split())
+
+            if args.khop is not None and args.khop < 1:
+                log.error("Invalid number of calls (-k): %d" % args.khop)
+                return
+
+            # k-hop neighborhoods are only computed on demand
+            local_fields = display_fields(self.centrality_fields, args)
+            if not args.khop:
+                local_fields = [f for f in local_fields if f['name'] != 'khop']
+
+            p = query_args(args)
+            if not args.sortby:
+                p['sortby'] = 'pagerank'
+                p['reverse'] = not args.sortby_reverse
+
+            elif args.sortby not in [f['name'] for f in self.centrality_fields]:
+                log.error("Invalid sort column: %s" % args.sortby)
+                return
+
+            p.update({'khop': args.khop, 'callers': args.callers, 'match': args.match})
+
+            if args.search_type:
+                if not args.search_pattern:
+                    log.error("No pattern (-p) specified")
+                    return
+                p['class' if args.search_type == 'method_class' else 'method'] = args.search_pattern
+
+            results = self.analysis.centrality(p)
+
+            # Print results
+            if results is not None:
+                self.print_prettytable(args, local_fields, results)
+
+        except SystemExit:
+            pass
+
+    def do_group(self, params):
+        """Count rows by column values. Type 'group --help' for help."""
+        try:
+            args = self.group_parser.parse_args(params.split())
+            table, fields = self.group_tables[args.table]
+            names = [f['name'] for f in fields]
+
+            # Print available columns
+            if args.group_by == ['?'] or args.search_type == '?':
+                print(names)
+                return
+
+            if not args.group_by:
+                log.error("No columns (-g) specified")
+                return
+
+            invalid = [c for c in args.group_by + [args.search_type] if c and c not in names]
+            if invalid:
+                log.error("Invalid columns: %s" % ", ".join(invalid))
+                return
+
+            p = {
+                'table': table,
+                'columns': args.group_by,
+                'reverse': args.reverse,
+                'top': args.top
+            }
+
+            if args.search_type:
+                if not args.search_pattern:
+                    log.error("No pattern (-p) specified")
+                    return
+
+                p.update({
+                    'type': args.search_type,
+                    'pattern': args.search_pattern,
+                    'match': args.match
+                })
+
+            results = self.analysis.group(p)
+            if not results:
+                print("No results! :(")
+                return
+
+            x = PrettyTable(args.group_by + ['count'])
+            x.align = "l"
+            x.align['count'] = "r"
+            for r in results:
+                x.add_row([str(v) for v in r[:-1]] + [r[-1]])
+
+            if args.max_width:
+                x.max_width = args.max_width
+
+            print(x.get_string())
+
+            if results.total > len(results):
+                log.info("Showing %d of %d groups" % (len(results), results.total))
+
+        except SystemExit:
+            pass
+
+    def do_stats(self, params):
+        """Show table sizes and query cache statistics. Type 'stats --help' for help."""
+        try:
+            args = self.stats_parser.parse_args(params.split())
+
+            if args.clear:
+                self.analysis.clear_cache()
+
+            x = PrettyTable(['table', 'rows'])
+            x.align = "l"
+            x.align['rows'] = "r"
+            for table, rows in sorted(self.analysis.count_rows().items()):
+                x.add_row([table, rows])
+            print(x.get_string())
+
+            stats = self.analysis.cache_stats()
+            if stats is None:
+                log.info("No query cache available")
+                return
+
+            queries = stats['hits'] + stats['misses']
+            x = PrettyTable(['name', 'value'])
+            x.align = "l"
+            x.add_row(['cached queries', "%d of %d" % (stats['entries'], stats['size'])])
+            x.add_row(['hits', stats['hits']])
+            x.add_row(['misses', stats['misses']])
+            x.add_row(['hit rate', "%.1f%%" % (100.0 * stats['hits'] / queries if queries else 0)])
+            x.add_row(['loaded from file', stats['loads']])
+            x.add_row(['invalidations', stats['invalidations']])
+            x.add_row(['cache file', stats['filename'] or '-'])
+            print(x.get_string())
+
+        except SystemExit:
+            pass
+
     # - Drawing commands -----------------------------------------------------
     def do_dc(self, params):
         """Draw classes. Type '--help' for more information."""
@@ -847,7 +1676,8 @@ class AnalyzerShell(cmd.Cmd):
             results = self.get_calls(calls_args)
 
             # Get cross-references
-            xresults = self.analysis.xref_call(results, args.direction, args.xref_depth)
+            xresults = self.analysis.xref_call(
+                results, args.direction, args.xref_depth, args.precise)
 
             # Create new graph
             calls_graph = CallGraph()
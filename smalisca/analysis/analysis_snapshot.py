@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         analysis/analysis_snapshot.py
+# Created:      2026-10-18
+# Purpose:      Analysis functionalities based on binary snapshots
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""Implement analysis interface for binary snapshots"""
+
+from smalisca.analysis.analysis_json import AnalyzerJSON, ROW_TYPES
+from smalisca.modules.module_snapshot import TABLES
+
+
+class SnapshotTable(object):
+    """Read-only sequence of rows backed by a snapshot table
+
+    Rows are created on access and not kept in memory.
+
+    """
+
+    def __init__(self, analysis, table):
+        self.analysis = analysis
+        self.table = table
+
+    def __len__(self):
+        return self.analysis.snapshot.counts[self.table]
+
+    def __getitem__(self, pos):
+        return self.analysis.make_row(self.table, pos)
+
+    def __iter__(self):
+        for pos in range(len(self)):
+            yield self[pos]
+
+
+class AnalyzerSnapshot(AnalyzerJSON):
+    """Implement analysis interface for binary snapshots
+
+    Searching works like in :class:`smalisca.analysis.analysis_json.AnalyzerJSON`
+    but the rows are read directly from the memory mapped snapshot
+    (:class:`smalisca.modules.module_snapshot.Snapshot`).
+
+    Attributes:
+        snapshot (Snapshot): The opened snapshot
+
+    """
+
+    def __init__(self, snapshot):
+        """Class constructor
+
+        Args:
+            snapshot (Snapshot): A :class:`smalisca.modules.module_snapshot.Snapshot` instance
+
+        """
+        self.snapshot = snapshot
+        self.tables = dict((name, SnapshotTable(self, name)) for name, _ in TABLES)
+        self.indexes = {}
+        self.unreachable = {}
+
+    def make_row(self, table, pos):
+        """Creates row at position pos"""
+        row = ROW_TYPES[table](pos + 1, *self.snapshot.row(table, pos))
+
+        # Classes also reference their properties, const-strings and methods
+        if table == 'classes':
+            for attr, name, child in (
+                    ('properties', 'class_properties', 'properties'),
+                    ('const_strings', 'class_const_strings', 'const_strings'),
+                    ('methods', 'class_methods', 'methods')):
+                setattr(row, attr, [
+                    self.make_row(child, p)
+                    for p in self.snapshot.children(name, pos)])
+
+        return row
+
+    def field_values(self, table, field):
+        """Returns field value of every table row
+
+        Every distinct string is decoded only once. Tables computed
+        during the session (e.g. metrics) are held in memory.
+
+        """
+        if table not in self.snapshot.counts:
+            return AnalyzerJSON.field_values(self, table, field)
+        return self.snapshot_values(table, field)
+
+    def snapshot_values(self, table, field):
+        """Yields field value of every row of a snapshot table"""
+        strings = {}
+        for sid in self.snapshot.column(table, field):
+            if sid not in strings:
+                strings[sid] = self.snapshot.value(field, sid)
+            yield strings[sid]
+
+    def close(self):
+        """Unmaps the snapshot"""
+        self.snapshot.close()
@@ -32,14 +32,67 @@
 
 """Implements analysis interface for SQLite"""
 
-from smalisca.analysis.analysis_base import AnalysisBase
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from smalisca.analysis.analysis_base import AnalysisBase, Results, cap
+from smalisca.analysis.analysis_cache import QueryCache, QUERY_CACHE_SIZE, query_key
+from smalisca.analysis.analysis_callgraph import METHOD_METRICS, CLASS_METRICS
+from smalisca.analysis.analysis_scanner import FINDING_FIELDS
+from smalisca.analysis.analysis_hierarchy import HIERARCHY_FIELDS
 from smalisca.modules.module_sql_models import SmaliClass, SmaliMethod
 from smalisca.modules.module_sql_models import SmaliProperty
 from smalisca.modules.module_sql_models import SmaliConstString
 from smalisca.modules.module_sql_models import SmaliCall
+from smalisca.modules.module_sql_models import SmaliMethodMetric, SmaliClassMetric
+from smalisca.modules.module_sql_models import SmaliFinding
+from smalisca.modules.module_sql_models import SmaliInterface, SmaliHierarchy
+from smalisca.modules.module_sql_models import SEARCH_INDEX_COLUMNS, has_index
+from smalisca.modules.module_sql_models import create_engine, database_file
+from smalisca.modules.module_sql_models import search_index_name, trigram_index_name
+from smalisca.analysis.analysis_search import MATCH_CONTAINS, MATCH_REGEX
+from smalisca.analysis.analysis_search import fts_expression, trigram_expression
+from smalisca.analysis.analysis_search import valid_regex, regex_literals
 from smalisca.core.smalisca_logging import log
 
-from sqlalchemy import or_
+from sqlalchemy import or_, text, column, false, func, cast, String, Text
+from sqlalchemy.orm import sessionmaker
+
+
+# Max. number of bound parameters per query
+MAX_QUERY_PARAMS = 500
+
+# Models by table name
+MODELS = dict((m.__tablename__, m) for m in (
+    SmaliClass, SmaliProperty, SmaliConstString, SmaliMethod, SmaliCall,
+    SmaliMethodMetric, SmaliClassMetric, SmaliFinding, SmaliInterface, SmaliHierarchy))
+
+# Global search: searched model and columns by results key
+GLOBAL_SEARCH = {
+    'classes': (SmaliClass, ('class_name', 'class_package', 'class_type', 'path')),
+    'properties': (SmaliProperty, (
+        'property_name', 'property_type', 'property_info', 'property_class')),
+    'consts': (SmaliConstString, (
+        'const_string_var', 'const_string_value', 'const_string_class')),
+    'methods': (SmaliMethod, (
+        'method_name', 'method_type', 'method_ret', 'method_args', 'method_class'))
+}
+
+# Metrics: (model, columns, searchable columns) by table name
+METRIC_TABLES = {
+    'method_metrics': (SmaliMethodMetric, METHOD_METRICS, ('method_class', 'method_name')),
+    'class_metrics': (SmaliClassMetric, CLASS_METRICS, ('class_name',))
+}
+
+# Searchable columns of findings
+FINDING_SEARCH_COLUMNS = ('rule', 'kind', 'class_name', 'method_name', 'value')
+
+# Searchable columns of the class hierarchy
+HIERARCHY_SEARCH_COLUMNS = ('ancestor', 'descendant')
+
+# Rows per batch when reading whole tables
+READ_BATCH_SIZE = 10000
 
 
 def row2dict(row):
@@ -53,35 +106,263 @@ def row2dict(row):
 
     """
     d = {}
-    for column in row.__table__.columns:
-        d[column.name] = str(getattr(row, column.name))
+
+    # SQLAlchemy models describe their columns by __table__,
+    # other rows (e.g. JSON rows) by _fields
+    if hasattr(row, '__table__'):
+        names = [column.name for column in row.__table__.columns]
+    else:
+        names = row._fields
+
+    for name in names:
+        d[name] = str(getattr(row, name))
     return d
 
 
+def text_column(model, name):
+    """Returns column of model, integer columns are cast to text"""
+    c = getattr(model, name)
+    return c if isinstance(c.type, String) else cast(c, Text)
+
+
+def cached(func):
+    """Answers repeated searches from the query cache
+
+    Results of the decorated search method are cached by its arguments
+    (see :class:`smalisca.analysis.analysis_cache.QueryCache`).
+
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args):
+        key = query_key(func.__name__, *args)
+        results = self.cache_get(key)
+        if results is None:
+            results = func(self, *args)
+            self.cache_put(key, results)
+        return results
+
+    return wrapper
+
+
 class AnalyzerSQLite(AnalysisBase):
     """Implements the analysis interface for SQLite
 
     Attributes:
         self.db: The SQLAlchemy DB session
         self.graph: A SmaliscaGraph instance
+        self.cache: Query cache (:class:`smalisca.analysis.analysis_cache.QueryCache`),
+            None if disabled
+        self.read_only: True if the DB is opened read-only, nothing is stored then
+        self.immutable: True if the DB is opened immutable (see
+            :func:`smalisca.modules.module_sql_models.create_engine`)
 
 
     """
 
-    def __init__(self, db_session):
+    def __init__(self, db_session, cache_size=QUERY_CACHE_SIZE, cache_file=None):
         """Class constructor
 
         Args:
             db_session: A SQLAlchemy DB session instance
+            cache_size (int): Max. number of cached queries (0 disables the cache)
+            cache_file (str): File to keep the query cache in between
+                sessions (None to keep it in memory only)
 
         """
         self.db = db_session
+        self.read_sessions = None
+        self.schema = (None, None)
+        self.cache = None
+        if cache_size:
+            self.cache = QueryCache(self.fingerprint, cache_size, cache_file)
+        self.search_index = has_index(self.db, search_index_name)
+        self.trigram_index = has_index(self.db, trigram_index_name)
+        self.read_only = bool(self.db.execute(text("PRAGMA query_only")).scalar())
+        self.immutable = self.db.get_bind().url.query.get('immutable') == '1'
+
+    def fetch(self, query, model, args={}):
+        """Runs query, applies ordering and output range inside the DB
+
+        Args:
+            query: A SQLAlchemy query
+            model: The queried model (e.g. :class:`SmaliClass`)
+            args (dict): Optional 'sortby' (column name), 'reverse' (bool),
+                'offset' and 'limit' (int), 'reachable' (bool, only
+                reachable or unreachable rows), 'recursive' (bool, only
+                methods in call cycles), 'columns' (list, see :meth:`project`)
+
+        Returns:
+            Results: List of results, total number of matching rows in 'total'
+
+        """
+        sortby = args.get('sortby')
+        offset = args.get('offset')
+        limit = args.get('limit')
+
+        # Sort by column name
+        if sortby:
+            if sortby in model.__table__.columns:
+                order = getattr(model, sortby)
+                query = query.order_by(order.desc() if args.get('reverse') else order)
+            else:
+                log.error("Invalid sort column: %s" % sortby)
+        elif args.get('reverse'):
+            query = query.order_by(model.id.desc())
+
+        # Reachability
+        if args.get('reachable') is not None and 'reachable' in model.__table__.columns:
+            if args['reachable']:
+                query = query.filter(func.coalesce(model.reachable, 1) != 0)
+            else:
+                query = query.filter(model.reachable == 0)
+
+        # Call cycles
+        if args.get('recursive') and 'recursive' in model.__table__.columns:
+            query = query.filter(model.recursive == 1)
+
+        # Only select the requested columns
+        if args.get('columns'):
+            query = self.project(query, model, args['columns'])
+
+        # Output range
+        if offset or limit:
+            total = query.order_by(None).count()
+            if offset:
+                query = query.offset(offset)
+            if limit:
+                query = query.limit(limit)
+            return Results(query.all(), total, table=model.__tablename__)
+
+        return Results(query.all(), table=model.__tablename__)
+
+    def project(self, query, model, columns):
+        """Selects only some columns of model
+
+        The query then returns plain tuples (with attribute access by
+        column name) instead of ORM instances. Neither identity map
+        nor relationships are involved, so listing many rows is
+        considerably cheaper. The ID is always selected, so cached
+        results can be loaded again by ID.
+
+        Args:
+            query: A SQLAlchemy query
+            model: The queried model (e.g. :class:`SmaliClass`)
+            columns (list): Column names
+
+        Returns:
+            Query: The projected query
+
+        """
+        invalid = [c for c in columns if c not in model.__table__.columns]
+        if invalid:
+            log.error("Invalid columns: %s" % ", ".join(invalid))
+
+        selected = [getattr(model, c) for c in columns if c not in invalid]
+        if not selected:
+            return query
+
+        if 'id' not in columns:
+            selected.insert(0, model.id)
+
+        return query.with_entities(*selected)
+
+    def filter_index(self, query, model, columns, pattern, match):
+        """Narrows down query by the search indexes
+
+        Substring searches use the trigram index (if any), otherwise the
+        full-text search index (see :func:`smalisca.analysis.analysis_search.fts_expression`).
+        Token and prefix searches always use the full-text search index.
+        Columns which aren't part of the indexes (see SEARCH_INDEX_COLUMNS)
+        are never looked up in them.
+
+        Args:
+            query: A SQLAlchemy query
+            model: The model to filter (e.g. :class:`SmaliClass`)
+            columns (list): Column names to lookup in
+            pattern (str): Pattern to lookup for
+            match (str): Match mode (contains, token, prefix)
+
+        Returns:
+            tuple: (<filtered query>, <True if an index has been used>)
+
+        """
+        table = model.__tablename__
+        index = None
+        expr = None
+
+        if set(columns) <= set(SEARCH_INDEX_COLUMNS.get(table, ())):
+            if match == MATCH_CONTAINS and self.trigram_index:
+                index = trigram_index_name(table)
+                expr = trigram_expression(pattern, columns)
+
+            if not expr and self.search_index:
+                index = search_index_name(table)
+                expr = fts_expression(pattern, match, columns)
+
+        if expr:
+            query = query.filter(model.id.in_(
+                text("SELECT rowid FROM %s WHERE %s MATCH :expr" % (index, index))
+                .bindparams(expr=expr).columns(column('rowid'))))
+
+        return query, bool(expr)
+
+    def filter_pattern(self, query, model, columns, pattern, match=None):
+        """Filters query by pattern in any of the columns
+
+        The search indexes narrow down the rows, candidates are checked
+        against the exact pattern afterwards. Token and prefix searches
+        are answered by the full-text search index alone. Without index
+        they are checked by the MATCH_VALUE function (see
+        :func:`smalisca.modules.module_sql_models.sqlite_match`).
+
+        Regular expressions are evaluated by the REGEXP function. Literal
+        fragments of the expression (see :func:`smalisca.analysis.analysis_search.regex_literals`)
+        are looked up first, so only candidates containing them are checked.
+
+        Args:
+            query: A SQLAlchemy query
+            model: The model to filter (e.g. :class:`SmaliClass`)
+            columns (list): Column names to lookup in
+            pattern (str): Pattern to lookup for
+            match (str): Match mode (contains, token, prefix, regex)
+
+        Returns:
+            Query: The filtered query
+
+        """
+        match = match or MATCH_CONTAINS
+
+        if match == MATCH_REGEX:
+            if not valid_regex(pattern):
+                return query.filter(false())
+
+            for literal in regex_literals(pattern):
+                query = self.filter_index(query, model, columns, literal, MATCH_CONTAINS)[0]
+                query = query.filter(
+                    or_(*[text_column(model, c).contains(literal) for c in columns]))
+
+            return query.filter(
+                or_(*[text_column(model, c).op('REGEXP')(pattern) for c in columns]))
+
+        query, indexed = self.filter_index(query, model, columns, pattern, match)
+
+        # Token and prefix matches are exact
+        if match != MATCH_CONTAINS:
+            if indexed:
+                return query
+
+            return query.filter(or_(*[
+                func.match_value(pattern, getattr(model, c), match) for c in columns]))
+
+        return query.filter(
+            or_(*[text_column(model, c).contains(pattern) for c in columns]))
 
     def search(self, args={}):
         """Search globally for a certain pattern
 
         Args:
-            args (dict): Specify a dict containing the search criterias
+            args (dict): Specify a dict containing the search criterias,
+                optional 'limit' caps the results of every table
 
         Returns:
             dict: Returns a dict containing found classes, properties, methods, calls:
@@ -90,53 +371,124 @@ class AnalyzerSQLite(AnalysisBase):
             results = {'classes': found_classes, 'properties': 'found_properties', ... }
 
         """
-        table = None
-        classes = []
-        properties = []
-        consts = []
-        methods = []
+        results = {
+            'classes': [],
+            'properties': [],
+            'consts': [],
+            'methods': []
+        }
+        results.update(self.iter_search(args))
+        return results
+
+    def iter_search(self, args={}):
+        """Searches globally, yields the results of every table when ready
 
+        Tables are searched concurrently, each on its own read-only
+        connection. SQLite doesn't hold the GIL while searching, so the
+        whole search takes about as long as the slowest table. Cached
+        results are yielded first.
+
+        Args:
+            args (dict): 'pattern', optional 'table', 'match' and 'limit'
+                (max. rows per table)
+
+        Yields:
+            tuple: (results key, Results)
+
+        """
         if 'pattern' not in args:
             log.error("No search pattern")
+            return
+
+        tables = self.search_tables(args)
+        if not tables:
+            return
+
+        pattern = args['pattern']
+        match = args.get('match')
+        limit = args.get('limit')
+
+        pending = []
+        for _, key in tables:
+            cache_key = query_key('search', key, pattern, match, limit)
+            results = self.cache_get(cache_key)
+            if results is None:
+                pending.append((key, cache_key))
+            else:
+                yield key, results
+
+        # In-memory DBs can't be opened twice
+        if len(pending) < 2 or database_file(self.db.get_bind()) is None:
+            for key, cache_key in pending:
+                results = self.search_pattern(self.db, key, pattern, match, limit)
+                self.cache_put(cache_key, results)
+                yield key, results
+            return
+
+        # Created up front, the workers must not race to create it
+        sessions = self.read_sessionmaker()
+
+        with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+            futures = dict(
+                (pool.submit(self.search_read_only, sessions, key, pattern, match, limit),
+                 (key, cache_key))
+                for key, cache_key in pending)
+
+            for future in as_completed(futures):
+                key, cache_key = futures[future]
+                results = future.result()
+                self.cache_put(cache_key, results)
+                yield key, results
+
+    def search_pattern(self, db, key, pattern, match=None, limit=None):
+        """Searches one table of the global search
 
-        if 'table' in args:
-            table = args['table']
-
+        Args:
+            db: DB session to query with
+            key (str): Results key (see GLOBAL_SEARCH)
+            pattern (str): Pattern to lookup for
+            match (str): Match mode (contains, token, prefix, regex)
+            limit (int): Max. number of rows (None for no limit)
 
-        if table == 'class':
-            # Search for classes
-            classes = self.search_class_by_pattern(args['pattern'])
+        Returns:
+            Results: Found rows, 'more' is True if limit was exceeded
 
-        elif table == 'property':
-            # Search for properties
-            properties = self.search_property_by_pattern(args['pattern'])
+        """
+        model, columns = GLOBAL_SEARCH[key]
+        query = self.filter_pattern(db.query(model), model, columns, pattern, match)
 
-        elif table == 'const':
-            # Search for const strings
-            consts = self.search_const_string_by_pattern(args['pattern'])
+        # One more row tells if there are more
+        if limit:
+            query = query.limit(limit + 1)
 
-        elif table == 'method':
-            # Search for methods
-            methods = self.search_method_by_pattern(args['pattern'])
+        return cap(query.all(), limit)
 
-        elif table is None:
-            # Search for all
-            classes = self.search_class_by_pattern(args['pattern'])
-            properties = self.search_property_by_pattern(args['pattern'])
-            consts = self.search_const_string_by_pattern(args['pattern'])
-            methods = self.search_method_by_pattern(args['pattern'])
+    def search_read_only(self, sessions, key, pattern, match=None, limit=None):
+        """Searches one table of the global search on a new read-only session
 
-        else:
-            log.error("Invalid table")
+        The rows are detached from the session, only their columns
+        can be accessed.
 
-        # Return results
-        return {
-            'classes': classes,
-            'properties': properties,
-            'consts': consts,
-            'methods': methods
-        }
+        Args:
+            sessions: Session factory (see :meth:`read_sessionmaker`)
 
+        """
+        db = sessions()
+        try:
+            return self.search_pattern(db, key, pattern, match, limit)
+        finally:
+            db.close()
+
+    def read_sessionmaker(self):
+        """Returns the factory of sessions on read-only connections"""
+        if self.read_sessions is None:
+            engine = create_engine(
+                database_file(self.db.get_bind()), read_only=True,
+                immutable=self.immutable)
+            self.read_sessions = sessionmaker(bind=engine)
+        return self.read_sessions
+
+    @cached
     def search_class(self, args={}):
         """Searches for classes
 
@@ -159,42 +511,43 @@ class AnalyzerSQLite(AnalysisBase):
 
             # Search for class id
             if args['type'] == 'id':
-                result = query.filter(
+                query = query.filter(
                     SmaliClass.id == int(args['pattern'])
-                ).all()
+                )
 
             # Search for class names
             elif args['type'] == 'class_name':
-                result = query.filter(
-                    SmaliClass.class_name.contains(args['pattern'])
-                ).all()
+                query = self.filter_pattern(
+                    query, SmaliClass, ('class_name',),
+                    args['pattern'], args.get('match'))
 
             # Search for class types
             elif args['type'] == 'class_type':
-                result = query.filter(
-                    SmaliClass.class_type.contains(args['pattern'])
-                ).all()
+                query = self.filter_pattern(
+                    query, SmaliClass, ('class_type',),
+                    args['pattern'], args.get('match'))
 
             # Search for class package
             elif args['type'] == 'class_package':
-                result = query.filter(
-                    SmaliClass.class_package.contains(args['pattern'])
-                ).all()
+                query = self.filter_pattern(
+                    query, SmaliClass, ('class_package',),
+                    args['pattern'], args.get('match'))
 
             # Search for path location
             elif args['type'] == 'path':
-                result = query.filter(
-                    SmaliClass.path.contains(args['pattern'])
-                ).all()
+                query = self.filter_pattern(
+                    query, SmaliClass, ('path',),
+                    args['pattern'], args.get('match'))
 
             else:
                 log.error("Invalid search type: %s" % args['type'])
-        else:
-            result = query.all()
+                return result
 
+        result = self.fetch(query, SmaliClass, args)
         return result
 
-    def search_class_by_pattern(self, pattern):
+    @cached
+    def search_class_by_pattern(self, pattern, match=None):
         """Searches classes by specific pattern.
 
         It will search for classes which have specified pattern whether in the
@@ -205,24 +558,15 @@ class AnalyzerSQLite(AnalysisBase):
 
         Args:
             pattern (string): Pattern to lookup for
+            match (string): Match mode (contains, token, prefix)
 
         Returns:
             list: Return list of results if any, otherwise None
 
         """
-        results = None
-        query = self.db.query(SmaliClass)
-        query = query.filter(
-            or_(
-                SmaliClass.class_name.contains(pattern),
-                SmaliClass.class_package.contains(pattern),
-                SmaliClass.class_type.contains(pattern),
-                SmaliClass.path.contains(pattern)
-            )
-        )
-        results = query.all()
-        return results
+        return self.search_pattern(self.db, 'classes', pattern, match)
 
+    @cached
     def search_property(self, args={}):
         """Searches for class properties
 
@@ -245,36 +589,37 @@ class AnalyzerSQLite(AnalysisBase):
 
             # Search for property id
             if args['type'] == 'id':
-                result = query.filter(
+                query = query.filter(
                     SmaliProperty.id == int(args['pattern'])
-                ).all()
+                )
 
             # Search for property name
             elif args['type'] == 'property_name':
-                result = query.filter(
-                    SmaliProperty.property_name.contains(args['pattern'])
-                ).all()
+                query = self.filter_pattern(
+                    query, SmaliProperty, ('property_name',),
+                    args['pattern'], args.get('match'))
 
             # Search for property type
             elif args['type'] == 'property_type':
-                result = query.filter(
-                    SmaliProperty.property_type.contains(args['pattern'])
-                ).all()
+                query = self.filter_pattern(
+                    query, SmaliProperty, ('property_type',),
+                    args['pattern'], args.get('match'))
 
             # Search for property class
             elif args['type'] == 'property_class':
-                result = query.filter(
-                    SmaliProperty.property_class.contains(args['pattern'])
-                ).all()
+                query = self.filter_pattern(
+                    query, SmaliProperty, ('property_class',),
+                    args['pattern'], args.get('match'))
 
             else:
                 log.error("Invalid search type: %s" % args['type'])
-        else:
-            result = query.all()
+                return result
 
+        result = self.fetch(query, SmaliProperty, args)
         return result
 
-    def search_property_by_pattern(self, pattern):
+    @cached
+    def search_property_by_pattern(self, pattern, match=None):
         """Searches properties by specific pattern.
 
         It will search for properties which have specified pattern whether in the
@@ -285,24 +630,15 @@ class AnalyzerSQLite(AnalysisBase):
 
         Args:
             pattern (string): Pattern to lookup for
+            match (string): Match mode (contains, token, prefix)
 
         Returns:
             list: Return list of results if any, otherwise None
 
         """
-        results = None
-        query = self.db.query(SmaliProperty)
-        query = query.filter(
-            or_(
-                SmaliProperty.property_name.contains(pattern),
-                SmaliProperty.property_type.contains(pattern),
-                SmaliProperty.property_info.contains(pattern),
-                SmaliProperty.property_class.contains(pattern)
-                )
-        )
-        results = query.all()
-        return results
+        return self.search_pattern(self.db, 'properties', pattern, match)
 
+    @cached
     def search_const_string(self, args={}):
         """Searches for const strings
 
@@ -321,36 +657,41 @@ class AnalyzerSQLite(AnalysisBase):
 
             # Search for id
             if args['type'] == 'id':
-                result = query.filter(
+                query = query.filter(
                     SmaliConstString.id == int(args['pattern'])
-                ).all()
+                )
 
             # Search for variable name
             elif args['type'] == 'const_string_var':
-                result = query.filter(
-                    SmaliConstString.const_string_var.contains(args['pattern'])
-                ).all()
+                query = self.filter_pattern(
+                    query, SmaliConstString, ('const_string_var',),
+                    args['pattern'], args.get('match'))
 
             # Search for value
             elif args['type'] == 'const_string_value':
-                result = query.filter(
-                    SmaliConstString.const_string_value.contains(args['pattern'])
-                ).all()
+                query = self.filter_pattern(
+                    query, SmaliConstString, ('const_string_value',),
+                    args['pattern'], args.get('match'))
 
             # Search for class
             elif args['type'] == 'const_string_class':
-                result = query.filter(
-                    SmaliConstString.const_string_class.contains(args['pattern'])
-                ).all()
+                query = self.filter_pattern(
+                    query, SmaliConstString, ('const_string_class',),
+                    args['pattern'], args.get('match'))
+
+            # Search for classification (one of a few values, exact matches only)
+            elif args['type'] == 'const_string_kind':
+                query = query.filter(SmaliConstString.const_string_kind == args['pattern'])
 
             else:
                 log.error("Invalid search type: %s" % args['type'])
-        else:
-            result = query.all()
+                return result
 
+        result = self.fetch(query, SmaliConstString, args)
         return result
 
-    def search_const_string_by_pattern(self, pattern):
+    @cached
+    def search_const_string_by_pattern(self, pattern, match=None):
         """Searches const strings by specific pattern.
 
         It will search for const strings which have specified pattern whether in the
@@ -360,23 +701,15 @@ class AnalyzerSQLite(AnalysisBase):
 
         Args:
             pattern (string): Pattern to lookup for
+            match (string): Match mode (contains, token, prefix)
 
         Returns:
             list: Return list of results if any, otherwise None
 
         """
-        results = None
-        query = self.db.query(SmaliConstString)
-        query = query.filter(
-            or_(
-                SmaliConstString.const_string_var.contains(pattern),
-                SmaliConstString.const_string_value.contains(pattern),
-                SmaliConstString.const_string_class.contains(pattern)
-                )
-        )
-        results = query.all()
-        return results
+        return self.search_pattern(self.db, 'consts', pattern, match)
 
+    @cached
     def search_method(self, args={}):
         """Searches for class methods
 
@@ -395,36 +728,37 @@ class AnalyzerSQLite(AnalysisBase):
 
             # Search for method id
             if args['type'] == 'id':
-                result = query.filter(
+                query = query.filter(
                     SmaliMethod.id == int(args['pattern'])
-                ).all()
+                )
 
             # Search for method name
             elif args['type'] == 'method_name':
-                result = query.filter(
-                    SmaliMethod.method_name.contains(args['pattern'])
-                ).all()
+                query = self.filter_pattern(
+                    query, SmaliMethod, ('method_name',),
+                    args['pattern'], args.get('match'))
 
             # Search for method type
             elif args['type'] == 'method_type':
-                result = query.filter(
-                    SmaliMethod.method_type.contains(args['pattern'])
-                ).all()
+                query = self.filter_pattern(
+                    query, SmaliMethod, ('method_type',),
+                    args['pattern'], args.get('match'))
 
             # Search for method class
             elif args['type'] == 'method_class':
-                result = query.filter(
-                    SmaliMethod.method_class.contains(args['pattern'])
-                ).all()
+                query = self.filter_pattern(
+                    query, SmaliMethod, ('method_class',),
+                    args['pattern'], args.get('match'))
 
             else:
                 log.error("Invalid search type: %s" % args['type'])
-        else:
-            result = query.all()
+                return result
 
+        result = self.fetch(query, SmaliMethod, args)
         return result
 
-    def search_method_by_pattern(self, pattern):
+    @cached
+    def search_method_by_pattern(self, pattern, match=None):
         """Searches methods by specific pattern.
 
         It will search for properties which have specified pattern whether in the
@@ -436,117 +770,439 @@ class AnalyzerSQLite(AnalysisBase):
 
         Args:
             pattern (string): Pattern to lookup for
+            match (string): Match mode (contains, token, prefix)
 
         Returns:
             list: Return list of results if any, otherwise None
 
         """
-        results = None
-        query = self.db.query(SmaliMethod)
-        query = query.filter(
-            or_(
-                SmaliMethod.method_name.contains(pattern),
-                SmaliMethod.method_type.contains(pattern),
-                SmaliMethod.method_ret.contains(pattern),
-                SmaliMethod.method_args.contains(pattern),
-                SmaliMethod.method_class.contains(pattern)
-            )
-        )
-        results = query.all()
-        return results
+        return self.search_pattern(self.db, 'methods', pattern, match)
 
+    @cached
     def search_call(self, args={}):
-        result = None
-        query = self.db.query(SmaliCall)
+        """Searches for calls
 
-        # - Apply filters ----------------------------------------------------
-        # from class
-        if 'from_class' in args:
-            if args['from_class']:
-                log.debug("from_class = %s" % args['from_class'])
-                query = query.filter(
-                    SmaliCall.from_class.contains(args['from_class']))
+        Every specified filter has to match.
 
-        # from method
-        if 'from_method' in args:
-            if args['from_method']:
-                log.debug("from_method = %s" % args['from_method'])
-                query = query.filter(
-                    SmaliCall.from_method.contains(args['from_method']))
+        Args:
+            args (dict): Specify a dict containing the search criterias
 
-        # to class
-        if 'to_class' in args:
-            if args['to_class']:
-                log.debug("to_class = %s" % args['to_class'])
-                query = query.filter(
-                    SmaliCall.dst_class.contains(args['to_class']))
+        Returns:
+            list: List of any results, None otherwise.
 
-        # to method
-        if 'to_method' in args:
-            if args['to_method']:
-                log.debug("to_method = %s" % args['to_method'])
-                query = query.filter(
-                    SmaliCall.dst_method.contains(args['to_method']))
+        """
+        result = None
+        query = self.db.query(SmaliCall)
 
-        # local arguments
-        if 'local_args' in args:
-            if args['local_args']:
-                log.debug("local_args = %s" % args['local_args'])
-                query = query.filter(
-                    SmaliCall.local_args.contains(args['local_args']))
+        # - Apply filters ----------------------------------------------------
+        filters = (
+            ('from_class', 'from_class'),
+            ('from_method', 'from_method'),
+            ('to_class', 'dst_class'),
+            ('to_method', 'dst_method'),
+            ('local_args', 'local_args'),
+            ('dest_args', 'dst_args')
+        )
 
-        # destination arguments
-        if 'dest_args' in args:
-            if args['dest_args']:
-                log.debug("dest_args = %s" % args['dest_args'])
-                query = query.filter(
-                    SmaliCall.dest_args.contains(args['dest_args']))
+        for arg, column in filters:
+            if arg in args:
+                if args[arg]:
+                    log.debug("%s = %s" % (arg, args[arg]))
+                    query = self.filter_pattern(
+                        query, SmaliCall, (column,),
+                        args[arg], args.get('match'))
 
         # - Make query and return results ------------------------------------
-        result = query.all()
+        result = self.fetch(query, SmaliCall, args)
 
         # Return results
         return result
 
-    def xref_call(self, results, xref_type, max_depth=1):
-        """ Get xref results """
+    def get_rows_by_id(self, model, ids):
+        """Returns rows of model by ID in the given order"""
+        ids = list(ids)
+        rows = {}
+
+        # Stay below SQLite's limit of bound parameters
+        for i in range(0, len(ids), MAX_QUERY_PARAMS):
+            for r in self.db.query(model).filter(
+                    model.id.in_(ids[i:i + MAX_QUERY_PARAMS])):
+                rows[r.id] = r
+
+        return [rows[i] for i in ids]
+
+    def get_rows_by_table(self, table, ids):
+        """Returns rows of table by ID in the given order"""
+        if not ids:
+            return []
+        return self.get_rows_by_id(MODELS[table], ids)
+
+    def get_calls_by_id(self, ids):
+        """Returns calls by ID in the given order"""
+        return self.get_rows_by_id(SmaliCall, ids)
+
+    def fingerprint(self):
+        """Returns the fingerprint of the database
+
+        The fingerprint changes whenever the database file is replaced
+        or modified.
+
+        Returns:
+            tuple: File path, device, inode, mtime, size and schema
+            version. None for databases without file.
+
+        """
+        path = database_file(self.db.get_bind())
+        try:
+            st = os.stat(path)
+        except (OSError, TypeError):
+            return None
+
+        key = (os.path.realpath(path), st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+        # Only ask SQLite if the file has changed
+        if self.schema[0] != key:
+            version = self.db.execute(text("PRAGMA schema_version")).scalar()
+            self.schema = (key, version)
+
+        return key + (self.schema[1],)
+
+    def cache_get(self, key):
+        """Returns cached results of query key, None if not cached"""
+        if self.cache is None:
+            return None
+
+        entry = self.cache.get(key, self.get_rows_by_table)
+        if entry is None:
+            return None
+        return Results(entry['rows'], entry['total'], entry['depth'],
+                       entry['more'], entry['table'])
+
+    def cache_put(self, key, results):
+        """Caches results of query key"""
+        if self.cache is not None and results is not None:
+            self.cache.put(key, results)
+
+    def cache_stats(self):
+        """Returns query cache statistics (see :meth:`QueryCache.stats`)"""
+        if self.cache is None:
+            return None
+        return self.cache.stats()
+
+    def clear_cache(self):
+        """Drops all cached queries"""
+        if self.cache is not None:
+            self.cache.clear()
+
+    def close(self):
+        """Writes the query cache to its file"""
+        if self.cache is not None:
+            self.cache.save()
+
+    def reopen(self):
+        """Opens own read-only connections in a forked worker process
+
+        Connections inherited from the parent process must not be used.
+        The query cache of the worker is kept in memory only.
+
+        """
+        filename = database_file(self.db.get_bind())
+        if filename is None:
+            return
+
+        engine = create_engine(filename, read_only=True, immutable=self.immutable)
+        self.db = sessionmaker(bind=engine)()
+        self.read_sessions = None
+        self.read_only = True
+        if self.cache is not None:
+            self.cache.filename = None
+
+    def store_reachability(self, reachable):
+        """Marks methods and calls as reachable or unreachable
+
+        Args:
+            reachable (callable): reachable(class, method, args) returns
+                True if the method is reachable
+
+        Returns:
+            bool: True if stored
+
+        """
+        if self.read_only:
+            log.error("DB is opened read-only, can't store reachability")
+            return False
+
+        methods = [
+            {'id': i, 'reachable': int(reachable(c, m, a))}
+            for i, c, m, a in self.db.query(
+                SmaliMethod.id, SmaliMethod.method_class,
+                SmaliMethod.method_name, SmaliMethod.method_args)]
+
+        # Calls are reachable if their calling method is
+        calls = [
+            {'id': i, 'reachable': int(reachable(c, m, a))}
+            for i, c, m, a in self.db.query(
+                SmaliCall.id, SmaliCall.from_class,
+                SmaliCall.from_method, SmaliCall.from_args)]
+
+        if methods:
+            self.db.execute(text(
+                "UPDATE methods SET reachable = :reachable WHERE id = :id"), methods)
+        if calls:
+            self.db.execute(text(
+                "UPDATE calls SET reachable = :reachable WHERE id = :id"), calls)
+        self.db.commit()
+        self.clear_cache()
+        return True
+
+    def has_metrics(self):
+        """Returns True if call graph metrics have been stored"""
+        return self.db.query(SmaliClassMetric.id).first() is not None
+
+    def store_metrics(self, methods, classes):
+        """Replaces stored call graph metrics
+
+        Args:
+            methods (list): Tuples of METHOD_METRICS values
+            classes (list): Tuples of CLASS_METRICS values
+
+        Returns:
+            bool: True if stored
+
+        """
+        if self.read_only:
+            log.error("DB is opened read-only, can't store metrics")
+            return False
+
+        for table, rows in (('method_metrics', methods), ('class_metrics', classes)):
+            model, columns, _ = METRIC_TABLES[table]
+            self.db.query(model).delete()
+            if rows:
+                self.db.execute(model.__table__.insert(), [dict(zip(columns, r)) for r in rows])
+        self.db.commit()
+        self.clear_cache()
+        return True
+
+    @cached
+    def search_metrics(self, table, args={}):
+        """Searches stored metrics
+
+        Args:
+            table (str): 'method_metrics' or 'class_metrics'
+            args (dict): Specify a dict containing the search criterias
+
+        Returns:
+            list: List of any results, None otherwise.
+
+        """
+        model, _, search_columns = METRIC_TABLES[table]
+        return self.search_stored(model, search_columns, args)
+
+    def search_stored(self, model, search_columns, args):
+        """Searches rows computed by the analyzer (metrics, findings)
+
+        Args:
+            model: The model to search (e.g. :class:`SmaliFinding`)
+            search_columns (list): Columns to search in
+            args (dict): Specify a dict containing the search criterias
+
+        Returns:
+            list: List of any results, None otherwise.
+
+        """
+        query = self.db.query(model)
+
+        if ('type' in args) and ('pattern' in args):
+            if args['type'] == 'id':
+                query = query.filter(model.id == int(args['pattern']))
+
+            elif args['type'] in search_columns:
+                query = self.filter_pattern(
+                    query, model, (args['type'],),
+                    args['pattern'], args.get('match'))
+
+            else:
+                log.error("Invalid search type: %s" % args['type'])
+                return None
+
+        return self.fetch(query, model, args)
+
+    def table_values(self, table, fields):
+        """Returns the ID and the fields values of all table rows
+
+        Rows are read in batches as plain tuples.
+
+        Args:
+            table (str): Table name
+            fields (list): Field names
+
+        Returns:
+            iterable: Tuples of ID and field values, ordered by ID
+
+        """
+        model = MODELS[table]
+        return self.db.query(model.id, *[getattr(model, f) for f in fields]) \
+            .order_by(model.id).yield_per(READ_BATCH_SIZE)
+
+    def has_findings(self):
+        """Returns True if scanner findings have been stored"""
+        return self.db.query(SmaliFinding.id).first() is not None
+
+    def store_findings(self, findings):
+        """Replaces stored scanner findings
+
+        Args:
+            findings (list): Tuples of FINDING_FIELDS values
+
+        Returns:
+            bool: True if stored
+
+        """
+        if self.read_only:
+            log.error("DB is opened read-only, can't store findings")
+            return False
+
+        self.db.query(SmaliFinding).delete()
+        if findings:
+            self.db.execute(
+                SmaliFinding.__table__.insert(),
+                [dict(zip(FINDING_FIELDS, f)) for f in findings])
+        self.db.commit()
+        self.clear_cache()
+        return True
+
+    @cached
+    def search_findings(self, args={}):
+        """Searches stored scanner findings
+
+        Args:
+            args (dict): Specify a dict containing the search criterias
+
+        Returns:
+            list: List of any results, None otherwise.
 
-        def to_xref(results):
-            """ Get xrefs pointing _calling_ the results"""
-            query = self.db.query(SmaliCall)
+        """
+        return self.search_stored(SmaliFinding, FINDING_SEARCH_COLUMNS, args)
 
-            # Unique class names
-            class_names = list(set([r.from_class for r in results]))
+    def has_hierarchy(self):
+        """Returns True if the class hierarchy closure has been stored"""
+        return self.db.query(SmaliHierarchy.id).first() is not None
 
-            # Make query
-            results = query.filter(SmaliCall.dst_class.in_(class_names)).all()
+    def store_hierarchy(self, rows):
+        """Replaces the stored class hierarchy closure
 
-            return results
+        Args:
+            rows (list): Tuples of HIERARCHY_FIELDS values
 
-        def from_xref(results):
-            """ Get xrefs which are __called__ by the results"""
-            query = self.db.query(SmaliCall)
+        Returns:
+            bool: True if stored
 
-            # Unique class names
-            class_names = list(set([r.dst_class for r in results]))
+        """
+        if self.read_only:
+            log.error("DB is opened read-only, can't store class hierarchy")
+            return False
+
+        self.db.query(SmaliHierarchy).delete()
+        if rows:
+            self.db.execute(
+                SmaliHierarchy.__table__.insert(),
+                [dict(zip(HIERARCHY_FIELDS, r)) for r in rows])
+        self.db.commit()
+        self.clear_cache()
+        return True
+
+    @cached
+    def search_hierarchy(self, args={}):
+        """Searches the class hierarchy closure
+
+        Exact class names are looked up by the ancestor and
+        descendant indexes.
 
-            # Make query
-            results = query.filter(SmaliCall.from_class.in_(class_names)).all()
+        Args:
+            args (dict): Specify a dict containing the search criterias
 
-            return results
+        Returns:
+            list: List of any results, None otherwise.
 
-        # Avoid if blocks
-        func_call = {'to': to_xref, 'from': from_xref}
-        tmp_res = None
+        """
+        query = self.db.query(SmaliHierarchy)
+
+        if 'pattern' in args:
+            column = args.get('type', 'ancestor')
+            if column not in HIERARCHY_SEARCH_COLUMNS:
+                log.error("Invalid search type: %s" % column)
+                return None
 
-        # Get xrefs <max_depth> times
-        for d in range(0, max_depth):
-            if not tmp_res:
-                tmp_res = func_call[xref_type](results)
+            if args.get('match'):
+                query = self.filter_pattern(
+                    query, SmaliHierarchy, (column,), args['pattern'], args['match'])
             else:
-                tmp_res = func_call[xref_type](tmp_res)
+                query = query.filter(getattr(SmaliHierarchy, column) == args['pattern'])
+
+        if args.get('direct'):
+            query = query.filter(SmaliHierarchy.distance == 1)
+
+        if args.get('kind'):
+            query = query.filter(SmaliHierarchy.kind == args['kind'])
+
+        return self.fetch(query, SmaliHierarchy, args)
+
+    @cached
+    def group(self, args={}):
+        """Counts rows by the values of some columns
+
+        Grouping, counting and ranking happen in a single query, only
+        the top groups are transferred. The number of groups is counted
+        by a window function over the grouped rows.
+
+        Args:
+            args (dict): 'table' (table name) and 'columns' (grouped
+                columns), optional 'type' (column) and 'pattern' to only
+                count matching rows, 'match', 'reverse' (least frequent
+                first) and 'top' (max. number of groups)
+
+        Returns:
+            Results: Tuples of the column values followed by the count,
+            most frequent first. The number of groups is in 'total'.
+            None if the table or a column is invalid.
+
+        """
+        model = MODELS.get(args.get('table'))
+        if model is None:
+            log.error("Invalid table: %s" % args.get('table'))
+            return None
+
+        columns = args.get('columns') or []
+        invalid = [c for c in columns if c not in model.__table__.columns]
+        if not columns or invalid:
+            log.error("Invalid group columns: %s" % (", ".join(invalid) or '-'))
+            return None
+
+        cols = [getattr(model, c) for c in columns]
+        count = func.count().label('count')
+        query = self.db.query(*cols).add_columns(count, func.count().over().label('groups'))
+
+        if ('type' in args) and ('pattern' in args):
+            if args['type'] not in model.__table__.columns:
+                log.error("Invalid search type: %s" % args['type'])
+                return None
+
+            query = self.filter_pattern(
+                query, model, (args['type'],), args['pattern'], args.get('match'))
+
+        query = query.group_by(*cols).order_by(
+            count.asc() if args.get('reverse') else count.desc(), *cols)
+
+        if args.get('top'):
+            query = query.limit(args['top'])
 
-            log.info("Run:\t%d\tResults:\t%d" % (d, len(tmp_res)))
+        rows = query.all()
+        return Results(
+            [tuple(r[:-1]) for r in rows], rows[0].groups if rows else 0)
 
-        # If no cross results, return old results
-        return tmp_res if tmp_res else results
+    def count_rows(self):
+        """Returns the number of rows by table name (in a single query)"""
+        tables = sorted(MODELS)
+        row = self.db.execute(text("SELECT %s" % ", ".join(
+            "(SELECT COUNT(*) FROM %s)" % t for t in tables))).one()
+        return dict(zip(tables, row))
@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         analysis/analysis_vector.py
+# Created:      2026-10-18
+# Purpose:      Vectorized call graph analytics using NumPy
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""Vectorized call graph analytics
+
+The calls of a :class:`smalisca.analysis.analysis_callgraph.CallGraphIndex`
+are loaded into NumPy integer arrays of calling and called method IDs.
+Degrees, PageRank and k-hop neighborhood sizes of all methods are then
+computed by array operations instead of Python loops.
+
+NumPy is an optional dependency, see :func:`available`.
+
+"""
+
+import collections
+
+from smalisca.core.smalisca_logging import log
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Columns of centrality rows (see :meth:`VectorGraph.centrality`)
+CENTRALITY_FIELDS = ('id', 'method_class', 'method_name', 'method_args',
+                     'in_degree', 'out_degree', 'pagerank', 'khop')
+
+#: Centrality of a method
+CentralityRow = collections.namedtuple('CentralityRow', CENTRALITY_FIELDS)
+
+# PageRank: damping factor, max. iterations and convergence tolerance
+PAGERANK_DAMPING = 0.85
+PAGERANK_ITERATIONS = 100
+PAGERANK_TOLERANCE = 1e-9
+
+# Number of methods whose k-hop neighborhoods are computed at once (as bit sets)
+KHOP_BATCH = 1024
+
+
+def available():
+    """Returns True if NumPy is installed"""
+    return np is not None
+
+
+def popcount(words):
+    """Counts set bits of every column of a 2D uint64 array
+
+    Neighborhoods are small, so only the non-zero words are unpacked.
+
+    Returns:
+        array: Number of rows having bit i set, for every bit i
+        (little endian within every word)
+
+    """
+    columns = np.nonzero(words)[1]
+    bits = np.unpackbits(
+        words[words != 0].view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    positions = columns[:, None] * 64 + np.arange(64)
+    return np.bincount(
+        positions.ravel(), weights=bits.ravel(),
+        minlength=words.shape[1] * 64).astype(np.int64)
+
+
+class VectorGraph(object):
+    """Call graph as NumPy edge arrays
+
+    Multiple calls between the same methods count as a single edge.
+
+    Attributes:
+        graph (CallGraphIndex): The call graph
+        n (int): Number of methods
+        src (array): Calling method by edge
+        dst (array): Called method by edge
+
+    """
+
+    def __init__(self, graph):
+        """Loads the edges of graph
+
+        Args:
+            graph (CallGraphIndex): The call graph
+
+        """
+        self.graph = graph
+        self.n = len(graph.nodes)
+
+        src = np.frombuffer(graph.edge_src, dtype=graph.edge_src.typecode).astype(np.int64)
+        dst = np.frombuffer(graph.edge_dst, dtype=graph.edge_dst.typecode).astype(np.int64)
+
+        # Distinct edges, ordered by calling method
+        keys = np.unique(src * self.n + dst)
+        self.src = keys // max(self.n, 1)
+        self.dst = keys % max(self.n, 1)
+
+    def in_degree(self):
+        """Returns the number of distinct callers of every method"""
+        return np.bincount(self.dst, minlength=self.n)
+
+    def out_degree(self):
+        """Returns the number of distinct callees of every method"""
+        return np.bincount(self.src, minlength=self.n)
+
+    def pagerank(self, damping=PAGERANK_DAMPING, iterations=PAGERANK_ITERATIONS,
+                 tolerance=PAGERANK_TOLERANCE):
+        """Computes the PageRank of every method by power iteration
+
+        Methods called by many (important) methods rank high. The rank
+        of methods without calls is distributed over all methods.
+
+        Args:
+            damping (float): Probability of following a call
+            iterations (int): Max. number of iterations
+            tolerance (float): Stop if the ranks change less (L1 norm)
+
+        Returns:
+            array: Ranks summing up to 1
+
+        """
+        if not self.n:
+            return np.zeros(0)
+
+        out_degree = self.out_degree()
+        dangling = out_degree == 0
+        weight = 1.0 / np.maximum(out_degree, 1)
+        rank = np.full(self.n, 1.0 / self.n)
+
+        for i in range(iterations):
+            spread = np.bincount(
+                self.dst, weights=(rank * weight)[self.src], minlength=self.n)
+            base = (1.0 - damping + damping * rank[dangling].sum()) / self.n
+            new = base + damping * spread
+            delta = np.abs(new - rank).sum()
+            rank = new
+            if delta < tolerance:
+                break
+
+        log.debug("PageRank: %d iterations" % (i + 1))
+        return rank
+
+    def khop(self, k, sources=None, callers=False):
+        """Computes the k-hop neighborhood size of methods
+
+        Neighborhoods of KHOP_BATCH methods are expanded at once as bit
+        sets: every hop ORs the new bits of the methods reached by the
+        last hop into their callees.
+
+        Args:
+            k (int): Max. number of calls
+            sources (array): Method IDs (None for all methods)
+            callers (bool): Follow calls backwards (count callers
+                instead of callees)
+
+        Returns:
+            array: Number of other methods reachable by at most k calls,
+            for every source
+
+        """
+        sources = np.arange(self.n) if sources is None else np.asarray(sources, dtype=np.int64)
+        sizes = np.zeros(len(sources), dtype=np.int64)
+        if not len(sources) or not len(self.src):
+            return sizes
+
+        src, dst = (self.dst, self.src) if callers else (self.src, self.dst)
+
+        # Order edges by target, so reduceat can OR all incoming sets
+        order = np.argsort(dst, kind='stable')
+        src = src[order]
+        dst = dst[order]
+        position = np.full(self.n, -1, dtype=np.int64)
+
+        for start in range(0, len(sources), KHOP_BATCH):
+            batch = sources[start:start + KHOP_BATCH]
+            bits = np.arange(len(batch))
+
+            reach = np.zeros((self.n, (len(batch) + 63) // 64), dtype=np.uint64)
+            np.bitwise_or.at(
+                reach, (batch, bits // 64),
+                np.left_shift(np.uint64(1), (bits % 64).astype(np.uint64)))
+
+            # Frontier: methods reached by the last hop and their new bits
+            rows = np.unique(batch)
+            values = reach[rows]
+
+            for _ in range(k):
+                # Only follow calls of frontier methods
+                position[rows] = np.arange(len(rows))
+                frontier = position[src]
+                position[rows] = -1
+
+                edges = np.flatnonzero(frontier >= 0)
+                if not len(edges):
+                    break
+
+                targets = dst[edges]
+                starts = np.flatnonzero(np.r_[True, targets[1:] != targets[:-1]])
+                rows = targets[starts]
+                values = np.bitwise_or.reduceat(
+                    values[frontier[edges]], starts, axis=0) & ~reach[rows]
+
+                new = values.any(axis=1)
+                rows = rows[new]
+                values = values[new]
+                reach[rows] |= values
+
+            # Don't count the method itself
+            sizes[start:start + len(batch)] = popcount(reach)[:len(batch)] - 1
+
+        return sizes
+
+    def centrality(self, nodes=None, k=None, callers=False):
+        """Returns degrees, PageRank and k-hop neighborhood sizes
+
+        Args:
+            nodes (iterable): Method IDs (None for all methods)
+            k (int): Compute k-hop neighborhood sizes (None to skip)
+            callers (bool): k-hop neighborhoods of callers instead of callees
+
+        Returns:
+            list: CentralityRow by method ('id' is the method ID + 1)
+
+        """
+        nodes = np.arange(self.n) if nodes is None else np.array(sorted(nodes), dtype=np.int64)
+        in_degree = self.in_degree()[nodes]
+        out_degree = self.out_degree()[nodes]
+        rank = self.pagerank()[nodes]
+        khop = self.khop(k, nodes, callers) if k else [None] * len(nodes)
+
+        return [
+            CentralityRow(int(node) + 1, *self.graph.nodes[node] + (
+                int(i), int(o), round(float(r), 8), None if h is None else int(h)))
+            for node, i, o, r, h in zip(nodes, in_degree, out_degree, rank, khop)]
@@ -78,6 +78,31 @@ class AnalyzerController(CementBaseController):
                 dict(
                     dest="commands_file",
                     help="Read commands from file instead of interactive prompt")),
+            (['-j', '--jobs'],
+                dict(
+                    dest="jobs", type=int,
+                    help="Run independent commands of the commands file (-c) "
+                         "in parallel by JOBS processes (0 for all cores)")),
+            (['--output-dir'],
+                dict(
+                    dest="output_dir",
+                    help="Write the output of every command (-c) to its own file "
+                         "in this directory")),
+            (['--jsonl'],
+                dict(
+                    dest="jsonl_file",
+                    help="Write the outputs of the commands (-c) as JSON lines "
+                         "to this file")),
+            (['--no-cache'],
+                dict(
+                    dest="no_cache", action='store_true',
+                    help="Don't cache query results (SQLite only)")),
+            (['--read-only'],
+                dict(
+                    dest="read_only", action='store_true',
+                    help="Open the DB read-only without locking, so many analyzers "
+                         "can share it. Nothing (e.g. reachability) is stored then. "
+                         "(SQLite only)")),
         ]
 
     @controller.expose(hide=True, aliases=['run'])
@@ -103,30 +128,95 @@ class AnalyzerController(CementBaseController):
             # Read SQLite data
             if self.app.pargs.fileformat == "sqlite":
                 from smalisca.analysis.analysis_sqlite import AnalyzerSQLite
+                from smalisca.analysis.analysis_cache import cache_filename
                 from smalisca.modules.module_sql_models import AppSQLModel
 
                 # Read SQLite data
-                appSQL = AppSQLModel(self.app.pargs.filename)
+                appSQL = AppSQLModel(self.app.pargs.filename, read_only=self.app.pargs.read_only)
                 log.info("Successfully opened SQLite DB")
 
+                # DBs created by older versions lack the search index
+                if self.app.pargs.read_only:
+                    if not appSQL.has_search_index():
+                        log.warn("No search index available, open the DB once for writing")
+
+                elif not appSQL.has_search_index():
+                    log.info("Creating search index ...")
+                    appSQL.create_search_index()
+
                 # Create analysis framework
                 log.info("Creating analyzer framework ...")
-                analysis = AnalyzerSQLite(appSQL.get_session())
+                if self.app.pargs.no_cache:
+                    analysis = AnalyzerSQLite(appSQL.get_session(), cache_size=0)
+                else:
+                    analysis = AnalyzerSQLite(
+                        appSQL.get_session(),
+                        cache_file=cache_filename(self.app.pargs.filename))
 
-            # Where to read commands from?
-            if self.app.pargs.commands_file:
-                commands = open(self.app.pargs.commands_file, "rt")
+            # Read JSON data
+            elif self.app.pargs.fileformat in ('json', 'jsonl'):
+                from smalisca.analysis.analysis_json import AnalyzerJSON
+
+                # Read JSON data
+                app.read_json(self.app.pargs.filename, self.app.pargs.fileformat)
+                log.info("Successfully read JSON data")
+
+                # Create analysis framework
+                log.info("Creating analyzer framework ...")
+                analysis = AnalyzerJSON(app)
+
+            # Read binary snapshot
+            elif self.app.pargs.fileformat == 'snapshot':
+                from smalisca.analysis.analysis_snapshot import AnalyzerSnapshot
+                from smalisca.modules.module_snapshot import Snapshot
+
+                # Map snapshot
                 try:
-                    log.info("Reading commands from %s" % self.app.pargs.commands_file)
+                    snapshot = Snapshot(self.app.pargs.filename)
+                except ValueError as e:
+                    log.error(e)
+                    return
+                log.info("Successfully opened snapshot")
+
+                # Create analysis framework
+                log.info("Creating analyzer framework ...")
+                analysis = AnalyzerSnapshot(snapshot)
+
+            # Where to read commands from?
+            try:
+                batch = (
+                    self.app.pargs.jobs is not None or
+                    self.app.pargs.output_dir or self.app.pargs.jsonl_file)
+
+                if self.app.pargs.commands_file and batch:
+                    from smalisca.analysis.analysis_batch import parse_commands
+                    from smalisca.analysis.analysis_batch import run_batch, write_batch
+
+                    with open(self.app.pargs.commands_file, "rt") as f:
+                        commands = parse_commands(f)
+                    log.info("Running %d commands from %s" % (
+                        len(commands), self.app.pargs.commands_file))
+                    write_batch(
+                        run_batch(analysis, commands, self.app.pargs.jobs),
+                        self.app.pargs.output_dir, self.app.pargs.jsonl_file)
+
+                elif self.app.pargs.commands_file:
+                    commands = open(self.app.pargs.commands_file, "rt")
+                    try:
+                        log.info("Reading commands from %s" % self.app.pargs.commands_file)
+                        cmd_shell = AnalyzerShell(analysis)
+                        cmd_shell.use_rawinput = False
+                        cmd_shell.stdin = commands
+                        cmd_shell.prompt = ''
+                        cmd_shell.cmdloop()
+                    finally:
+                        commands.close()
+                else:
+                    # Start new shell
+                    log.info("Starting new analysis shell")
                     cmd_shell = AnalyzerShell(analysis)
-                    cmd_shell.use_rawinput = False
-                    cmd_shell.stdin = commands
-                    cmd_shell.prompt = ''
                     cmd_shell.cmdloop()
-                finally:
-                    commands.close()
-            else:
-                # Start new shell
-                log.info("Starting new analysis shell")
-                cmd_shell = AnalyzerShell(analysis)
-                cmd_shell.cmdloop()
+
+            finally:
+                # Keep query cache for the next session, unmap snapshots
+                analysis.close()
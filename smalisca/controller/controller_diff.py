@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         controller/controller_diff.py
+# Created:      2026-10-18
+# Purpose:      Controller for comparing two parsed applications
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""CLI controller for diffing results"""
+
+import time
+
+import smalisca.core.smalisca_config as config
+from smalisca.core.smalisca_logging import log
+from smalisca.core.smalisca_app import App
+from smalisca.analysis.analysis_diff import diff, print_diff, write_diff
+
+from cement.core import controller
+from cement.core.controller import CementBaseController
+
+
+def open_analysis(filename, fileformat, read_only=False):
+    """Opens results file as analyzer
+
+    Args:
+        filename (str): Results file
+        fileformat (str): One of ANALYZER_INPUT_CHOICES
+        read_only (bool): Open SQLite DB read-only
+
+    Returns:
+        AnalysisBase: The analyzer, None on errors
+
+    """
+    if fileformat == 'sqlite':
+        from smalisca.analysis.analysis_sqlite import AnalyzerSQLite
+        from smalisca.modules.module_sql_models import AppSQLModel
+
+        appSQL = AppSQLModel(filename, read_only=read_only)
+        return AnalyzerSQLite(appSQL.get_session(), cache_size=0)
+
+    elif fileformat in ('json', 'jsonl'):
+        from smalisca.analysis.analysis_json import AnalyzerJSON
+
+        app = App(__name__)
+        app.read_json(filename, fileformat)
+        return AnalyzerJSON(app)
+
+    elif fileformat == 'snapshot':
+        from smalisca.analysis.analysis_snapshot import AnalyzerSnapshot
+        from smalisca.modules.module_snapshot import Snapshot
+
+        try:
+            return AnalyzerSnapshot(Snapshot(filename))
+        except ValueError as e:
+            log.error(e)
+
+    return None
+
+
+class DiffController(CementBaseController):
+    """Controller for comparing two versions of an application
+
+    Reports added, removed and changed classes, properties, methods,
+    calls and const-strings. Both versions have to be parsed before.
+
+    """
+
+    class Meta:
+        label = 'diff'
+        stacked_on = 'base'
+        stacked_type = 'nested'
+        description = config.HelpMessage.DIFF_HELP
+
+        arguments = config.COMMON_ARGS + [
+            (['--old'],
+                dict(
+                    dest="old_file", help="Results file of the old version (required)",
+                    required=True)),
+            (['--new'],
+                dict(
+                    dest="new_file", help="Results file of the new version (required)",
+                    required=True)),
+            (['-f', '--format'],
+                dict(
+                    dest="fileformat", help="Files format (of both versions)",
+                    choices=config.ANALYZER_INPUT_CHOICES,
+                    required=True)),
+            (['-o', '--output'],
+                dict(
+                    dest="output", help="Write diff as JSON to this file")),
+            (['--summary'],
+                dict(
+                    dest="summary", action='store_true',
+                    help="Only print the number of changes")),
+            (['--read-only'],
+                dict(
+                    dest="read_only", action='store_true',
+                    help="Open the DBs read-only (SQLite only)")),
+        ]
+
+    @controller.expose(hide=True, aliases=['run'])
+    def default(self):
+        """Default command"""
+        analyses = []
+        try:
+            for filename in (self.app.pargs.old_file, self.app.pargs.new_file):
+                analysis = open_analysis(
+                    filename, self.app.pargs.fileformat, self.app.pargs.read_only)
+                if analysis is None:
+                    return
+                log.info("Successfully opened %s" % filename)
+                analyses.append(analysis)
+
+            start = time.time()
+            result = diff(*analyses)
+            log.info("Compared versions in %.2fs" % (time.time() - start))
+
+            if self.app.pargs.output:
+                write_diff(result, self.app.pargs.output)
+                log.info("\tWrote diff to %s" % self.app.pargs.output)
+            else:
+                print_diff(result, self.app.pargs.summary)
+
+        finally:
+            for analysis in analyses:
+                analysis.close()
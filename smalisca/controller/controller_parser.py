@@ -35,9 +35,12 @@
 import smalisca.core.smalisca_config as config
 from smalisca.core.smalisca_app import App
 from smalisca.core.smalisca_logging import log
+from smalisca.analysis.analysis_sqlite import AnalyzerSQLite
 from smalisca.modules.module_sql_models import AppSQLModel
 from smalisca.modules.module_smali_parser import SmaliParser
+from smalisca.modules.module_snapshot import write_snapshot
 
+import configparser
 import multiprocessing
 import os
 from cement.core import controller
@@ -52,11 +55,12 @@ class SmaliParserProcess(multiprocessing.Process):
         files (list): List of file paths
     """
 
-    def __init__(self, dirs, suffix, result_queue):
+    def __init__(self, dirs, suffix, result_queue, detect=False):
         multiprocessing.Process.__init__(self)
         self.result_queue = result_queue
         self.dirs = dirs
         self.suffix = suffix
+        self.detect = detect
 
     def run(self):
         """Runs the process"""
@@ -65,7 +69,7 @@ class SmaliParserProcess(multiprocessing.Process):
             log.info("%s %d/%d Parsing %s ... " % (self.name, c, len(self.dirs), d))
 
             # Parse directory
-            parser = SmaliParser(d, self.suffix)
+            parser = SmaliParser(d, self.suffix, self.detect)
             parser.run()
 
             # Get and save results
@@ -84,6 +88,7 @@ class ConcurrentParser():
         jobs (int): Number of max allowed workers
         depth (int): Recursion level for directories depth
         result_queue (Queue): Proxy to some thread-safe queue
+        detect (bool): Classify const-strings while parsing
     """
 
     # Use a manager to proxy access to the real queue
@@ -92,11 +97,12 @@ class ConcurrentParser():
 
     processes = []
 
-    def __init__(self, location, suffix, jobs, depth=3):
+    def __init__(self, location, suffix, jobs, depth=3, detect=False):
         self.location = location
         self.suffix = suffix
         self.jobs = jobs
         self.depth = depth - 1
+        self.detect = detect
 
     def walk_location(self):
         """Walk through location and return lists of files and directories
@@ -150,7 +156,7 @@ class ConcurrentParser():
 
             # Create new process
             if len(sub_list) > 0:
-                p = SmaliParserProcess(sub_list, self.suffix, self.result_queue)
+                p = SmaliParserProcess(sub_list, self.suffix, self.result_queue, self.detect)
                 self.processes.append(p)
 
         # Start processes
@@ -213,6 +219,18 @@ class ParserController(CementBaseController):
                      choices=config.PARSER_OUTPUT_CHOICES)),
             (['-o', '--output'],
                 dict(help="Specify output file")),
+            (['--trigram-index'],
+                dict(dest="trigram_index", action="store_true",
+                     help="Create trigram index for substring searches (SQLite only)")),
+            (['--detect'],
+                dict(action="store_true",
+                     help="Classify const-strings (URL, IP, key, base64, "
+                          "high-entropy) while parsing")),
+            (['--rules'],
+                dict(dest="rules_file", nargs='?', const=config.PROJECT_RULES,
+                     help="Scan calls and const-strings for the patterns of this "
+                          "rules file (default: %s) and store the findings "
+                          "(SQLite only)" % config.PROJECT_RULES)),
         ]
 
     @controller.expose(hide=True, aliases=['run'])
@@ -238,7 +256,7 @@ class ParserController(CementBaseController):
             # Create new concurrent parser instance
             concurrent_parser = ConcurrentParser(
                 self.location, self.suffix,
-                self.jobs, self.depth)
+                self.jobs, self.depth, self.app.pargs.detect)
             concurrent_parser.walk_location()
             concurrent_parser.run()
 
@@ -261,6 +279,18 @@ class ParserController(CementBaseController):
                     app.write_json(self.app.pargs.output)
                     log.info("\tWrote results to %s" % self.app.pargs.output)
 
+                # Write results to JSON lines
+                elif self.app.pargs.fileformat == 'jsonl':
+                    log.info("Exporting results to JSON lines")
+                    app.write_jsonl(self.app.pargs.output)
+                    log.info("\tWrote results to %s" % self.app.pargs.output)
+
+                # Write results to binary snapshot
+                elif self.app.pargs.fileformat == 'snapshot':
+                    log.info("Exporting results to snapshot")
+                    write_snapshot(app, self.app.pargs.output)
+                    log.info("\tWrote results to %s" % self.app.pargs.output)
+
                 # Write results to sqlite
                 elif self.app.pargs.fileformat == 'sqlite':
                     appSQL = AppSQLModel(self.app.pargs.output)
@@ -268,33 +298,64 @@ class ParserController(CementBaseController):
                     try:
                         log.info("Exporting results to SQLite")
                         # Add classes
-                        log.info("\tExtract classes ...")
-                        for c in app.get_classes():
+                        log.info("\tExtract classes (%d) ..." % app.count_classes())
+                        for c in app.iter_classes():
                             appSQL.add_class(c)
 
                         # Add properties
-                        log.info("\tExtract class properties ...")
-                        for p in app.get_properties():
+                        log.info("\tExtract class properties (%d) ..." % app.count_properties())
+                        for p in app.iter_properties():
                             appSQL.add_property(p)
 
                         # Add const-strings
-                        log.info("\tExtract class const-strings ...")
-                        for c in app.get_const_strings():
+                        log.info("\tExtract class const-strings (%d) ..." % app.count_const_strings())
+                        for c in app.iter_const_strings():
                             appSQL.add_const_string(c)
 
                         # Add methods
-                        log.info("\tExtract class methods ...")
-                        for m in app.get_methods():
+                        log.info("\tExtract class methods (%d) ..." % app.count_methods())
+                        for m in app.iter_methods():
                             appSQL.add_method(m)
 
                         # Add calls
-                        log.info("\tExtract calls ...")
-                        for c in app.get_calls():
+                        log.info("\tExtract calls (%d) ..." % app.count_calls())
+                        for c in app.iter_calls():
                             appSQL.add_call(c)
 
+                        # Add interfaces
+                        log.info("\tExtract implemented interfaces (%d) ..." % app.count_interfaces())
+                        for i in app.iter_interfaces():
+                            appSQL.add_interface(i)
+
                         # Commit changes
                         log.info("\tCommit changes to SQLite DB")
                         appSQL.commit()
+
+                        # Build search index
+                        log.info("\tCreate search index")
+                        appSQL.create_search_index()
+
+                        if self.app.pargs.trigram_index:
+                            log.info("\tCreate trigram index")
+                            appSQL.create_trigram_index()
+
+                        # Graph statistics are computed once per DB
+                        log.info("\tCompute call graph metrics")
+                        analysis = AnalyzerSQLite(appSQL.get_session())
+                        analysis.analyze_metrics()
+
+                        # Hierarchy closure is built once per DB as well
+                        log.info("\tBuild class hierarchy")
+                        analysis.build_hierarchy()
+
+                        if self.app.pargs.rules_file:
+                            log.info("\tScan for rules of %s" % self.app.pargs.rules_file)
+                            try:
+                                analysis.scan(*config.read_rules(self.app.pargs.rules_file))
+                            except (IOError, configparser.Error) as e:
+                                log.error("Couldn't read rules from %s: %s" % (
+                                    self.app.pargs.rules_file, e))
+
                         log.info("\tWrote results to %s" % self.app.pargs.output)
 
                     finally:
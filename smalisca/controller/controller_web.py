@@ -66,6 +66,11 @@ class WebController(CementBaseController):
                 dict(
                     dest="port", type=int,
                     help="Specify port to listen on")),
+            (['--read-only'],
+                dict(
+                    dest="read_only", action='store_true',
+                    help="Open the DB read-only without locking and only "
+                         "serve GET requests")),
         ]
 
     @controller.expose(hide=True, aliases=['run'])
@@ -87,7 +92,7 @@ class WebController(CementBaseController):
             from smalisca.modules.module_sql_models import AppSQLModel
 
             # Read SQLite data
-            appSQL = AppSQLModel(self.app.pargs.filename)
+            appSQL = AppSQLModel(self.app.pargs.filename, read_only=self.app.pargs.read_only)
             log.info("Successfully opened SQLite DB")
 
             # Create API endpoints
@@ -96,5 +101,5 @@ class WebController(CementBaseController):
             # Start web server
             log.info("Starting web application ...")
             web_server = WebServer(host, port, flask_app)
-            web_server.create_blueprints(appSQL.get_session())
+            web_server.create_blueprints(appSQL.get_session(), read_only=self.app.pargs.read_only)
             web_server.run()
@@ -153,108 +153,180 @@ class App:
         if classname in self.classes:
             self.classes[classname]['methods'].append(method)
 
-    def get_classes(self):
-        """Return classes
+    def iter_classes(self):
+        """Iterate over classes
 
-        Returns:
-            list: List of classes, otherwise None
+        Yields:
+            dict: Class information
 
         """
-        data = []
         for k in self.classes.keys():
             c = self.classes[k]
-            data.append({
+            yield {
                 'name': c['name'],
                 'type': c['type'],
                 'package': c['package'],
                 'parent': c['parent'],
                 'path': c['path'],
                 'depth': c['depth']
-            })
+            }
 
-        return data
+    def iter_properties(self):
+        """Iterate over properties
 
-    def get_properties(self):
-        """Return properties
-
-        Returns:
-            list: List of properties, otherwise None
+        Yields:
+            dict: Property information
 
         """
-        data = []
         for c in self.classes.keys():
             properties = self.classes[c]['properties']
 
             for p in properties:
-                data.append({
+                yield {
                     'name': p['name'],
                     'type': p['type'],
                     'info': p['info'],
                     'class': c
-                })
-
-        return data
+                }
 
-    def get_const_strings(self):
-        """Return const strings
+    def iter_const_strings(self):
+        """Iterate over const strings
 
-        Returns:
-            list: List of const strings, otherwise None
+        Yields:
+            dict: Const string information
 
         """
-        data = []
         for c in self.classes.keys():
             const_strings = self.classes[c]['const-strings']
 
             for cs in const_strings:
-                data.append({
+                yield {
                     'name': cs['name'],
                     'value': cs['value'],
+                    'kind': cs.get('kind'),
                     'class': c
-                })
+                }
 
-        return data
+    def iter_interfaces(self):
+        """Iterate over implemented interfaces
 
-    def get_methods(self):
-        """Return methods
+        Yields:
+            dict: Class and interface name
 
-        Returns:
-            list: List of methods, otherwise None
+        """
+        for c in self.classes.keys():
+            for i in self.classes[c].get('interfaces', []):
+                yield {
+                    'interface': i,
+                    'class': c
+                }
+
+    def iter_methods(self):
+        """Iterate over methods
+
+        Yields:
+            dict: Method information
 
         """
-        data = []
         for c in self.classes.keys():
             methods = self.classes[c]['methods']
             for m in methods:
-                data.append({
+                yield {
                     'name': m['name'],
                     'type': m['type'],
                     'args': m['args'],
                     'return': m['return'],
                     'class': c
-                })
+                }
 
-        return data
+    def iter_calls(self):
+        """Iterate over calls
 
-    def get_calls(self):
-        """Return calls"""
-        data = []
+        Yields:
+            dict: Call information
+
+        """
         for c in self.classes.keys():
             methods = self.classes[c]['methods']
             for m in methods:
                 for invoke in m['calls']:
-                    data.append({
+                    yield {
                         'from_class': c,
                         'from_method': m['name'],
+                        'from_args': m['args'],
                         'local_args': invoke['local_args'],
                         'to_class': invoke['to_class'],
                         'to_method': invoke['to_method'],
                         'dst_args': invoke['dst_args'],
                         'return': invoke['return'],
                         'class': c
-                    })
+                    }
 
-        return data
+    def count_classes(self):
+        """Return number of classes"""
+        return len(self.classes)
+
+    def count_properties(self):
+        """Return number of properties"""
+        return sum(len(c['properties']) for c in self.classes.values())
+
+    def count_const_strings(self):
+        """Return number of const strings"""
+        return sum(len(c['const-strings']) for c in self.classes.values())
+
+    def count_interfaces(self):
+        """Return number of implemented interfaces"""
+        return sum(len(c.get('interfaces', [])) for c in self.classes.values())
+
+    def count_methods(self):
+        """Return number of methods"""
+        return sum(len(c['methods']) for c in self.classes.values())
+
+    def count_calls(self):
+        """Return number of calls"""
+        return sum(
+            len(m['calls'])
+            for c in self.classes.values() for m in c['methods'])
+
+    def get_classes(self):
+        """Return classes
+
+        Returns:
+            list: List of classes, otherwise None
+
+        """
+        return list(self.iter_classes())
+
+    def get_properties(self):
+        """Return properties
+
+        Returns:
+            list: List of properties, otherwise None
+
+        """
+        return list(self.iter_properties())
+
+    def get_const_strings(self):
+        """Return const strings
+
+        Returns:
+            list: List of const strings, otherwise None
+
+        """
+        return list(self.iter_const_strings())
+
+    def get_methods(self):
+        """Return methods
+
+        Returns:
+            list: List of methods, otherwise None
+
+        """
+        return list(self.iter_methods())
+
+    def get_calls(self):
+        """Return calls"""
+        return list(self.iter_calls())
 
     def get_all(self):
         """Returns classes, properties, methods and calls as a dict"""
@@ -285,11 +357,60 @@ class App:
         except IOError:
             log.error("Couldn't save data to %s" % filename)
 
-    def read_json(self, filename):
-        """Create class structure from json file"""
+    def write_jsonl(self, filename):
+        """Write app object as JSON lines to file
+
+        Every line holds exactly one class object. Unlike
+        :meth:`write_json` the whole document is never built in memory.
+
+        """
+        try:
+            with open(filename, 'w+') as f:
+                for c in self.classes.values():
+                    f.write(json.dumps(c))
+                    f.write("\n")
+
+        except IOError:
+            log.error("Couldn't save data to %s" % filename)
+
+    def read_json(self, filename, fileformat=None):
+        """Create class structure from JSON or JSON lines file
+
+        Args:
+            filename (str): File to read from
+            fileformat (str): 'json' (one app object) or 'jsonl' (one class
+                object per line). If None it's detected from the document.
+
+        """
         try:
             with open(filename, 'r') as f:
-                data = json.loads(json.load(f))
+                if fileformat == 'jsonl':
+                    self.read_jsonl_lines(f)
+                    return
+
+                try:
+                    data = json.load(f)
+
+                except ValueError:
+                    if fileformat == 'json':
+                        log.error("Couldn't parse JSON from %s" % filename)
+                        return
+
+                    # Not a single document: read one class per line
+                    f.seek(0)
+                    self.read_jsonl_lines(f)
+                    return
+
+                # A JSON lines file holding exactly one class
+                if isinstance(data, dict) and 'classes' not in data and 'name' in data:
+                    self.add_class_obj(data)
+                    return
+
+                # Set parser information
+                if 'parser' in data:
+                    self.parser = data['parser']
+                if 'location' in data:
+                    self.location = data['location']
 
                 # Set classes
                 if 'classes' in data:
@@ -298,6 +419,12 @@ class App:
         except IOError:
             log.error("Couldn't read from %s" % filename)
 
+    def read_jsonl_lines(self, f):
+        """Adds the class object of every non-empty line of file f"""
+        for line in f:
+            if line.strip():
+                self.add_class_obj(json.loads(line))
+
     def __str__(self):
         """ Return app als string"""
         return self.to_json()
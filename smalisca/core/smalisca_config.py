@@ -37,6 +37,7 @@ import smalisca
 import codecs
 import configparser
 import json
+import os
 from pyfiglet import Figlet
 
 # General project information
@@ -48,6 +49,9 @@ PROJECT_BANNER = PROJECT_NAME + " " + PROJECT_VERSION + "-" + PROJECT_DESC
 PROJECT_URL = "http://nullsecurity.net, http://{blog,www}.dornea.nu"
 PROJECT_MAIL = "info AEEET dornea DOT nu"
 PROJECT_CONF = smalisca.get_file("data/config/config.conf")
+PROJECT_SOURCES_SINKS = smalisca.get_file("data/config/sources_sinks.conf")
+PROJECT_RULES = smalisca.get_file("data/config/rules.conf")
+PROJECT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".smalisca", "cache")
 
 
 # Common CLI arguments
@@ -66,10 +70,11 @@ JSON_SETTINGS = {
 }
 
 # Input/Output formats
-# [MaÑAt the moment you can export the results as json/sqlite
-# but you can only analyze sqlite.
-PARSER_OUTPUT_CHOICES = ('json', 'sqlite')
-ANALYZER_INPUT_CHOICES = ('sqlite',)
+# You can export the results as json/jsonl/sqlite/snapshot and analyze
+# any of them. JSON (lines) files are analyzed in memory, snapshots
+# are mapped into memory.
+PARSER_OUTPUT_CHOICES = ('json', 'jsonl', 'sqlite', 'snapshot')
+ANALYZER_INPUT_CHOICES = ('sqlite', 'json', 'jsonl', 'snapshot')
 
 
 class HelpMessage:
@@ -99,6 +104,9 @@ class HelpMessage:
     # - Web ------------------------------------------------------------------
     WEB_HELP = "[--] Analyze results using web API."
 
+    # - Diff -----------------------------------------------------------------
+    DIFF_HELP = "[--] Compare the results of two versions of an application."
+
     # s (global search)
     ANALYZER_HELP_S = """
     [--] Search for pattern
@@ -168,6 +176,10 @@ class HelpMessage:
 
     b) Search for pattern "test" in column "const_string_var"
         scs -c const_string_var -p test
+
+    c) List URLs (needs a parser run with '--detect'). Kinds are:
+       url, ip, key, base64, entropy (matched exactly)
+        scs -c const_string_kind -p url
     """
 
     # sm (search methods)
@@ -213,6 +225,141 @@ class HelpMessage:
     be printed.
     """
 
+    # path (search call paths)
+    ANALYZER_HELP_PATH = """
+    >> Search for call paths between methods
+
+    Finds the shortest call paths from the source methods (-fc/-fm)
+    to the sink methods (-tc/-tm). Example:
+
+        path -fm onReceive -tc Ljava/lang/Runtime -tm exec -k 3
+    """
+
+    # entry (entry points and unreachable code)
+    ANALYZER_HELP_ENTRY = """
+    >> Find entry points and unreachable code
+
+    Entry points are callbacks of components declared in
+    AndroidManifest.xml and of classes extending framework
+    types. Every method reachable from them is marked, so
+    'sm' and 'scl' can filter by '--live' and '--dead'.
+    """
+
+    # reach (source to sink reachability)
+    ANALYZER_HELP_REACH = """
+    >> Search for sources reaching sinks
+
+    Reads source and sink methods from a config file (see
+    data/config/sources_sinks.conf) and reports every source
+    whose calling methods reach a sink, with one witness path.
+    """
+
+    # metrics (call graph metrics)
+    ANALYZER_HELP_METRICS = """
+    >> Show call graph metrics
+
+    Fan-in, fan-out and call cycles of methods ('-t method') or
+    coupling of classes ('-t class'). Metrics are computed once
+    and stored with the results. Examples:
+
+    a) Most called methods
+        metrics -s fan_in --reverse -r 10
+
+    b) Methods in call cycles
+        metrics --recursive -s scc
+
+    c) Classes with the most dependencies
+        metrics -t class -s fan_out --reverse -r 10
+    """
+
+    # stats (query cache statistics)
+    ANALYZER_HELP_STATS = """
+    >> Show table sizes and query cache statistics
+
+    Repeated searches are answered from a cache which is kept
+    between sessions and dropped whenever the DB changes.
+    """
+
+    # centrality (vectorized call graph metrics)
+    ANALYZER_HELP_CENTRALITY = """
+    >> Show centrality of methods
+
+    In/out degree (distinct callers/callees), PageRank and k-hop
+    neighborhood sizes of all methods are computed at once by
+    vectorized operations. Requires NumPy. Examples:
+
+    a) Most central methods
+        centrality -r 20
+
+    b) Methods reaching the most other methods by 3 calls
+        centrality -k 3 -s khop --reverse -r 20
+
+    c) Methods of a package reached by the most methods by 2 calls
+        centrality -c method_class -p Lcom/example -k 2 --callers -s khop --reverse
+    """
+
+    # scan (findings of scanner rules)
+    ANALYZER_HELP_SCAN = """
+    >> Scan calls and const-strings for rule patterns
+
+    All patterns of a rules file (default: data/config/rules.conf)
+    are matched in a single pass. Findings are stored with the
+    results, use '--update' to scan again (e.g. with other rules).
+    Examples:
+
+    a) All findings of rules containing 'crypto'
+        scan -c rule -p crypto
+
+    b) Scan with own rules
+        scan -f my_rules.conf --update
+
+    c) Number of findings by rule
+        group -t finding -g rule
+    """
+
+    # subtypes (class hierarchy)
+    ANALYZER_HELP_SUBTYPES = """
+    >> Search sub and super types of classes
+
+    The transitive class hierarchy (super classes and implemented
+    interfaces) is built once and stored with the results, use
+    '--update' to build it again. Class names are matched exactly
+    unless a match mode ('-m') is given. Examples:
+
+    a) All sub classes of BroadcastReceiver
+        subtypes -p Landroid/content/BroadcastReceiver
+
+    b) Classes implementing an interface directly
+        subtypes -p Ljava/lang/Runnable --direct
+
+    c) Super classes (no interfaces) of a class
+        subtypes -p Lcom/example/MainActivity --supertypes -k class
+
+    d) Most implemented interfaces
+        group -t interface -g interface_name
+    """
+
+    # group (count rows by columns)
+    ANALYZER_HELP_GROUP = """
+    >> Count rows by column values
+
+    Rows are grouped by the columns specified by '-g' and
+    counted by the analyzer, only the top groups are shown.
+    Use '-c' and '-p' to only count matching rows. Examples:
+
+    a) Classes per package
+        group -t class -g class_package
+
+    b) Calls per destination class
+        group -t call -g dst_class --top 20
+
+    c) Most called framework APIs
+        group -t call -g dst_class,dst_method -c dst_class -p Landroid/
+
+    d) Const strings per class
+        group -t const -g const_string_class
+    """
+
     # dc (draw classes)
     ANALYZER_HELP_DC = """
     >> Draw class graphs
@@ -267,5 +414,75 @@ class Config(object):
                         opts[s][o] = json.loads(self.parser[s][o])
         self.options = opts
 
+def read_sources_sinks(filename):
+    """Read source and sink methods from config file
+
+    Every option of the sections 'sources' and 'sinks' names a method
+    as <class>->(method), e.g. "Landroid/util/Log;->d". The method may
+    be empty to match every method of the class.
+
+    Args:
+        filename (str): Config file
+
+    Returns:
+        tuple: (sources, sinks) as dicts of label: (class, method)
+
+    Raises:
+        IOError: If the file can't be read
+        configparser.Error: If the file is malformed
+
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.optionxform = str
+    with codecs.open(filename, 'r', encoding='utf-8') as f:
+        parser.read_file(f)
+
+    lists = []
+    for section in ('sources', 'sinks'):
+        methods = {}
+        if parser.has_section(section):
+            for label, value in parser.items(section):
+                class_name, _, method = value.partition('->')
+                methods[label] = (class_name.strip().rstrip(';'), method.strip())
+        lists.append(methods)
+
+    return tuple(lists)
+
+
+def read_rules(filename):
+    """Read scanner rules from config file
+
+    Every option of the section 'calls' is a pattern matched against
+    call descriptors (e.g. "Landroid/telephony/SmsManager;->send"),
+    every option of the section 'strings' a pattern matched against
+    const-string values. Patterns are case-sensitive substrings.
+
+    Args:
+        filename (str): Config file
+
+    Returns:
+        tuple: (call rules, string rules) as dicts of rule: pattern
+
+    Raises:
+        IOError: If the file can't be read
+        configparser.Error: If the file is malformed
+
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.optionxform = str
+    with codecs.open(filename, 'r', encoding='utf-8') as f:
+        parser.read_file(f)
+
+    rules = []
+    for section in ('calls', 'strings'):
+        patterns = {}
+        if parser.has_section(section):
+            for rule, pattern in parser.items(section):
+                if pattern.strip():
+                    patterns[rule] = pattern.strip()
+        rules.append(patterns)
+
+    return tuple(rules)
+
 # Global config options
 smalisca_conf = Config()
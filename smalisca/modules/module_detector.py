@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         modules/module_detector.py
+# Created:      2026-10-18
+# Purpose:      Classify const-strings (URLs, IPs, keys) while parsing
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""Classifies const-strings while they are extracted
+
+Every string runs through a few cheap checks (length, whitespace,
+first character, prefixes) before any regular expression is applied
+or any entropy is computed. Most strings of an application (UI texts,
+class names, format strings) are rejected by these prefilters.
+
+"""
+
+import collections
+import math
+import re
+
+
+# Kinds of const-strings
+KIND_URL = 'url'
+KIND_IP = 'ip'
+KIND_KEY = 'key'
+KIND_BASE64 = 'base64'
+KIND_ENTROPY = 'entropy'
+
+KINDS = (KIND_URL, KIND_IP, KIND_KEY, KIND_BASE64, KIND_ENTROPY)
+
+# Prefixes of well-known API keys, tokens and key files
+KEY_PREFIXES = (
+    'AKIA', 'ASIA',                             # AWS access keys
+    'AIza',                                     # Google API keys
+    'ghp_', 'gho_', 'ghu_', 'ghs_', 'github_pat_',  # GitHub tokens
+    'xoxb-', 'xoxp-', 'xoxa-', 'xoxs-',         # Slack tokens
+    'sk_live_', 'pk_live_', 'rk_live_',         # Stripe keys
+    'sq0atp-', 'sq0csp-',                       # Square tokens
+    'SG.',                                      # SendGrid keys
+    '-----BEGIN'                                # PEM encoded keys
+)
+
+# Length limits
+MIN_KEY_LENGTH = 16
+MIN_SECRET_LENGTH = 20
+MAX_SECRET_LENGTH = 256
+MIN_BASE64_LENGTH = 64
+
+# Min. Shannon entropy (bits per character) of secrets
+HEX_ENTROPY = 3.0
+TOKEN_ENTROPY = 4.2
+
+RE_URL = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.\-]*://[^\s/?#]+\S*$')
+RE_IP = re.compile(r'^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})(:\d{1,5})?(/\S*)?$')
+RE_BASE64 = re.compile(r'^[A-Za-z0-9+/]+={0,2}$')
+RE_HEX = re.compile(r'^[A-Fa-f0-9]+$')
+RE_TOKEN = re.compile(r'^[A-Za-z0-9+/=_\-]+$')
+
+
+def entropy(value):
+    """Returns the Shannon entropy of value in bits per character"""
+    n = float(len(value))
+    return -sum(
+        c / n * math.log(c / n, 2)
+        for c in collections.Counter(value).values())
+
+
+def is_ip(value):
+    """Checks if value is an IPv4 address (optionally with port/path)"""
+    match = RE_IP.match(value)
+    return bool(match) and all(int(match.group(i)) <= 255 for i in range(1, 5))
+
+
+def is_secret(value):
+    """Checks if value looks like a random key or token
+
+    Hex strings and tokens need a different min. entropy since
+    the hex alphabet only has 16 characters.
+
+    """
+    # Random keys mix letters and digits
+    if value.isalpha() or value.isdigit():
+        return False
+
+    if RE_HEX.match(value):
+        return entropy(value) >= HEX_ENTROPY
+
+    if not RE_TOKEN.match(value):
+        return False
+
+    return entropy(value) >= TOKEN_ENTROPY
+
+
+def classify(value):
+    """Classifies a const-string value
+
+    Args:
+        value (str): The const-string value
+
+    Returns:
+        str: One of :data:`KINDS`, None if the string is none of them
+
+    """
+    n = len(value)
+    if n < 7:
+        return None
+
+    if value.startswith(KEY_PREFIXES) and n >= MIN_KEY_LENGTH:
+        return KIND_KEY
+
+    if '://' in value:
+        return KIND_URL if RE_URL.match(value) else None
+
+    # Neither IPs nor keys contain any whitespace
+    if ' ' in value:
+        return None
+
+    if value[0].isdigit() and value.count('.') == 3:
+        return KIND_IP if is_ip(value) else None
+
+    if n < MIN_SECRET_LENGTH:
+        return None
+
+    if n >= MIN_BASE64_LENGTH and n % 4 == 0 and RE_BASE64.match(value):
+        return KIND_BASE64
+
+    if n <= MAX_SECRET_LENGTH and is_secret(value):
+        return KIND_ENTROPY
+
+    return None
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         modules/module_manifest.py
+# Created:      2026-10-18
+# Purpose:      Read application components from AndroidManifest.xml
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""Read components from a decoded AndroidManifest.xml (e.g. by apktool)"""
+
+import os
+import xml.etree.ElementTree as ET
+
+from smalisca.core.smalisca_logging import log
+
+# Android XML namespace
+ANDROID_NS = '{http://schemas.android.com/apk/res/android}'
+
+# Component tags below <application>
+COMPONENT_TAGS = ('activity', 'activity-alias', 'service', 'receiver', 'provider')
+
+
+def class_name(name, package):
+    """Converts a manifest class name to a Smali class name
+
+    Args:
+        name (str): Class name as used in the manifest (e.g. ".Main")
+        package (str): Package of the application
+
+    Returns:
+        str: Smali class name (e.g. "Lcom/example/Main")
+
+    """
+    if name.startswith('.'):
+        name = package + name
+    elif '.' not in name:
+        name = package + '.' + name
+    return 'L' + name.replace('.', '/')
+
+
+def find_manifest(paths):
+    """Looks for AndroidManifest.xml in the dump directory
+
+    The dump directory is derived from the paths of the Smali files
+    (<dump directory>/smali*/...).
+
+    Args:
+        paths (iterable): Paths of Smali files
+
+    Returns:
+        str: Path of the manifest, None if not found
+
+    """
+    for path in paths:
+        parts = (path or '').split(os.sep)
+        for i, p in enumerate(parts):
+            if p.startswith('smali'):
+                manifest = os.path.join(os.sep.join(parts[:i]) or os.sep, 'AndroidManifest.xml')
+                if os.path.isfile(manifest):
+                    return manifest
+                break
+    return None
+
+
+def parse_manifest(filename):
+    """Returns the components declared by a manifest
+
+    Args:
+        filename (str): Path of AndroidManifest.xml
+
+    Returns:
+        list: List of (tag, Smali class name) tuples, None on errors
+
+    """
+    try:
+        root = ET.parse(filename).getroot()
+
+    except (IOError, ET.ParseError) as e:
+        log.error("Couldn't read manifest %s: %s" % (filename, e))
+        return None
+
+    package = root.get('package', '')
+    components = []
+
+    app = root.find('application')
+    if app is None:
+        return components
+
+    # Custom application class
+    if app.get(ANDROID_NS + 'name'):
+        components.append(('application', class_name(app.get(ANDROID_NS + 'name'), package)))
+
+    for tag in COMPONENT_TAGS:
+        for c in app.iter(tag):
+            name = c.get(ANDROID_NS + 'targetActivity' if tag == 'activity-alias' else ANDROID_NS + 'name')
+            if name:
+                components.append((tag, class_name(name, package)))
+
+    return components
@@ -37,6 +37,7 @@ import os
 import re
 from smalisca.core.smalisca_module import ModuleBase
 from smalisca.core.smalisca_logging import log
+from smalisca.modules.module_detector import classify
 
 
 class SmaliParser(ModuleBase):
@@ -47,11 +48,13 @@ class SmaliParser(ModuleBase):
         suffix (str): File name suffix
         current_path (str): Will be updated during parsing
         classes (list): Found classes
+        detect (bool): Classify const-strings while extracting them
 
     """
-    def __init__(self, location, suffix):
+    def __init__(self, location, suffix, detect=False):
         self.location = location
         self.suffix = suffix
+        self.detect = detect
         self.current_path = None
         self.classes = []
 
@@ -63,7 +66,7 @@ class SmaliParser(ModuleBase):
         """Parse specific file
 
         This will parse specified file for:
-            * classes
+            * classes (parent and implemented interfaces)
             * class properties
             * class methods
             * calls between methods
@@ -90,6 +93,11 @@ class SmaliParser(ModuleBase):
                     if match_class_parent:
                         current_class['parent'] = match_class_parent
 
+                elif '.implements' in l:
+                    match_class_interface = self.is_class_interface(l)
+                    if match_class_interface:
+                        current_class['interfaces'].append(match_class_interface)
+
                 elif '.field' in l:
                     match_class_property = self.is_class_property(l)
                     if match_class_property:
@@ -176,6 +184,23 @@ class SmaliParser(ModuleBase):
         else:
             return None
 
+    def is_class_interface(self, line):
+        """Check if line contains an implemented interface
+
+        Args:
+            line (str): Text line to be checked
+
+        Returns:
+            bool: True if line contains interface information, otherwise False
+
+        """
+        match = re.search("\.implements\s+(?P<interface>.*);", line)
+        if match:
+            log.debug("\t\tFound interface: %s" % match.group('interface'))
+            return match.group('interface')
+        else:
+            return None
+
     def is_class_property(self, line):
         """Check if line contains a field definition
 
@@ -274,6 +299,9 @@ class SmaliParser(ModuleBase):
             # Current file path
             'path': self.current_path,
 
+            # Implemented interfaces
+            'interfaces': [],
+
             # Properties
             'properties': [],
 
@@ -339,6 +367,10 @@ class SmaliParser(ModuleBase):
                 'value': match.group('value')
             }
 
+            # Classification (URL, IP, key, ...)
+            if self.detect:
+                c['kind'] = classify(c['value'])
+
             return c
         else:
             return None
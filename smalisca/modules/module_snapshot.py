@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# File:         modules/module_snapshot.py
+# Created:      2026-10-18
+# Purpose:      Compact binary snapshot of parsed results
+#
+# Copyright
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Victor Dorneanu <info AAET dornea DOT nu>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""Read and write parsed results as binary snapshots
+
+A snapshot is a single file which can be mapped into memory and used
+without any parsing step. It consists of:
+
+    * a header (magic, version, number of strings and rows)
+    * a string table (offsets + UTF-8 encoded blob)
+    * one int32 array per table (row-major, one string ID per column)
+    * uint32 offset arrays which map classes to their properties,
+      const-strings and methods and methods to their calls
+
+All integers are stored in little endian byte order. Every section
+starts at an 8 byte boundary.
+
+"""
+
+import array
+import mmap
+import struct
+import sys
+
+from smalisca.core.smalisca_logging import log
+
+# Snapshot file identification
+MAGIC = b'SMALISNP'
+VERSION = 5
+
+# magic, version, number of strings, blob size, number of rows per table
+HEADER = struct.Struct('<8sIIQ6I')
+
+# Tables and their columns. The order of the rows is the same as used by
+# the SQLite export, so row positions map to SQL IDs (ID = position + 1).
+TABLES = (
+    ('classes', ('class_name', 'class_type', 'class_package', 'depth', 'path',
+                 'class_parent')),
+    ('properties', ('property_name', 'property_type', 'property_info', 'property_class')),
+    ('const_strings', ('const_string_var', 'const_string_value', 'const_string_class',
+                       'const_string_kind')),
+    ('methods', ('method_name', 'method_type', 'method_args', 'method_ret', 'method_class')),
+    ('calls', ('from_class', 'from_method', 'local_args',
+               'dst_class', 'dst_method', 'dst_args', 'ret', 'from_args')),
+    ('interfaces', ('class_name', 'interface_name')),
+)
+
+# Columns holding plain integers instead of string IDs
+INT_COLUMNS = ('depth',)
+
+# Offset arrays: (name, parent table)
+OFFSETS = (
+    ('class_properties', 'classes'),
+    ('class_const_strings', 'classes'),
+    ('class_methods', 'classes'),
+    ('method_calls', 'methods'),
+)
+
+
+def align(pos):
+    """Returns next 8 byte boundary"""
+    return (pos + 7) & ~7
+
+
+def cumulate(keys, counts):
+    """Returns offsets array from per key counts"""
+    offsets = array.array('I', [0])
+    for k in keys:
+        offsets.append(offsets[-1] + counts.get(k, 0))
+    return offsets
+
+
+class SnapshotWriter(object):
+    """Builds a snapshot from an App
+
+    Attributes:
+        strings (dict): Maps strings to their IDs
+        string_offsets (array): Offsets of strings inside the blob
+        blob (list): Encoded strings
+        tables (dict): Table arrays by table name
+        offsets (dict): Offset arrays by name
+
+    """
+
+    def __init__(self):
+        self.strings = {}
+        self.string_offsets = array.array('Q', [0])
+        self.blob = []
+        self.blob_size = 0
+        self.tables = dict((name, array.array('i')) for name, _ in TABLES)
+        self.offsets = {}
+
+    def intern(self, s):
+        """Returns string ID of s, adds it to the string table if necessary"""
+        if s is None:
+            return -1
+
+        sid = self.strings.get(s)
+        if sid is None:
+            data = s.encode('utf-8')
+            sid = len(self.strings)
+            self.strings[s] = sid
+            self.blob.append(data)
+            self.blob_size += len(data)
+            self.string_offsets.append(self.blob_size)
+
+        return sid
+
+    def add_row(self, table, columns, values):
+        """Appends row to table array"""
+        data = self.tables[table]
+        for c, v in zip(columns, values):
+            data.append(v if c in INT_COLUMNS else self.intern(v))
+
+    def add_app(self, app):
+        """Adds classes, properties, const-strings, methods, calls and interfaces of app
+
+        Args:
+            app (App): A :class:`smalisca.core.smalisca_app.App` instance
+
+        """
+        columns = dict(TABLES)
+        class_names = []
+        counts = {'properties': {}, 'const_strings': {}, 'methods': {}}
+
+        for c in app.iter_classes():
+            class_names.append(c['name'])
+            self.add_row('classes', columns['classes'], (
+                c['name'], c['type'], c['package'], c['depth'], c['path'],
+                c['parent']))
+
+        for p in app.iter_properties():
+            counts['properties'][p['class']] = counts['properties'].get(p['class'], 0) + 1
+            self.add_row('properties', columns['properties'], (
+                p['name'], p['type'], p['info'], p['class']))
+
+        for cs in app.iter_const_strings():
+            counts['const_strings'][cs['class']] = counts['const_strings'].get(cs['class'], 0) + 1
+            self.add_row('const_strings', columns['const_strings'], (
+                cs['name'], cs['value'], cs['class'], cs['kind']))
+
+        for m in app.iter_methods():
+            counts['methods'][m['class']] = counts['methods'].get(m['class'], 0) + 1
+            self.add_row('methods', columns['methods'], (
+                m['name'], m['type'], m['args'], m['return'], m['class']))
+
+        for c in app.iter_calls():
+            self.add_row('calls', columns['calls'], (
+                c['from_class'], c['from_method'], c['local_args'],
+                c['to_class'], c['to_method'], c['dst_args'], c['return'],
+                c['from_args']))
+
+        for i in app.iter_interfaces():
+            self.add_row('interfaces', columns['interfaces'], (i['class'], i['interface']))
+
+        # Calls are ordered by their calling method
+        method_calls = array.array('I', [0])
+        for name in class_names:
+            for m in app.classes[name]['methods']:
+                method_calls.append(method_calls[-1] + len(m['calls']))
+
+        self.offsets['class_properties'] = cumulate(class_names, counts['properties'])
+        self.offsets['class_const_strings'] = cumulate(class_names, counts['const_strings'])
+        self.offsets['class_methods'] = cumulate(class_names, counts['methods'])
+        self.offsets['method_calls'] = method_calls
+
+    def write(self, filename):
+        """Writes snapshot to filename"""
+        sections = [self.string_offsets, b''.join(self.blob)]
+        sections += [self.tables[name] for name, _ in TABLES]
+        sections += [self.offsets[name] for name, _ in OFFSETS]
+
+        with open(filename, 'wb') as f:
+            f.write(HEADER.pack(
+                MAGIC, VERSION, len(self.strings), self.blob_size,
+                *[len(self.tables[name]) // len(cols) for name, cols in TABLES]))
+
+            for s in sections:
+                f.write(b'\0' * (align(f.tell()) - f.tell()))
+
+                if isinstance(s, array.array) and sys.byteorder != 'little':
+                    s = array.array(s.typecode, s)
+                    s.byteswap()
+
+                f.write(s if isinstance(s, bytes) else s.tobytes())
+
+
+def write_snapshot(app, filename):
+    """Writes app as snapshot to filename
+
+    Args:
+        app (App): A :class:`smalisca.core.smalisca_app.App` instance
+        filename (str): Snapshot file name
+
+    """
+    try:
+        writer = SnapshotWriter()
+        writer.add_app(app)
+        writer.write(filename)
+
+    except IOError:
+        log.error("Couldn't save data to %s" % filename)
+
+
+class Snapshot(object):
+    """Memory mapped snapshot
+
+    Nothing is parsed while opening the snapshot. All arrays are views
+    into the mapped file and strings are decoded when accessed.
+
+    Attributes:
+        counts (dict): Number of rows by table name
+        columns (dict): Column names by table name
+        tables (dict): Table arrays by table name
+        offsets (dict): Offset arrays by name
+
+    """
+
+    def __init__(self, filename):
+        """Maps snapshot into memory
+
+        Args:
+            filename (str): Snapshot file name
+
+        Raises:
+            ValueError: If the file is not a valid snapshot
+
+        """
+        self.fd = open(filename, 'rb')
+        self.mm = None
+        try:
+            self.mm = mmap.mmap(self.fd.fileno(), 0, access=mmap.ACCESS_READ)
+            header = self.read_header(filename)
+        except ValueError:
+            if self.mm is not None:
+                self.mm.close()
+            self.fd.close()
+            raise
+
+        n_strings, blob_size = header[2], header[3]
+        self.counts = dict(zip([name for name, _ in TABLES], header[4:]))
+        self.columns = dict(TABLES)
+
+        self.view = memoryview(self.mm)
+        self.pos = HEADER.size
+        self.string_offsets = self.map_array('Q', n_strings + 1)
+        self.blob = self.map_bytes(blob_size)
+
+        self.tables = {}
+        for name, cols in TABLES:
+            self.tables[name] = self.map_array('i', self.counts[name] * len(cols))
+
+        self.offsets = {}
+        for name, parent in OFFSETS:
+            self.offsets[name] = self.map_array('I', self.counts[parent] + 1)
+
+    def read_header(self, filename):
+        """Returns the header values of the mapped file
+
+        Raises:
+            ValueError: If the file is not a valid snapshot
+
+        """
+        if len(self.mm) < HEADER.size:
+            raise ValueError("Not a smalisca snapshot: %s" % filename)
+
+        header = HEADER.unpack_from(self.mm, 0)
+        if header[0] != MAGIC:
+            raise ValueError("Not a smalisca snapshot: %s" % filename)
+
+        if header[1] != VERSION:
+            raise ValueError("Unsupported snapshot version %d: %s" % (header[1], filename))
+
+        return header
+
+    def map_bytes(self, size):
+        """Returns a view on the next section"""
+        self.pos = align(self.pos)
+        data = self.view[self.pos:self.pos + size]
+        self.pos += size
+        return data
+
+    def map_array(self, typecode, count):
+        """Returns an integer view on the next section"""
+        data = self.map_bytes(count * array.array(typecode).itemsize)
+
+        # Views can only be used on little endian machines
+        if sys.byteorder != 'little':
+            a = array.array(typecode, data.tobytes())
+            a.byteswap()
+            return a
+
+        return data.cast(typecode)
+
+    def string(self, sid):
+        """Returns string by ID"""
+        if sid < 0:
+            return None
+        return str(self.blob[self.string_offsets[sid]:self.string_offsets[sid + 1]], 'utf-8')
+
+    def value(self, column, v):
+        """Converts a stored value of column to its real value"""
+        return v if column in INT_COLUMNS else self.string(v)
+
+    def row(self, table, pos):
+        """Returns values of row at position pos"""
+        cols = self.columns[table]
+        start = pos * len(cols)
+        data = self.tables[table][start:start + len(cols)]
+        return [self.value(c, v) for c, v in zip(cols, data)]
+
+    def column(self, table, column):
+        """Returns stored values of a single column"""
+        cols = self.columns[table]
+        return self.tables[table][cols.index(column)::len(cols)]
+
+    def children(self, name, pos):
+        """Returns positions of child rows using the offset array name"""
+        return range(self.offsets[name][pos], self.offsets[name][pos + 1])
+
+    def close(self):
+        """Unmaps snapshot
+
+        The views into the mapping are released first. Views handed out
+        by :meth:`column` which are still in use keep the mapping alive,
+        it's unmapped along with the last of them then.
+
+        """
+        if self.mm is None:
+            return
+
+        views = [self.string_offsets, self.blob, self.view]
+        views.extend(self.tables.values())
+        views.extend(self.offsets.values())
+        self.string_offsets = self.blob = self.view = self.tables = self.offsets = None
+
+        for v in views:
+            if isinstance(v, memoryview):
+                try:
+                    v.release()
+                except BufferError:
+                    pass
+
+        try:
+            self.mm.close()
+        except BufferError:
+            log.debug("Snapshot still in use, unmapping it later")
+
+        self.fd.close()
+        self.mm = self.fd = None
@@ -32,19 +32,26 @@
 
 """Represent an App as SQL data"""
 
+import os
 import textwrap
 import sqlalchemy as sql
-from sqlalchemy import ForeignKey
+from urllib.parse import quote, unquote
+from sqlalchemy import ForeignKey, event
 from sqlalchemy.orm import relationship, scoped_session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
 import smalisca.core.smalisca_config as config
 from smalisca.core.smalisca_logging import log
+from smalisca.analysis.analysis_search import compile_regex, match_value
 
 __author__ = config.PROJECT_AUTHOR
 
 Base = declarative_base()
 
+# Page cache and memory map size of read-only connections (bytes)
+READ_CACHE_SIZE = 128 * 1024 * 1024
+READ_MMAP_SIZE = 1024 * 1024 * 1024
+
 # Tables defining relationships between entities
 # Classes <-> Properties
 class_properties_table = sql.Table(
@@ -68,6 +75,175 @@ class_methods_table = sql.Table(
 )
 
 
+# Full-text search index: indexed columns by table name
+# (see :meth:`AppSQLModel.create_search_index`)
+SEARCH_INDEX_COLUMNS = {
+    'classes': ('class_name', 'class_type', 'class_package', 'path'),
+    'properties': ('property_name', 'property_type', 'property_info', 'property_class'),
+    'const_strings': ('const_string_var', 'const_string_value', 'const_string_class'),
+    'methods': ('method_name', 'method_type', 'method_args', 'method_ret', 'method_class'),
+    'calls': ('from_class', 'from_method', 'local_args', 'dst_class', 'dst_method', 'dst_args')
+}
+
+
+def search_index_name(table):
+    """Returns name of the full-text index table of table"""
+    return "%s_fts" % table
+
+
+def trigram_index_name(table):
+    """Returns name of the trigram index table of table"""
+    return "%s_tri" % table
+
+
+def has_index(session, index_name):
+    """Checks if the index tables exist
+
+    Args:
+        session: A SQLAlchemy DB session
+        index_name (func): Returns index table name by table name
+            (:func:`search_index_name` or :func:`trigram_index_name`)
+
+    Returns:
+        bool: True if all index tables exist, otherwise False
+
+    """
+    names = set(r[0] for r in session.execute(sql.text(
+        "SELECT name FROM sqlite_master WHERE type = 'table'")))
+    return all(index_name(t) in names for t in SEARCH_INDEX_COLUMNS)
+
+
+def upgrade_schema(engine):
+    """Adds columns and indexes missing in databases created by older versions
+
+    Added columns are NULL for already existing rows.
+
+    Args:
+        engine: A SQLAlchemy engine
+
+    """
+    with engine.begin() as conn:
+        for table, c in missing_columns(conn):
+            log.info("Adding column %s.%s" % (table.name, c.name))
+            conn.execute(sql.text("ALTER TABLE %s ADD COLUMN %s %s" % (
+                table.name, c.name, c.type.compile(engine.dialect))))
+
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+def missing_columns(conn):
+    """Returns (table, column) of model columns missing in the database
+
+    Columns of missing tables are returned as well.
+
+    Args:
+        conn: A SQLAlchemy connection
+
+    """
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        existing = set(r[1] for r in conn.execute(
+            sql.text("PRAGMA table_info(%s)" % table.name)))
+        missing.extend((table, c) for c in table.columns if c.name not in existing)
+    return missing
+
+
+def create_engine(sqlitedb, read_only=False, immutable=False):
+    """Creates an engine for a SQLite file
+
+    Read-only connections get a large page cache and memory map the
+    file (see READ_CACHE_SIZE and READ_MMAP_SIZE).
+
+    Args:
+        sqlitedb (str): SQLite file name
+        read_only (bool): Open the file read-only. Writes fail and the
+            connections never take write locks.
+        immutable (bool): Additionally declare the file as immutable, so
+            SQLite neither locks it nor checks it for changes. The file
+            must not be modified while it's opened.
+
+    Returns:
+        Engine: A SQLAlchemy engine with the user defined SQL
+        functions registered
+
+    """
+    if read_only or immutable:
+        url = 'sqlite:///file:%s?mode=ro%s&uri=true' % (
+            quote(os.path.abspath(sqlitedb)), '&immutable=1' if immutable else '')
+    else:
+        url = 'sqlite:///' + sqlitedb
+
+    engine = sql.create_engine(url)
+    event.listen(engine, 'connect', register_functions)
+    if read_only or immutable:
+        event.listen(engine, 'connect', configure_read_only)
+    return engine
+
+
+def database_file(engine):
+    """Returns the file name of a SQLite engine, None for in-memory DBs"""
+    name = engine.url.database
+    if not name or name == ':memory:':
+        return None
+
+    # URI file names (see :func:`create_engine`)
+    if name.startswith('file:'):
+        name = unquote(name[len('file:'):].split('?')[0])
+    return name
+
+
+def sqlite_regexp(pattern, value):
+    """Implements SQLite's REGEXP operator (value REGEXP pattern)
+
+    Args:
+        pattern (str): Regular expression
+        value (str): Column value
+
+    Returns:
+        bool: True if pattern matches (anywhere in) value, otherwise False
+
+    """
+    if value is None:
+        return False
+    return compile_regex(pattern).search(value) is not None
+
+
+def sqlite_match(pattern, value, match):
+    """Implements the MATCH_VALUE function (MATCH_VALUE(pattern, value, match))
+
+    Used for token and prefix searches in columns without search index.
+
+    Args:
+        pattern (str): Search pattern
+        value: Column value
+        match (str): Match mode (see :func:`smalisca.analysis.analysis_search.match_value`)
+
+    Returns:
+        bool: True if value matches pattern, otherwise False
+
+    """
+    if value is None:
+        return False
+    return match_value(pattern, str(value), match)
+
+
+def register_functions(dbapi_connection, connection_record):
+    """Registers user defined SQL functions on every new connection"""
+    dbapi_connection.create_function('regexp', 2, sqlite_regexp)
+    dbapi_connection.create_function('match_value', 3, sqlite_match)
+
+
+def configure_read_only(dbapi_connection, connection_record):
+    """Tunes every new read-only connection for lookups"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only = 1")
+    cursor.execute("PRAGMA cache_size = -%d" % (READ_CACHE_SIZE // 1024))
+    cursor.execute("PRAGMA mmap_size = %d" % READ_MMAP_SIZE)
+    cursor.close()
+
+
 class SmaliClass(Base):
     """Models a Smali class
 
@@ -78,6 +254,7 @@ class SmaliClass(Base):
         class_package (str): Name of the package the class belongs to
         depth (integer): Some path depth (not used)
         path (str): Location of file where the class has been found
+        class_parent (str): Name of the super class
         properties (list): List of properties (:class:`SmaliProperty`)
         methods (list): List of methods (:class:`SmaliMethod`)
 
@@ -97,6 +274,7 @@ class SmaliClass(Base):
     class_package = sql.Column(sql.Text)
     depth = sql.Column(sql.Integer)
     path = sql.Column(sql.Text)
+    class_parent = sql.Column(sql.Text)
 
     # Relationships
     properties = relationship(
@@ -180,6 +358,7 @@ class SmaliConstString(Base):
         id (integer): Primary key
         const_string_var (str): Name of the variable
         const_string_value (str): Value of const string
+        const_string_kind (str): Classification of the value (URL, IP, ...)
 
     """
     __tablename__ = "const_strings"
@@ -189,6 +368,7 @@ class SmaliConstString(Base):
     const_string_var = sql.Column(sql.Text)
     const_string_value = sql.Column(sql.Text)
     const_string_class = sql.Column(sql.Text)
+    const_string_kind = sql.Column(sql.Text, index=True)
 
     def to_string(self):
         s = """
@@ -196,7 +376,9 @@ class SmaliConstString(Base):
         \t[+] Variable: \t%s
         \t[+] Value: \t%s
         \t[+] Class: \t%s
-        """ % (self.id, self.const_string_var, self.const_string_value, self.const_string_class)
+        \t[+] Kind: \t%s
+        """ % (self.id, self.const_string_var, self.const_string_value, self.const_string_class,
+               self.const_string_kind)
 
         return textwrap.dedent(s)
 
@@ -217,6 +399,8 @@ class SmaliMethod(Base):
         method_args (str): Method arguments (e.g. Landroid/os/Parcelable;Ljava/lang/ClassLoader;)
         method_ret (str): Methods return value (Z, I, [I, etc.)
         method_class (str): The class the method belongs to
+        reachable (integer): 1 if reachable from an entry point, 0 if not,
+            NULL if not analyzed yet
     """
     __tablename__ = "methods"
 
@@ -237,6 +421,9 @@ class SmaliMethod(Base):
     method_ret = sql.Column(sql.Text)
     method_class = sql.Column(sql.Text)
 
+    # Reachability (see :meth:`AnalysisBase.analyze_reachability`)
+    reachable = sql.Column(sql.Integer, index=True)
+
     def to_string(self):
         s = """
         :: ID: %d\n
@@ -268,6 +455,8 @@ class SmaliCall(Base):
         dst_method (str): Called method
         dst_args (str): Called args
         ret (str): Return value
+        from_args (str): Arguments of calling method
+        reachable (integer): Reachability of the calling method
 
     """
     __tablename__ = "calls"
@@ -276,18 +465,24 @@ class SmaliCall(Base):
     id = sql.Column(sql.Integer, primary_key=True)
 
     # Source class/method/args
-    from_class = sql.Column(sql.Text)
+    from_class = sql.Column(sql.Text, index=True)
     from_method = sql.Column(sql.Text)
     local_args = sql.Column(sql.Text)
 
     # Destination class/method/args
-    dst_class = sql.Column(sql.Text)
+    dst_class = sql.Column(sql.Text, index=True)
     dst_method = sql.Column(sql.Text)
     dst_args = sql.Column(sql.Text)
 
     # Return value
     ret = sql.Column(sql.Text)
 
+    # Arguments of the calling method
+    from_args = sql.Column(sql.Text)
+
+    # Reachability of the calling method
+    reachable = sql.Column(sql.Integer, index=True)
+
     # FIXME: Add prettytable
     def to_string(self):
         s = """
@@ -319,6 +514,131 @@ class SmaliCall(Base):
         return self.to_string()
 
 
+class SmaliMethodMetric(Base):
+    """Call graph metrics of a method
+
+    Rows are computed from the calls table (see
+    :meth:`smalisca.analysis.analysis_callgraph.CallGraphIndex.metrics`),
+    so methods of external classes are included.
+
+    Attributes:
+        id (integer): Primary key
+        method_class (str): Class of the method
+        method_name (str): Name of the method
+        method_args (str): Method arguments
+        fan_in (integer): Number of distinct calling methods
+        fan_out (integer): Number of distinct called methods
+        scc (integer): Strongly connected component of the method
+        scc_size (integer): Number of methods in the component
+        recursive (integer): 1 if the method is part of a call cycle
+
+    """
+    __tablename__ = "method_metrics"
+
+    # Fields
+    id = sql.Column(sql.Integer, primary_key=True)
+    method_class = sql.Column(sql.Text, index=True)
+    method_name = sql.Column(sql.Text)
+    method_args = sql.Column(sql.Text)
+    fan_in = sql.Column(sql.Integer, index=True)
+    fan_out = sql.Column(sql.Integer, index=True)
+    scc = sql.Column(sql.Integer, index=True)
+    scc_size = sql.Column(sql.Integer, index=True)
+    recursive = sql.Column(sql.Integer, index=True)
+
+
+class SmaliClassMetric(Base):
+    """Call graph metrics of a class
+
+    Attributes:
+        id (integer): Primary key
+        class_name (str): Name of the class
+        methods (integer): Number of methods in the call graph
+        fan_in (integer): Number of distinct classes calling the class
+        fan_out (integer): Number of distinct classes called by the class
+        coupling (integer): Number of distinct classes coupled either way
+
+    """
+    __tablename__ = "class_metrics"
+
+    # Fields
+    id = sql.Column(sql.Integer, primary_key=True)
+    class_name = sql.Column(sql.Text, index=True)
+    methods = sql.Column(sql.Integer)
+    fan_in = sql.Column(sql.Integer, index=True)
+    fan_out = sql.Column(sql.Integer, index=True)
+    coupling = sql.Column(sql.Integer, index=True)
+
+
+class SmaliFinding(Base):
+    """Match of a scanner rule
+
+    Rows are computed by :class:`smalisca.analysis.analysis_scanner.Scanner`.
+
+    Attributes:
+        id (integer): Primary key
+        rule (str): Name of the matching rule
+        kind (str): 'call' or 'string'
+        class_name (str): Class of the calling method or const-string
+        method_name (str): Calling method (calls only)
+        value (str): Call descriptor or const-string value
+        ref_id (integer): ID of the call or const-string
+
+    """
+    __tablename__ = "findings"
+
+    # Fields
+    id = sql.Column(sql.Integer, primary_key=True)
+    rule = sql.Column(sql.Text, index=True)
+    kind = sql.Column(sql.Text, index=True)
+    class_name = sql.Column(sql.Text, index=True)
+    method_name = sql.Column(sql.Text)
+    value = sql.Column(sql.Text)
+    ref_id = sql.Column(sql.Integer, index=True)
+
+
+class SmaliInterface(Base):
+    """Models an interface implemented by a class
+
+    Attributes:
+        id (integer): Primary key
+        class_name (str): Name of the implementing class
+        interface_name (str): Name of the interface
+
+    """
+    __tablename__ = "interfaces"
+
+    # Fields
+    id = sql.Column(sql.Integer, primary_key=True)
+    class_name = sql.Column(sql.Text, index=True)
+    interface_name = sql.Column(sql.Text, index=True)
+
+
+class SmaliHierarchy(Base):
+    """Transitive closure of the class hierarchy
+
+    Every class has one row per (direct or indirect) super class and
+    implemented interface. Rows are computed by
+    :func:`smalisca.analysis.analysis_hierarchy.hierarchy_closure`.
+
+    Attributes:
+        id (integer): Primary key
+        ancestor (str): Super class or interface
+        descendant (str): Sub class or implementing class
+        distance (integer): Number of hierarchy edges between both (1 = direct)
+        kind (str): 'class' if ancestor is a super class, otherwise 'interface'
+
+    """
+    __tablename__ = "hierarchy"
+
+    # Fields
+    id = sql.Column(sql.Integer, primary_key=True)
+    ancestor = sql.Column(sql.Text, index=True)
+    descendant = sql.Column(sql.Text, index=True)
+    distance = sql.Column(sql.Integer)
+    kind = sql.Column(sql.Text)
+
+
 class AppSQLModel:
     """Models an App as a SQL model
 
@@ -333,22 +653,34 @@ class AppSQLModel:
 
     """
 
-    def __init__(self, sqlitedb):
+    def __init__(self, sqlitedb, read_only=False):
         """Init the app SQL model
 
         Args:
             sqlitedb (str): SQLite file name
+            read_only (bool): Open an existing DB read-only and immutable
+                (see :func:`create_engine`). The schema is neither created
+                nor upgraded, so many processes can share the DB without
+                locking. The file must not be modified meanwhile.
 
         Returns:
             AppSqlModel: Instance of AppSQLModel
 
         """
-        self.engine = sql.create_engine('sqlite:///' + sqlitedb)
-        Base.metadata.create_all(self.engine)
+        self.read_only = read_only
+        self.engine = create_engine(sqlitedb, immutable=read_only)
+
+        if read_only:
+            with self.engine.connect() as conn:
+                if missing_columns(conn):
+                    log.warn("Outdated DB schema, open it once for writing to upgrade it")
+        else:
+            Base.metadata.create_all(self.engine)
+            upgrade_schema(self.engine)
 
         # Create session
         self.session = scoped_session(sessionmaker(
-            autoflush=True, autocommit=False,
+            autoflush=not read_only, autocommit=False,
             bind=self.engine
         ))
         self.db = self.session()
@@ -439,7 +771,8 @@ class AppSQLModel:
             class_type=class_obj['type'],
             class_package=class_obj['package'],
             depth=class_obj['depth'],
-            path=class_obj['path']
+            path=class_obj['path'],
+            class_parent=class_obj.get('parent')
         )
 
         # Add new class
@@ -483,7 +816,8 @@ class AppSQLModel:
         new_const_string = SmaliConstString(
             const_string_var=const_string['name'],
             const_string_value=const_string['value'],
-            const_string_class=const_string['class']
+            const_string_class=const_string['class'],
+            const_string_kind=const_string.get('kind')
         )
 
         # Append new const-string to class
@@ -538,6 +872,7 @@ class AppSQLModel:
             from_class=call['from_class'],
             from_method=call['from_method'],
             local_args=call['local_args'],
+            from_args=call.get('from_args'),
 
             # Destination
             dst_class=call['to_class'],
@@ -551,6 +886,93 @@ class AppSQLModel:
         # Add new call to DB
         self.db.merge(new_call)
 
+    def add_interface(self, interface):
+        """Adds interface implemented by a class
+
+        Args:
+            interface (dict): Interface object to insert
+
+        """
+        self.db.add(SmaliInterface(
+            class_name=interface['class'],
+            interface_name=interface['interface']))
+
+    def has_search_index(self):
+        """Checks if the full-text search index exists
+
+        Returns:
+            bool: True if all index tables exist, otherwise False
+
+        """
+        return has_index(self.db, search_index_name)
+
+    def has_trigram_index(self):
+        """Checks if the trigram index exists
+
+        Returns:
+            bool: True if all index tables exist, otherwise False
+
+        """
+        return has_index(self.db, trigram_index_name)
+
+    def create_index(self, index_name, options=""):
+        """Creates (or rebuilds) FTS5 index tables
+
+        Every index table is an external content table on top of
+        the real table, so only the index itself is stored.
+
+        Args:
+            index_name (func): Returns index table name by table name
+            options (str): Additional FTS5 options (e.g. tokenizer)
+
+        Returns:
+            bool: True if the index has been created, otherwise False
+
+        """
+        try:
+            for table, columns in SEARCH_INDEX_COLUMNS.items():
+                fts = index_name(table)
+                self.db.execute(sql.text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS %s USING fts5(%s, "
+                    "content='%s', content_rowid='id'%s)" % (
+                        fts, ", ".join(columns), table, options)))
+                self.db.execute(sql.text(
+                    "INSERT INTO %s(%s) VALUES('rebuild')" % (fts, fts)))
+            self.db.commit()
+            return True
+
+        except sql.exc.OperationalError as e:
+            self.db.rollback()
+            log.warn("Couldn't create index: %s" % e)
+            return False
+
+    def create_search_index(self):
+        """Creates (or rebuilds) the full-text search index
+
+        The index uses SQLite's FTS5 extension and allows token and
+        prefix searches. If FTS5 is not available searches will fall
+        back to plain substring matching.
+
+        Returns:
+            bool: True if the index has been created, otherwise False
+
+        """
+        return self.create_index(search_index_name)
+
+    def create_trigram_index(self):
+        """Creates (or rebuilds) the trigram index
+
+        The index uses the trigram tokenizer of FTS5 (SQLite >= 3.34)
+        and allows substring searches for patterns of at least three
+        characters. It needs considerably more space than the
+        full-text search index, so it is optional.
+
+        Returns:
+            bool: True if the index has been created, otherwise False
+
+        """
+        return self.create_index(trigram_index_name, ", tokenize='trigram'")
+
     def get_session(self):
         """Returns DB session
 
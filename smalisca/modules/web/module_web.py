@@ -42,6 +42,19 @@ from werkzeug.serving import run_simple
 # Import SQLAlchemy models
 from smalisca.modules.module_sql_models import SmaliClass, SmaliProperty, SmaliMethod
 from smalisca.modules.module_sql_models import SmaliConstString, SmaliCall
+from smalisca.modules.module_sql_models import SmaliMethodMetric, SmaliClassMetric
+from smalisca.modules.module_sql_models import SmaliFinding
+from smalisca.modules.module_sql_models import SmaliInterface, SmaliHierarchy
+
+
+def columns(model):
+    """Returns column names of model
+
+    API results only contain these columns, related objects (e.g. all
+    methods of a class) are not loaded and serialized.
+
+    """
+    return [c.name for c in model.__table__.columns]
 
 
 class WebServer(object):
@@ -54,35 +67,68 @@ class WebServer(object):
         self.app = app
         self.apimanager = APIManager()
 
-    def create_blueprints(self, session):
+    def create_blueprints(self, session, read_only=False):
         # Initialize APIManager with Flask object
         self.apimanager.init_app(self.app, session=session)
 
+        # Read-only DBs can't store new rows
+        methods = ['GET'] if read_only else ['GET', 'POST']
+
         # Create API endpoints
 
         # SmaliClass
         self.apimanager.create_api(
-            SmaliClass, app=self.app, methods=['GET', 'POST']
+            SmaliClass, app=self.app, methods=methods,
+            include_columns=columns(SmaliClass)
         )
 
         # SmaliProperty
         self.apimanager.create_api(
-            SmaliProperty, app=self.app, methods=['GET', 'POST']
+            SmaliProperty, app=self.app, methods=methods,
+            include_columns=columns(SmaliProperty)
         )
 
         # SmaliMethod
         self.apimanager.create_api(
-            SmaliMethod, app=self.app, methods=['GET', 'POST']
+            SmaliMethod, app=self.app, methods=methods,
+            include_columns=columns(SmaliMethod)
         )
 
         # SmaliConstString
         self.apimanager.create_api(
-            SmaliConstString, app=self.app, methods=['GET', 'POST']
+            SmaliConstString, app=self.app, methods=methods,
+            include_columns=columns(SmaliConstString)
         )
 
         # SmaliCall
         self.apimanager.create_api(
-            SmaliCall, app=self.app, methods=['GET', 'POST']
+            SmaliCall, app=self.app, methods=methods,
+            include_columns=columns(SmaliCall)
+        )
+
+        # SmaliInterface
+        self.apimanager.create_api(
+            SmaliInterface, app=self.app, methods=methods,
+            include_columns=columns(SmaliInterface)
+        )
+
+        # Call graph metrics (read-only)
+        self.apimanager.create_api(
+            SmaliMethodMetric, app=self.app, methods=['GET']
+        )
+
+        self.apimanager.create_api(
+            SmaliClassMetric, app=self.app, methods=['GET']
+        )
+
+        # Scanner findings (read-only)
+        self.apimanager.create_api(
+            SmaliFinding, app=self.app, methods=['GET']
+        )
+
+        # Class hierarchy closure (read-only)
+        self.apimanager.create_api(
+            SmaliHierarchy, app=self.app, methods=['GET']
         )
 
     def run(self):
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""Tests of the batch mode"""
+
+from smalisca.analysis.analysis_batch import is_barrier, parse_commands, run_batch
+from smalisca.analysis.analysis_sqlite import AnalyzerSQLite
+from smalisca.modules.module_sql_models import AppSQLModel
+
+
+def test_storing_commands_are_barriers():
+    for command in ('entry', 'metrics', 'metrics -t class', 'metrics --update',
+                    'scan -p send', 'subtypes -p Ljava/lang/Runnable'):
+        assert is_barrier(command)
+
+    for command in ('sc -c class_name -p Util', 'scl -tm run --dead', 'centrality'):
+        assert not is_barrier(command)
+
+
+def test_read_only_commands_report_failure(sqlite_db):
+    analysis = AnalyzerSQLite(AppSQLModel(sqlite_db, read_only=True).get_session())
+    assert analysis.read_only
+
+    commands = parse_commands(['entry', 'metrics', 'subtypes'])
+    outputs = [output for _, _, output in run_batch(analysis, commands)]
+
+    assert "can't store reachability" in outputs[0]
+    assert "Entry points" not in outputs[0]
+    assert "can't store metrics" in outputs[1]
+    assert "can't store class hierarchy" in outputs[2]
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""Tests of the query cache"""
+
+import json
+import os
+import subprocess
+import sys
+
+from smalisca.analysis.analysis_sqlite import AnalyzerSQLite
+from smalisca.modules.module_sql_models import AppSQLModel
+
+
+def open_cached(filename, cache_file):
+    return AnalyzerSQLite(AppSQLModel(filename).get_session(), cache_file=cache_file)
+
+
+def test_projected_results_are_saved(sqlite_db, tmp_path):
+    cache_file = str(tmp_path / 'queries.cache')
+    args = {'type': 'class_name', 'pattern': 'Util', 'columns': ['class_name', 'depth']}
+
+    analysis = open_cached(sqlite_db, cache_file)
+    results = analysis.search_class(args)
+    assert [r.class_name for r in results] == ['Lcom/ex/Util']
+    analysis.close()
+
+    analysis = open_cached(sqlite_db, cache_file)
+    assert analysis.cache_stats()['entries'] == 1
+    cached = analysis.search_class(args)
+    assert [r.class_name for r in cached] == ['Lcom/ex/Util']
+    assert analysis.cache_stats()['hits'] == 1
+    analysis.close()
+
+
+SHELL_SCRIPT = """
+import json, sys
+from smalisca.core.smalisca_main import SmaliscaApp
+SmaliscaApp().setup()
+from smalisca.analysis.analysis_shell import AnalyzerShell
+from smalisca.analysis.analysis_sqlite import AnalyzerSQLite
+from smalisca.modules.module_sql_models import AppSQLModel
+analysis = AnalyzerSQLite(AppSQLModel(sys.argv[1]).get_session(), cache_file=sys.argv[2])
+AnalyzerShell(analysis).onecmd(sys.argv[3])
+stats = analysis.cache_stats()
+analysis.close()
+sys.stdout.write('\\n' + json.dumps(stats) + '\\n')
+"""
+
+
+def run_shell(filename, cache_file, command):
+    """Runs a shell command in a new process, returns output and cache stats"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output(
+        [sys.executable, '-c', SHELL_SCRIPT, filename, cache_file, command],
+        cwd=root, universal_newlines=True)
+    output, stats = output.rstrip().rsplit('\n', 1)
+    return output, json.loads(stats)
+
+
+def test_shell_cache_hit_in_second_process(sqlite_db, tmp_path):
+    cache_file = str(tmp_path / 'queries.cache')
+
+    for command in ('sc -c class_name -p Util', 'sc -c class_name -p Util -x path,depth',
+                    'scl -tm run'):
+        output, stats = run_shell(sqlite_db, cache_file, command)
+        assert stats['hits'] == 0
+
+        cached_output, stats = run_shell(sqlite_db, cache_file, command)
+        assert stats['hits'] >= 1 and stats['loads'] >= 1
+        assert cached_output == output
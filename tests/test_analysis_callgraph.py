@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+"""Tests of the call graph analyses"""
+
+from smalisca.analysis import analysis_base
+from smalisca.analysis.analysis_json import AnalyzerJSON
+
+
+def call_names(calls):
+    return [(c.from_method, c.dst_method) for c in calls]
+
+
+def test_find_reachable_depth_and_witness(app, monkeypatch):
+    analysis = AnalyzerJSON(app)
+    sources = {'util': ('Lcom/ex/Util', '<init>')}
+    sinks = {'main': ('Lcom/ex/Main', 'onCreate'), 'net': ('Lcom/ex/Net', 'send')}
+
+    # The method calling the source is a sink itself
+    results = analysis.find_reachable(sources, sinks, 0)
+    assert [(s, t, call_names(c)) for s, t, c in results] == [
+        ('util', 'main', [('onCreate', '<init>')])]
+
+    results = analysis.find_reachable(sources, sinks)
+    assert [(s, t, call_names(c)) for s, t, c in results] == [
+        ('util', 'main', [('onCreate', '<init>')]),
+        ('util', 'net', [('onCreate', '<init>'), ('onCreate', 'send')])]
+
+    # Pairs without witness are flagged
+    monkeypatch.setattr(analysis_base, 'PATH_TIMEOUT', 1e-9)
+    results = analysis.find_reachable(sources, {'net': sinks['net']})
+    assert results == [('util', 'net', None)]
+
+
+def test_precise_and_class_xrefs(app):
+    analysis = AnalyzerJSON(app)
+    create = analysis.search_call({'from_method': 'onCreate', 'to_method': 'init'})
+    send = analysis.search_call({'from_method': 'onCreate', 'to_method': 'send'})
+    run = analysis.search_call({'from_method': 'run'})
+
+    results = analysis.xref_call(send, 'from', 2, precise=True)
+    assert call_names(results) == [('send', 'openConnection')]
+
+    # Util.<init> calls nothing, other methods of Util do
+    assert analysis.xref_call(create, 'from', 2, precise=True) == create
+    results = analysis.xref_call(create, 'from', 2)
+    assert call_names(results) == [('run', 'helper')]
+    assert list(results.depth.values()) == [1]
+
+    # Nothing calls Util.run, but Util is created by Main and called by Dead
+    assert analysis.xref_call(run, 'to', 2, precise=True) == run
+    results = analysis.xref_call(run, 'to', 2)
+    assert sorted(call_names(results)) == [
+        ('onCreate', '<init>'), ('run', 'helper'), ('unused', 'helper')]
+    assert set(results.depth.values()) == {1}
+
+
+def test_k_shortest_paths(app):
+    analysis = AnalyzerJSON(app)
+    args = {'from_class': 'Lcom/ex/', 'to_method': 'openConnection'}
+
+    paths = analysis.find_paths(dict(args, k=3))
+    assert [call_names(p) for p in paths] == [
+        [('send', 'openConnection')],
+        [('onCreate', 'send'), ('send', 'openConnection')]]
+
+    assert len(analysis.find_paths(args)) == 1
+    assert len(analysis.find_paths(dict(args, k=3, max_depth=1))) == 1
+    assert analysis.find_paths({'from_method': 'unused', 'to_method': 'openConnection'}) == []
+
+    # Searches running out of time return no paths
+    assert analysis.find_paths(dict(args, k=3, timeout=1e-9)) == []
+
+
+def test_reach_pairs(app):
+    graph = AnalyzerJSON(app).get_call_graph()
+    init = graph.node('Lcom/ex/Util', '<init>', '')
+    helper = graph.node('Lcom/ex/Util', 'helper', '')
+    send = graph.node('Lcom/ex/Net', 'send', 'Ljava/lang/String;')
+    connect = graph.node('Ljava/net/URL', 'openConnection', '')
+
+    sources = [{init}, {helper}, {send}]
+    sinks = [{send}, {connect}, {helper}]
+    assert graph.reach(sources, sinks) == {(0, 0), (0, 1), (1, 2), (2, 0), (2, 1)}
+    assert graph.reach(sources, sinks, 1) == {(0, 0), (1, 2), (2, 0)}
+    assert graph.reach(sources, sinks, 0) == set()
+
+    # Sources beyond the width of a machine word
+    assert graph.reach([set()] * 70 + [{helper}], sinks) == {(70, 2)}
+
+
+def test_components_and_metrics_of_cycles(app):
+    graph = AnalyzerJSON(app).get_call_graph()
+    component = graph.components()
+    ping = graph.node('Lcom/ex/Loop', 'ping', '')
+    pong = graph.node('Lcom/ex/Loop', 'pong', '')
+    count = graph.node('Lcom/ex/Loop', 'count', 'I')
+    create = graph.node('Lcom/ex/Main', 'onCreate', 'Landroid/os/Bundle;')
+    send = graph.node('Lcom/ex/Net', 'send', 'Ljava/lang/String;')
+
+    assert component[ping] == component[pong]
+    assert len(set(component)) == len(graph.nodes) - 1
+
+    # Callees come first
+    assert component[count] < component[pong]
+    assert component[send] < component[create]
+
+    methods, classes = graph.metrics()
+    metrics = dict(((m[0], m[1]), m[3:]) for m in methods)
+    assert metrics['Lcom/ex/Loop', 'ping'] == (1, 1, component[ping], 2, 1)
+    assert metrics['Lcom/ex/Loop', 'pong'] == (1, 2, component[ping], 2, 1)
+    assert metrics['Lcom/ex/Loop', 'count'] == (2, 1, component[count], 1, 1)
+    assert metrics['Lcom/ex/Main', 'onCreate'] == (0, 2, component[create], 1, 0)
+
+    coupling = dict((c[0], c[1:]) for c in classes)
+    assert coupling['Lcom/ex/Loop'] == (3, 0, 0, 0)
+    assert coupling['Lcom/ex/Util'] == (3, 2, 0, 2)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""Tests of the application diff"""
+
+import json
+import os
+
+from smalisca.analysis.analysis_diff import diff, write_diff
+from smalisca.analysis.analysis_json import AnalyzerJSON
+from smalisca.analysis.analysis_sqlite import AnalyzerSQLite
+from smalisca.modules.module_sql_models import AppSQLModel
+
+from conftest import SOURCES, parse_app
+
+
+def new_sources():
+    """Sources of a new version of the test application"""
+    sources = dict(SOURCES)
+    del sources['Dead.smali']
+    sources['Net.smali'] = SOURCES['Net.smali'].replace(
+        'https://api.example.com/login', 'https://api.example.com/v2/login')
+    sources['Util.smali'] = SOURCES['Util.smali'].replace(
+        '.method private static helper()V\n',
+        '.method private static helper()V\n'
+        '    invoke-static {}, Lcom/ex/Net;->send(Ljava/lang/String;)V\n')
+    sources['Extra.smali'] = """
+.class public Lcom/ex/Extra;
+.super Ljava/lang/Object;
+
+.field public count:I
+"""
+    return sources
+
+
+def test_diff(app, sqlite_db, tmp_path):
+    new = AnalyzerJSON(parse_app(tmp_path, new_sources()))
+    result = diff(AnalyzerJSON(app), new)
+
+    assert result['unchanged'] == 2
+    assert result['classes'] == {
+        'added': [('Lcom/ex/Extra',)],
+        'removed': [('Lcom/ex/Dead',)],
+        'changed': [('Lcom/ex/Net',), ('Lcom/ex/Util',)]}
+    assert result['properties'] == {'added': [], 'removed': [], 'changed': []}
+    assert result['strings'] == {
+        'added': [('Lcom/ex/Net', 'https://api.example.com/v2/login')],
+        'removed': [('Lcom/ex/Net', 'https://api.example.com/login')],
+        'changed': []}
+    assert result['methods'] == {
+        'added': [], 'removed': [], 'changed': [('Lcom/ex/Util', 'helper()V')]}
+    assert result['calls'] == {
+        'added': [('Lcom/ex/Util', 'helper()', 'Lcom/ex/Net;->send(Ljava/lang/String;)V')],
+        'removed': [],
+        'changed': []}
+
+    # Both backends hash alike
+    old = AnalyzerSQLite(AppSQLModel(sqlite_db).get_session(), cache_size=0)
+    assert diff(old, new) == result
+
+    filename = os.path.join(str(tmp_path), 'diff.json')
+    write_diff(result, filename)
+    with open(filename) as f:
+        data = json.load(f)
+    assert data['unchanged'] == 2
+    assert data['calls']['added'] == [{
+        'class_name': 'Lcom/ex/Util', 'method': 'helper()',
+        'call': 'Lcom/ex/Net;->send(Ljava/lang/String;)V'}]
+
+
+def test_diff_of_same_version(app, sqlite_db):
+    old = AnalyzerSQLite(AppSQLModel(sqlite_db).get_session(), cache_size=0)
+    result = diff(old, AnalyzerJSON(app))
+
+    assert result['unchanged'] == 5
+    for name in ('classes', 'properties', 'methods', 'calls', 'strings'):
+        assert result[name] == {'added': [], 'removed': [], 'changed': []}
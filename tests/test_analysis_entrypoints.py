@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""Tests of the entry point detection"""
+
+from smalisca.analysis.analysis_entrypoints import entry_points, framework_types
+
+
+PARENTS = {
+    'La/Main': 'Landroid/app/Activity',
+    'La/Base': 'Landroid/app/Activity',
+    'La/Sub': 'La/Base',
+    'La/Task': 'Landroid/os/AsyncTask',
+    'La/Listener': 'Ljava/lang/Object',
+    'La/Both': 'Landroid/os/AsyncTask',
+}
+
+INTERFACES = {
+    'La/Listener': ['Landroid/view/View$OnClickListener'],
+    'La/Both': ['La/Clicks'],
+    'La/Clicks': ['Landroid/view/View$OnClickListener'],
+}
+
+
+def test_framework_types():
+    assert framework_types('La/Sub', PARENTS, INTERFACES) == ['Landroid/app/Activity']
+    assert framework_types('La/Both', PARENTS, INTERFACES) == [
+        'Landroid/os/AsyncTask', 'Landroid/view/View$OnClickListener']
+    assert framework_types('La/Other', PARENTS, INTERFACES) == []
+
+
+def test_entry_points():
+    methods = [
+        ('La/Sub', '<init>', ''), ('La/Sub', 'onResume', ''), ('La/Sub', 'helper', ''),
+        ('La/Task', '<init>', ''), ('La/Task', 'doInBackground', '[Ljava/lang/Object;'),
+        ('La/Listener', '<init>', ''), ('La/Listener', 'onClick', 'Landroid/view/View;'),
+        ('La/Listener', 'onSomething', ''),
+        ('La/Both', 'onClick', 'Landroid/view/View;'),
+        ('La/Declared', '<init>', ''), ('La/Declared', 'work', ''),
+    ]
+    reasons = entry_points(PARENTS, methods, ['La/Declared'], INTERFACES)
+
+    assert reasons == {
+        ('La/Sub', '<init>', ''): 'Landroid/app/Activity',
+        ('La/Sub', 'onResume', ''): 'Landroid/app/Activity',
+        ('La/Task', 'doInBackground', '[Ljava/lang/Object;'): 'Landroid/os/AsyncTask',
+        ('La/Listener', 'onClick', 'Landroid/view/View;'): 'Landroid/view/View$OnClickListener',
+        ('La/Both', 'onClick', 'Landroid/view/View;'): 'Landroid/os/AsyncTask',
+        ('La/Declared', '<init>', ''): 'manifest',
+    }
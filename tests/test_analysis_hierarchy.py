@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+"""Tests of the class hierarchy closure"""
+
+from smalisca.analysis.analysis_hierarchy import hierarchy_closure
+from smalisca.analysis.analysis_json import AnalyzerJSON
+from smalisca.analysis.analysis_sqlite import AnalyzerSQLite
+from smalisca.modules.module_sql_models import AppSQLModel
+
+
+def ancestors(results):
+    return sorted((r.descendant, r.ancestor, r.distance, r.kind) for r in results)
+
+
+def test_closure_distances_and_kinds():
+    parents = {'A': 'Object', 'B': 'A', 'C': 'B', 'X': 'Y', 'Y': 'X'}
+    interfaces = {'B': ['I'], 'C': ['J'], 'I': ['J']}
+
+    rows = list(hierarchy_closure(parents, interfaces))
+    assert [r for r in rows if r[1] == 'C'] == [
+        ('B', 'C', 1, 'class'), ('J', 'C', 1, 'interface'),
+        ('A', 'C', 2, 'class'), ('I', 'C', 2, 'interface'),
+        ('Object', 'C', 3, 'class')]
+    assert [r for r in rows if r[1] == 'I'] == [('J', 'I', 1, 'interface')]
+
+    # Cycles end the walk
+    assert [r for r in rows if r[1] in ('X', 'Y')] == [
+        ('Y', 'X', 1, 'class'), ('X', 'Y', 1, 'class')]
+
+
+def test_search_hierarchy(app, sqlite_db):
+    json_analysis = AnalyzerJSON(app)
+    analysis = AnalyzerSQLite(AppSQLModel(sqlite_db).get_session(), cache_size=0)
+
+    for backend in (json_analysis, analysis):
+        assert backend.build_hierarchy() == 6
+
+        results = backend.search_hierarchy({'type': 'descendant', 'pattern': 'Lcom/ex/Util'})
+        assert ancestors(results) == [
+            ('Lcom/ex/Util', 'Ljava/lang/Object', 1, 'class'),
+            ('Lcom/ex/Util', 'Ljava/lang/Runnable', 1, 'interface')]
+
+        results = backend.search_hierarchy({'pattern': 'Landroid/app/Activity'})
+        assert ancestors(results) == [('Lcom/ex/Main', 'Landroid/app/Activity', 1, 'class')]
+
+    assert ancestors(analysis.search_hierarchy()) == ancestors(json_analysis.search_hierarchy())
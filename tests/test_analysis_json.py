@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+"""Tests of the JSON analyzer"""
+
+from smalisca.analysis.analysis_json import AnalyzerJSON, FieldIndex
+from smalisca.analysis.analysis_search import match_value
+
+
+def test_field_index_matches_like_match_value(app):
+    analysis = AnalyzerJSON(app)
+    values = list(analysis.field_values('calls', 'dst_class'))
+    index = FieldIndex(values)
+
+    for pattern in ('ljava', 'java/lang', 'lang/Obj', 'Ob', 'ex', 'com ex U', 'zzz', '/'):
+        for match in ('token', 'prefix', 'contains'):
+            expected = [pos for pos, v in enumerate(values)
+                        if v is not None and match_value(pattern, v, match)]
+            assert sorted(index.match(pattern, match)) == expected, (pattern, match)
+
+
+def test_prefix_lookup_bisects_tokens():
+    index = FieldIndex(['Lcom/ex/Util', 'Lcom/ex/Main', 'Ljava/lang/Runnable', 'Lcom/ex/Util'])
+    assert sorted(index.match('ut', 'prefix')) == [0, 3]
+    assert index.token_keys == ['ex', 'lang', 'lcom', 'ljava', 'main', 'runnable', 'util']
+    assert index.match('ut', 'token') == []
+    assert sorted(index.match('ex ma', 'prefix')) == [1]
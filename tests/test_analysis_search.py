@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""Tests of the search indexes and pattern matching"""
+
+from smalisca.analysis.analysis_json import AnalyzerJSON
+from smalisca.analysis.analysis_search import fts_expression, trigram_expression
+from smalisca.analysis.analysis_search import regex_literals
+from smalisca.analysis.analysis_sqlite import AnalyzerSQLite
+from smalisca.modules.module_sql_models import AppSQLModel, SmaliCall, SmaliClass
+
+
+def open_sqlite(filename):
+    return AnalyzerSQLite(AppSQLModel(filename).get_session(), cache_size=0)
+
+
+def candidates(analysis, model, columns, pattern, match):
+    query, indexed = analysis.filter_index(
+        analysis.db.query(model), model, columns, pattern, match)
+    return indexed, sorted(r.id for r in query)
+
+
+def test_fts_expression():
+    assert fts_expression('com/ex/Util', 'token') == '"com ex Util"'
+    assert fts_expression('com/ex/Util', 'prefix', ['dst_class']) == \
+        '{dst_class} : ("com ex Util"*)'
+
+    # Outer tokens of substrings may be parts of longer tokens
+    assert fts_expression('om/ex/Ut') == '"ex" AND "Ut"*'
+    assert fts_expression('Util') is None
+    assert fts_expression('/-') is None
+
+
+def test_fts_index_narrows_search(app, fts_db):
+    analysis = open_sqlite(fts_db)
+    json_analysis = AnalyzerJSON(app)
+    assert analysis.search_index and not analysis.trigram_index
+
+    # Only calls from Util contain both tokens
+    indexed, ids = candidates(analysis, SmaliCall, ['from_class'], 'om/ex/Ut', 'contains')
+    util_calls = json_analysis.search_call({'from_class': 'Lcom/ex/Util'})
+    assert indexed
+    assert ids == sorted(c.id for c in util_calls)
+
+    for arg, match, pattern in (('to_class', 'token', 'ex/Util'),
+                                ('to_class', 'prefix', 'ex/Ut'),
+                                ('to_method', 'prefix', 'HELP'),
+                                ('to_class', 'contains', 'om/ex/Ut')):
+        args = {arg: pattern, 'match': match}
+        results = analysis.search_call(args)
+        assert results
+        assert [r.id for r in results] == [r.id for r in json_analysis.search_call(args)]
+
+
+def test_trigram_expression():
+    assert trigram_expression('til') == '"til"'
+    assert trigram_expression('a"b', ['class_name']) == '{class_name} : ("a""b")'
+    assert trigram_expression('ti') is None
+
+
+def test_trigram_index_narrows_contains(app, sqlite_db):
+    analysis = open_sqlite(sqlite_db)
+    json_analysis = AnalyzerJSON(app)
+
+    # Substrings inside tokens are looked up case insensitively
+    indexed, ids = candidates(analysis, SmaliClass, ['class_name'], 'TIL', 'contains')
+    assert indexed
+    assert ids == [c.id for c in json_analysis.search_class(
+        {'type': 'class_name', 'pattern': 'Util'})]
+
+    # Short patterns can't be looked up
+    assert candidates(analysis, SmaliClass, ['class_name'], 'Ut', 'contains')[0] is False
+
+    for pattern in ('til', 'TIL', 'Ut', 'ex/N', 'xyz'):
+        args = {'type': 'class_name', 'pattern': pattern}
+        results = analysis.search_class(args)
+        assert [r.id for r in results] == [r.id for r in json_analysis.search_class(args)]
+
+
+def test_regex_literals():
+    assert regex_literals(r'api\.example\.com') == ['api.example.com']
+    assert regex_literals('AKIA[0-9A-Z]{16}') == ['AKIA']
+    assert regex_literals('https?://api') == ['http', '://api']
+    assert regex_literals('Lcom/ex/(Net|Util)') == ['Lcom/ex/']
+    assert regex_literals(r'\d+\tx') == ['\tx']
+
+    # No literal is required by every match
+    assert regex_literals('Net|Util') == []
+    assert regex_literals('(?i)util') == []
+
+
+def test_regex_search(app, sqlite_db):
+    analysis = open_sqlite(sqlite_db)
+    json_analysis = AnalyzerJSON(app)
+
+    for pattern in ('AKIA[0-9A-Z]{16}', r'https?://api\.', '^Lcom/ex/(Net|Util)$', 'Net|Util'):
+        for search, column in (('search_const_string', 'const_string_value'),
+                               ('search_class', 'class_name')):
+            args = {'type': column, 'pattern': pattern, 'match': 'regex'}
+            results = getattr(analysis, search)(args)
+            json_results = getattr(json_analysis, search)(args)
+            assert [r.id for r in results] == [r.id for r in json_results]
+
+    results = analysis.search_class({'type': 'class_name', 'pattern': 'Lcom/ex/(Net|Util)',
+                                     'match': 'regex'})
+    assert sorted(r.class_name for r in results) == ['Lcom/ex/Net', 'Lcom/ex/Util']
+
+    # Invalid expressions match nothing
+    assert analysis.search_class({'type': 'class_name', 'pattern': '(', 'match': 'regex'}) == []
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+"""Tests of the snapshot analyzer"""
+
+from smalisca.analysis.analysis_snapshot import AnalyzerSnapshot
+from smalisca.modules.module_snapshot import Snapshot, write_snapshot
+
+
+def test_close_with_views_in_use(app, tmp_path):
+    filename = str(tmp_path / 'app.snap')
+    write_snapshot(app, filename)
+
+    analysis = AnalyzerSnapshot(Snapshot(filename))
+    assert analysis.search_class({'type': 'class_name', 'pattern': 'Util'})
+    assert analysis.get_call_graph()
+
+    # Column view still referenced by a running generator
+    values = analysis.snapshot_values('calls', 'dst_method')
+    next(values)
+
+    analysis.close()
+    assert analysis.snapshot.fd is None
+
+    # Closing again does nothing
+    analysis.close()
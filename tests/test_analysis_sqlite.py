@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""Tests of the SQLite analyzer"""
+
+from smalisca.analysis.analysis_sqlite import AnalyzerSQLite
+from smalisca.analysis.analysis_json import AnalyzerJSON
+from smalisca.modules.module_sql_models import AppSQLModel
+
+
+def open_sqlite(filename):
+    return AnalyzerSQLite(AppSQLModel(filename).get_session(), cache_size=0)
+
+
+def values(results, field):
+    return sorted(getattr(r, field) for r in results)
+
+
+def test_search_const_string_kind(app, sqlite_db):
+    analysis = open_sqlite(sqlite_db)
+    assert analysis.search_index and analysis.trigram_index
+
+    for match in (None, 'contains', 'token', 'prefix'):
+        results = analysis.search_const_string({
+            'type': 'const_string_kind', 'pattern': 'url', 'match': match})
+        assert values(results, 'const_string_value') == ['https://api.example.com/login']
+
+    # Both backends agree
+    json_results = AnalyzerJSON(app).search_const_string({
+        'type': 'const_string_kind', 'pattern': 'key'})
+    results = analysis.search_const_string({'type': 'const_string_kind', 'pattern': 'key'})
+    assert values(results, 'const_string_value') == values(json_results, 'const_string_value')
+
+
+def test_group_by_non_indexed_column(app, sqlite_db):
+    analysis = open_sqlite(sqlite_db)
+    json_analysis = AnalyzerJSON(app)
+
+    for args in (
+            {'table': 'calls', 'columns': ['dst_class'], 'type': 'ret', 'pattern': 'V',
+             'match': 'token'},
+            {'table': 'classes', 'columns': ['class_package'], 'type': 'depth', 'pattern': '3',
+             'match': 'prefix'},
+            {'table': 'classes', 'columns': ['class_package'], 'type': 'depth', 'pattern': '3'}):
+        results = analysis.group(args)
+        assert results is not None
+        assert sorted(results) == sorted(json_analysis.group(args))
+
+
+def test_backends_agree_on_contains_and_output(app, sqlite_db):
+    analysis = open_sqlite(sqlite_db)
+    json_analysis = AnalyzerJSON(app)
+
+    for args in ({'from_class': 'util'}, {'to_method': 'HELP'}):
+        results = analysis.search_call(args)
+        json_results = json_analysis.search_call(args)
+        assert 0 < len(results) < len(json_analysis.search_call({}))
+        assert [r.to_string() for r in results] == [r.to_string() for r in json_results]
+
+    for search in ('search_class', 'search_property', 'search_const_string', 'search_method'):
+        results = getattr(analysis, search)({})
+        json_results = getattr(json_analysis, search)({})
+        assert [r.to_string() for r in results] == [r.to_string() for r in json_results]
+
+
+def test_interface_callbacks_are_reachable(sqlite_db):
+    analysis = open_sqlite(sqlite_db)
+
+    result = analysis.analyze_reachability()
+    entries = result['entry_points']
+    assert entries[('Lcom/ex/Util', 'run', '')] == 'Ljava/lang/Runnable'
+    assert entries[('Lcom/ex/Main', 'onCreate', 'Landroid/os/Bundle;')] == 'Landroid/app/Activity'
+
+    # Runnables are created by the app itself
+    assert ('Lcom/ex/Util', '<init>', '') not in entries
+
+    live = analysis.search_method({'reachable': True})
+    assert ('Lcom/ex/Util', 'helper') in [(m.method_class, m.method_name) for m in live]
+
+
+def test_global_search_in_threads(app, sqlite_db):
+    analysis = open_sqlite(sqlite_db)
+    json_results = AnalyzerJSON(app).search({'pattern': 'Util'})
+
+    results = dict(analysis.iter_search({'pattern': 'Util'}))
+    assert analysis.read_sessions is not None
+    for key in ('classes', 'properties', 'consts', 'methods'):
+        assert [r.id for r in results[key]] == [r.id for r in json_results[key]]
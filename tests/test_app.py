@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+"""Tests of the application results"""
+
+from smalisca.core.smalisca_app import App
+
+
+def read(filename, fileformat=None):
+    app = App('read')
+    app.parser = 'parser'
+    app.location = 'location'
+    app.read_json(filename, fileformat)
+    return app
+
+
+def test_read_json_and_jsonl(app, tmp_path):
+    names = sorted(app.classes)
+
+    app.write_json(str(tmp_path / 'app.json'))
+    app.write_jsonl(str(tmp_path / 'app.jsonl'))
+    for filename, fileformat in (('app.json', 'json'), ('app.jsonl', 'jsonl'),
+                                 ('app.json', None), ('app.jsonl', None)):
+        assert sorted(read(str(tmp_path / filename), fileformat).classes) == names
+
+
+def test_read_jsonl_with_one_class(app, tmp_path):
+    single = App('single')
+    name = sorted(app.classes)[0]
+    single.add_class_obj(app.classes[name])
+    single.write_jsonl(str(tmp_path / 'one.jsonl'))
+
+    for fileformat in ('jsonl', None):
+        result = read(str(tmp_path / 'one.jsonl'), fileformat)
+        assert list(result.classes) == [name]
+
+        # Class objects carry no parser information
+        assert (result.parser, result.location) == ('parser', 'location')